@@ -14,7 +14,10 @@ from datetime import datetime
 import time
 import threading
 from dictionary_lookup_manager import DictionaryLookupManager
+from lookup_cache import read_lookup_table
 from shared_ui_components import BaseToolFrame
+from input_cache import cached_read_final_file
+from final_schema import to_typed_frame
 from rfm_analyzer.rfm_score import RFMScorer
 from abstract_rfm.output_selection_dialog import OutputSelectionDialog
 
@@ -155,7 +158,7 @@ class FinalRFMAnalyzer(BaseToolFrame):
 
     def get_dictionary_df(self, path):
         if path not in self.dictionary_cache:
-            self.dictionary_cache[path] = pd.read_excel(path)
+            self.dictionary_cache[path] = read_lookup_table(path)
         return self.dictionary_cache[path]
 
     def calculate_gift_amount_range(self, amount):
@@ -333,7 +336,7 @@ class FinalRFMAnalyzer(BaseToolFrame):
             self.progress_queue_put(10)
 
             # Read the input file
-            df = pd.read_excel(self.input_file_path)
+            df = to_typed_frame(cached_read_final_file(self.input_file_path))
             self.progress_queue_put(20)
 
             # Process the data
@@ -384,7 +387,7 @@ class FinalRFMAnalyzer(BaseToolFrame):
             
             df['Date Clean'] = pd.to_datetime(df['Date Clean'])
             recurring_ids = set(df[df['Recurring ID'].notna()]['Relationship ID'].unique())
-            grouped = df.groupby('Relationship ID')
+            grouped = df.groupby('Relationship ID', observed=True)
             
             rfm_data = []
             total_groups = len(grouped)
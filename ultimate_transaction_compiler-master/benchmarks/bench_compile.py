@@ -0,0 +1,181 @@
+"""Scaling benchmark for the compile pipeline on synthetic exports.
+
+Run from the project folder:
+
+    python -m benchmarks.bench_compile --sizes 10k,100k,1M,5M
+    python -m benchmarks.bench_compile --history
+
+Every size runs the full pipeline (xlsx read, identity resolution, duplicate
+detection, final file, save) in its own process so peak memory is measured
+per size. Results are appended to benchmarks/results/history.jsonl together
+with the application version, so runs of different versions can be compared.
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+from datetime import datetime
+import pandas as pd
+from benchmarks.synthetic_data import generate_exports, write_exports
+from compile_pipeline import TransactionCompilePipeline, default_platforms, BACKENDS
+from input_cache import InputFileCache, default_cache
+from version_manager import get_current_version
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_DIR = os.path.dirname(BENCHMARK_DIR)
+DATA_DIR = os.path.join(BENCHMARK_DIR, 'data')
+RESULTS_FILE = os.path.join(BENCHMARK_DIR, 'results', 'history.jsonl')
+MANIFEST_FILE = 'manifest.json'
+DEFAULT_SIZES = [10000, 100000, 1000000, 5000000]
+SIZE_SUFFIXES = {'k': 1000, 'm': 1000000}
+
+
+def parse_size(text):
+    """'10k' -> 10000, '5M' -> 5000000."""
+    text = text.strip().lower()
+    if text[-1] in SIZE_SUFFIXES:
+        return int(float(text[:-1]) * SIZE_SUFFIXES[text[-1]])
+    return int(text)
+
+
+def prepare_inputs(size, seed):
+    """Generate the synthetic xlsx exports for a size once and reuse them afterwards. Returns the manifest path."""
+    data_dir = os.path.join(DATA_DIR, f"{size}_seed{seed}")
+    manifest_path = os.path.join(data_dir, MANIFEST_FILE)
+    if not os.path.exists(manifest_path):
+        print(f"Generating {size} synthetic rows in {data_dir}", flush=True)
+        exports = generate_exports(size, seed=seed)
+        input_files = write_exports(exports, data_dir)
+        with open(manifest_path, 'w') as f:
+            json.dump({'size': size, 'seed': seed, 'rows': {name: len(df) for name, df in exports.items()},
+                       'input_files': input_files}, f, indent=2)
+    return manifest_path
+
+
+def run_single(manifest_path, output_format, backend='pandas'):
+    """Run one compile in this process and return its measurements."""
+    with open(manifest_path, 'r') as f:
+        manifest = json.load(f)
+
+    # Measure real parsing, not input cache hits: the reader processes get a disabled cache
+    cached_entries = default_cache.stats()['entries']
+    with tempfile.TemporaryDirectory() as output_dir:
+        cache = InputFileCache(os.path.join(output_dir, 'input_cache'), enabled=False)
+        pipeline = TransactionCompilePipeline(default_platforms(), backend=backend, input_cache=cache)
+        pipeline.run(manifest['input_files'], os.path.join(output_dir, f"benchmark.{output_format}"))
+        if os.path.exists(cache.cache_dir) or default_cache.stats()['entries'] > cached_entries:
+            raise RuntimeError("The benchmark run wrote input cache entries; its timings include cache loads")
+    report = pipeline.run_report.to_dict()
+
+    rows_in = sum(manifest['rows'].values())
+    return {
+        'size': manifest['size'],
+        'seed': manifest['seed'],
+        'output_format': output_format,
+        'backend': backend,
+        'rows_in': rows_in,
+        'rows_out': report['rows_out'],
+        'wall_seconds': report['wall_seconds'],
+        'cpu_seconds': report['cpu_seconds'],
+        'peak_rss_mb': report['peak_rss_mb'],
+        'rows_per_second': round(rows_in / report['wall_seconds'], 1) if report['wall_seconds'] else None,
+        'stages': {stage['stage']: {'wall_seconds': stage.get('wall_seconds'), 'peak_rss_mb': stage.get('peak_rss_mb')}
+                   for stage in report['stages']}
+    }
+
+
+def run_isolated(manifest_path, output_format, backend='pandas'):
+    """Run one compile in a fresh interpreter so its peak memory is not inflated by earlier sizes."""
+    completed = subprocess.run(
+        [sys.executable, '-m', 'benchmarks.bench_compile', '--single', manifest_path, '--output-format', output_format,
+         '--backend', backend],
+        cwd=PROJECT_DIR, capture_output=True, text=True
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"Benchmark run failed for {manifest_path}:\n{completed.stderr}")
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=PROJECT_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def record_result(result):
+    os.makedirs(os.path.dirname(RESULTS_FILE), exist_ok=True)
+    with open(RESULTS_FILE, 'a') as f:
+        f.write(json.dumps(result) + '\n')
+
+
+def load_history():
+    if not os.path.exists(RESULTS_FILE):
+        return pd.DataFrame()
+    with open(RESULTS_FILE, 'r') as f:
+        return pd.DataFrame([json.loads(line) for line in f if line.strip()])
+
+
+def print_history():
+    """Show the latest result per version and size, oldest version first."""
+    history = load_history()
+    if history.empty:
+        print(f"No benchmark results in {RESULTS_FILE}")
+        return
+    # Results recorded before the duckdb backend existed all used pandas
+    history['backend'] = history['backend'].fillna('pandas') if 'backend' in history else 'pandas'
+    latest = history.sort_values('recorded_at').groupby(['version', 'size', 'output_format', 'backend']).tail(1)
+    version_order = latest['version'].map(lambda version: tuple(int(part) for part in version.split('.')))
+    latest = latest.assign(version_order=version_order)
+    latest = latest.sort_values(['size', 'output_format', 'backend', 'version_order'])
+    columns = ['size', 'output_format', 'backend', 'version', 'commit', 'recorded_at', 'wall_seconds',
+               'rows_per_second', 'peak_rss_mb']
+    print(latest[columns].to_string(index=False))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the compile pipeline on synthetic exports")
+    parser.add_argument('--sizes', default=','.join(str(size) for size in DEFAULT_SIZES),
+                        help="comma-separated total row counts, e.g. 10k,100k,1M,5M")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output-format', choices=['xlsx', 'csv'], default='xlsx')
+    parser.add_argument('--backend', choices=BACKENDS, default='pandas')
+    parser.add_argument('--no-record', action='store_true', help="do not append the results to the history file")
+    parser.add_argument('--history', action='store_true', help="show recorded results and exit")
+    parser.add_argument('--single', metavar='MANIFEST', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.single:
+        logging.basicConfig(level=logging.WARNING)
+        print(json.dumps(run_single(args.single, args.output_format, args.backend)))
+        return 0
+
+    if args.history:
+        print_history()
+        return 0
+
+    run_info = {
+        'version': get_current_version(),
+        'commit': git_commit(),
+        'recorded_at': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'machine': f"{platform.system()} {platform.machine()}, {os.cpu_count()} CPUs"
+    }
+    for size in [parse_size(size) for size in args.sizes.split(',')]:
+        manifest_path = prepare_inputs(size, args.seed)
+        result = {**run_info, **run_isolated(manifest_path, args.output_format, args.backend)}
+        print(f"{size:>10} rows: {result['wall_seconds']:8.2f}s, {result['rows_per_second']:>10} rows/s, "
+              f"peak RSS {result['peak_rss_mb']} MB", flush=True)
+        if not args.no_record:
+            record_result(result)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,199 @@
+"""Seeded generator of EveryAction- and ActBlue-shaped exports with no real donor data.
+
+The exports match the column layout of the built-in default platforms and
+include the things that make real runs slow or tricky: donors giving on both
+platforms, household emails shared by several donors, monthly recurring
+series, dates in mixed formats or missing, and wide exports full of columns
+the compiler never reads.
+"""
+import os
+import numpy as np
+import pandas as pd
+from output_writer import write_xlsx, EXCEL_MAX_ROWS
+
+EVERYACTION = 'EveryAction'
+ACTBLUE = 'ActBlue'
+
+FIRST_NAMES = ['James', 'Mary', 'Robert', 'Patricia', 'John', 'Jennifer', 'Michael', 'Linda', 'David', 'Elizabeth',
+               'William', 'Barbara', 'Richard', 'Susan', 'Joseph', 'Jessica', 'Thomas', 'Sarah', 'Carlos', 'Maria',
+               'Wei', 'Aisha', 'Mohammed', 'Priya', 'Kenji', 'Olga', 'Fatima', 'Diego', 'Amara', 'Noah']
+LAST_NAMES = ['Smith', 'Johnson', 'Williams', 'Brown', 'Jones', 'Garcia', 'Miller', 'Davis', 'Rodriguez', 'Martinez',
+              'Hernandez', 'Lopez', 'Gonzalez', 'Wilson', 'Anderson', 'Thomas', 'Taylor', 'Moore', 'Jackson', 'Martin',
+              'Lee', 'Perez', 'Thompson', 'White', 'Harris', 'Sanchez', 'Clark', 'Nguyen', 'Patel', 'Kim']
+CITIES = [('Miami', 'FL', 33101), ('Austin', 'TX', 73301), ('Denver', 'CO', 80201), ('Seattle', 'WA', 98101),
+          ('Chicago', 'IL', 60601), ('Atlanta', 'GA', 30301), ('Boston', 'MA', 2101), ('Phoenix', 'AZ', 85001)]
+EMAIL_DOMAINS = ['gmail.com', 'yahoo.com', 'outlook.com', 'icloud.com', 'aol.com']
+DESIGNATIONS = ['General Fund', 'Scholarships', 'Capital Campaign', 'Annual Gala']
+AMOUNTS = np.array([5, 10, 15, 20, 25, 27, 35, 50, 75, 100, 150, 250, 500, 1000], dtype=float)
+AMOUNT_WEIGHTS = np.array([8, 14, 6, 8, 16, 6, 5, 12, 4, 10, 3, 4, 2, 2], dtype=float)
+
+DATE_RANGE_START = np.datetime64('2020-01-01')
+DATE_RANGE_DAYS = 5 * 365
+
+
+def _donor_pool(rng, n_donors, shared_email_rate, missing_email_rate):
+    first = rng.choice(FIRST_NAMES, n_donors)
+    last = rng.choice(LAST_NAMES, n_donors)
+    city_index = rng.integers(0, len(CITIES), n_donors)
+    numbers = np.arange(n_donors).astype(str)
+    emails = pd.Series(first).str.lower() + '.' + pd.Series(last).str.lower() + numbers + '@' + \
+        rng.choice(EMAIL_DOMAINS, n_donors)
+
+    # Households: some donors use the email of another donor
+    shared = rng.random(n_donors) < shared_email_rate
+    emails[shared] = emails.values[rng.integers(0, n_donors, shared.sum())]
+    emails[rng.random(n_donors) < missing_email_rate] = None
+
+    return pd.DataFrame({
+        'VANID': 100000 + np.arange(n_donors),
+        'First Name': first,
+        'Last Name': last,
+        'Email': emails.values,
+        'Street': [f"{number} Main St" for number in rng.integers(1, 9999, n_donors)],
+        'City': [CITIES[i][0] for i in city_index],
+        'State': [CITIES[i][1] for i in city_index],
+        'ZIP': [f"{CITIES[i][2]:05d}" for i in city_index],
+        'Phone': rng.integers(2000000000, 9999999999, n_donors).astype(str),
+    })
+
+
+def _transactions(rng, donors, n_rows, recurring_rate):
+    """Gifts for randomly chosen donors, with part of them as monthly recurring series."""
+    # A fifth of the gifts come from the most active 1% of donors
+    n_frequent = max(1, len(donors) // 100)
+    donor_index = rng.integers(0, len(donors), n_rows)
+    frequent = rng.random(n_rows) < 0.2
+    donor_index[frequent] = rng.integers(0, n_frequent, frequent.sum())
+    amounts = rng.choice(AMOUNTS, n_rows, p=AMOUNT_WEIGHTS / AMOUNT_WEIGHTS.sum())
+    dates = DATE_RANGE_START + rng.integers(0, DATE_RANGE_DAYS, n_rows).astype('timedelta64[D]')
+
+    # Recurring gifts repeat monthly with the same donor and amount, 2-12 gifts per series.
+    # Series starts are rarer than recurring_rate so that recurring_rate of the rows end up recurring.
+    mean_length = 7
+    recurring = rng.random(n_rows) < recurring_rate / (mean_length - (mean_length - 1) * recurring_rate)
+    series_length = rng.integers(2, 13, n_rows)
+    series_length[~recurring] = 1
+    series_start = np.cumsum(series_length) - series_length
+    repeats = np.repeat(np.arange(n_rows), series_length)[:n_rows]
+    months = np.arange(n_rows) - series_start[repeats]
+    dates = (dates[repeats].astype('datetime64[M]') + months.astype('timedelta64[M]')).astype('datetime64[D]') + \
+        (dates[repeats] - dates[repeats].astype('datetime64[M]').astype('datetime64[D]'))
+    return pd.DataFrame({
+        'donor': donor_index[repeats],
+        'date': pd.to_datetime(dates) + pd.to_timedelta(rng.integers(0, 86400, n_rows), unit='s'),
+        'amount': amounts[repeats],
+        'recurring': recurring[repeats],
+        'series': repeats,
+    })
+
+
+def _dirty_dates(rng, dates, dirty_date_rate, missing_date_rate):
+    """Format most dates as timestamps and the rest as text in other layouts or blank."""
+    values = pd.Series(dates, dtype=object)
+    dirty = rng.random(len(values)) < dirty_date_rate
+    formats = rng.integers(0, 3, dirty.sum())
+    dirty_dates = pd.Series(dates[dirty])
+    values[dirty] = np.select(
+        [formats == 0, formats == 1],
+        [dirty_dates.dt.strftime('%m/%d/%Y').values, dirty_dates.dt.strftime('%Y-%m-%d %H:%M:%S').values],
+        dirty_dates.dt.strftime('%d %b %Y').values
+    )
+    values[rng.random(len(values)) < missing_date_rate] = None
+    return values.values
+
+
+def _filler_columns(rng, n_rows, extra_columns):
+    return {f"Custom Field {i + 1}": rng.integers(0, 1000, n_rows) if i % 2 else rng.choice(['Yes', 'No', ''], n_rows)
+            for i in range(extra_columns)}
+
+
+def generate_exports(total_rows, seed=0, actblue_share=0.45, overlap_rate=0.35, shared_email_rate=0.05,
+                     missing_email_rate=0.08, recurring_rate=0.12, dirty_date_rate=0.02, missing_date_rate=0.002,
+                     extra_columns=40):
+    """Generate EveryAction and ActBlue exports with about total_rows rows between them.
+
+    overlap_rate is the share of ActBlue gifts that EveryAction also holds
+    (same donor, date and amount, with the ActBlue order number as the
+    EveryAction ActBlue ID), which the compiler should flag as duplicates.
+    Returns a dict of platform name -> DataFrame.
+    """
+    rng = np.random.default_rng(seed)
+    n_actblue = int(total_rows * actblue_share)
+    n_overlap = int(n_actblue * overlap_rate)
+    n_everyaction = total_rows - n_actblue
+    donors = _donor_pool(rng, max(1, total_rows // 4), shared_email_rate, missing_email_rate)
+
+    # ActBlue: every gift has its own order and line item
+    ab = _transactions(rng, donors, n_actblue, recurring_rate)
+    ab_donors = donors.iloc[ab['donor']].reset_index(drop=True)
+    order_numbers = pd.Series('AB' + pd.Series(np.arange(n_actblue) + 1000000).astype(str))
+    actblue = pd.DataFrame({
+        'Order Number': order_numbers,
+        'Lineitem ID': np.arange(n_actblue) + 50000000,
+        'Paid At': _dirty_dates(rng, ab['date'].values, dirty_date_rate, missing_date_rate),
+        'Amount': ab['amount'].values,
+        'Recipient': rng.choice(DESIGNATIONS, n_actblue),
+        'Contribution Form URL': 'https://secure.actblue.com/donate/' + pd.Series(rng.choice(['main', 'gala', 'monthly'], n_actblue)),
+        'Donor First Name': ab_donors['First Name'],
+        'Donor Last Name': ab_donors['Last Name'],
+        'Donor Address Line 1': ab_donors['Street'],
+        'Donor City': ab_donors['City'],
+        'Donor State': ab_donors['State'],
+        'Donor ZIP': ab_donors['ZIP'],
+        'Donor Country': 'United States',
+        'Donor Occupation': rng.choice(['Teacher', 'Engineer', 'Retired', 'Nurse', 'Attorney', ''], n_actblue),
+        'Donor Employer': rng.choice(['None', 'Self', 'School District', 'Hospital', ''], n_actblue),
+        'Donor Email': ab_donors['Email'],
+        'Donor Phone': ab_donors['Phone'],
+        'Is Recurring': ab['recurring'].values,
+        'Initial Recurring Contribution Date': np.where(
+            ab['recurring'], ab.groupby('series')['date'].transform('min').dt.strftime('%Y-%m-%d'), None),
+        **_filler_columns(rng, n_actblue, extra_columns)
+    })
+
+    # EveryAction: its own gifts plus the synced copies of part of the ActBlue gifts
+    ea = _transactions(rng, donors, n_everyaction - n_overlap, recurring_rate)
+    synced = rng.choice(n_actblue, n_overlap, replace=False)
+    ea = pd.concat([ea, ab.iloc[synced].assign(recurring=False)], ignore_index=True)
+    actblue_ids = np.concatenate([np.full(n_everyaction - n_overlap, None, dtype=object), order_numbers.values[synced]])
+    order = rng.permutation(len(ea))
+    ea = ea.iloc[order].reset_index(drop=True)
+    actblue_ids = actblue_ids[order]
+    ea_donors = donors.iloc[ea['donor']].reset_index(drop=True)
+    commitment_ids = np.where(ea['recurring'], 'RC' + ea['series'].astype(str), None)
+    everyaction = pd.DataFrame({
+        'VANID': ea_donors['VANID'],
+        'Contribution ID': np.arange(len(ea)) + 9000000,
+        'ActBlue ID': actblue_ids,
+        'Date Received': _dirty_dates(rng, ea['date'].values, dirty_date_rate, missing_date_rate),
+        'Amount': ea['amount'].values,
+        'Designation': rng.choice(DESIGNATIONS, len(ea)),
+        'First Name': ea_donors['First Name'],
+        'Last Name': ea_donors['Last Name'],
+        'Home Street Address': ea_donors['Street'],
+        'Home City': ea_donors['City'],
+        'Home State/Province': ea_donors['State'],
+        'Home Zip/Postal': ea_donors['ZIP'],
+        'Home Country': 'US',
+        'Personal Email': ea_donors['Email'],
+        'Home Phone': ea_donors['Phone'],
+        'Start Date': None,
+        'Is Recurring Commitment': ea['recurring'].astype(int).values,
+        'Recurring Commitment ID': commitment_ids,
+        **_filler_columns(rng, len(ea), extra_columns)
+    })
+    return {EVERYACTION: everyaction, ACTBLUE: actblue}
+
+
+def write_exports(exports, out_dir, max_rows_per_file=EXCEL_MAX_ROWS - 1):
+    """Write each export as one or more xlsx files, like a multi-file download. Returns platform -> file paths."""
+    os.makedirs(out_dir, exist_ok=True)
+    input_files = {}
+    for platform_name, df in exports.items():
+        paths = []
+        for number, start in enumerate(range(0, max(len(df), 1), max_rows_per_file), start=1):
+            path = os.path.join(out_dir, f"{platform_name} {number:03d}.xlsx")
+            write_xlsx(df.iloc[start:start + max_rows_per_file], path)
+            paths.append(path)
+        input_files[platform_name] = paths
+    return input_files
@@ -0,0 +1,1006 @@
+"""GUI-free compile pipeline shared by the Dynamic Transaction Compiler window and the command line.
+
+Command line usage:
+
+    python compile_pipeline.py --input "EveryAction=exports/everyaction" --input "ActBlue=exports/ab*.xlsx" \
+        --output DynamicFinalFile.xlsx
+
+A directory input is searched with the platform's file_pattern. Progress is
+written to stdout as JSON lines; the log goes to stderr.
+"""
+import argparse
+import glob
+import json
+import logging
+import multiprocessing
+import os
+import sys
+import time
+import traceback
+import numpy as np
+import pandas as pd
+from data_platform import Platform
+from utils import generate_fallback_ids, FALLBACK_ID_COLUMNS
+from identity_resolution import IdentityResolver
+from record_linkage import link_fallback_donors, DEFAULT_MATCH_THRESHOLD
+from file_ingestion import read_platform_files, iter_platform_files, cached_reader, DEFAULT_MAX_WORKERS
+from input_cache import InputFileCache, default_cache
+from output_writer import write_output, get_output_format, OUTPUT_FORMATS
+from run_report import RunReport
+from duckdb_backend import DuckDBCompileDatabase, DuckDBFinalTable, DEFAULT_MEMORY_LIMIT, HAS_DUCKDB
+from polars_engine import build_final_frame, HAS_POLARS
+from sort_index import merged_sort_order, save_sort_index
+from final_schema import to_typed_frame, to_file_values, memory_usage_mb
+from date_normalization import parse_date_column, merge_date_reports, log_date_report
+from incremental_store import (IncrementalCompileStore, STORE_ROW_COLUMN, IDENTITY_KEY_COLUMN,
+                               IDENTITY_ROOT_COLUMN, STORE_COLUMNS)
+from duplicate_detection import (build_base_transaction_keys, build_base_link_keys, build_matched_transaction_keys,
+                                 find_duplicate_transactions, flag_duplicates)
+
+PLATFORM_CONFIG_FILE = 'platform_config.json'
+DEFAULT_COMPILE_STORE_DIR = os.path.join(os.getcwd(), 'compile_store')
+
+FINAL_COLUMNS = [
+    'Relationship ID', 'Transaction ID', 'Giving Platform', 'Secondary ID',
+    'Date Clean', 'Amount', 'Is Recurring', 'Recipient', 'Contribution Form URL',
+    'Display Name', 'Donor First Name', 'Donor Last Name', 'Donor Address Line 1',
+    'Donor City', 'Donor State', 'Donor ZIP', 'Donor Country', 'Donor Occupation',
+    'Donor Employer', 'Donor Email', 'Donor Phone', 'Recurring ID',
+    'Initial Recurring Contribution Date', 'Match?'
+]
+FINAL_SORT_COLUMNS = ['Date Clean', 'Amount']
+BACKENDS = ['pandas', 'polars', 'duckdb']
+
+
+def default_platforms():
+    """Built-in EveryAction and ActBlue setup used when there is no platform config file."""
+    everyaction = Platform('EveryAction', '*.xlsx', 'Date Received', 'Amount', 'VANID', 'ActBlue ID', True, 'Personal Email')
+    everyaction.column_mapping = {
+        'Transaction ID': {'target': 'Contribution ID', 'default': ''},
+        'Secondary ID': {'target': 'ActBlue ID', 'default': ''},
+        'Date Clean': {'target': 'Date Received', 'default': ''},
+        'Recipient': {'target': 'Designation', 'default': ''},
+        'Donor First Name': {'target': 'First Name', 'default': ''},
+        'Donor Last Name': {'target': 'Last Name', 'default': ''},
+        'Donor Address Line 1': {'target': 'Home Street Address', 'default': ''},
+        'Donor City': {'target': 'Home City', 'default': ''},
+        'Donor State': {'target': 'Home State/Province', 'default': ''},
+        'Donor ZIP': {'target': 'Home Zip/Postal', 'default': ''},
+        'Donor Country': {'target': 'Home Country', 'default': ''},
+        'Donor Email': {'target': 'Personal Email', 'default': ''},
+        'Donor Phone': {'target': 'Home Phone', 'default': ''},
+        'Initial Recurring Contribution Date': {'target': 'Start Date', 'default': ''},
+        'Is Recurring': {'target': 'Is Recurring Commitment', 'default': 'FALSE'},
+        'Recurring ID': {'target': 'Recurring Commitment ID', 'default': ''},
+
+    }
+
+    actblue = Platform('ActBlue', '*.xlsx', 'Paid At', 'Amount', 'Order Number', 'Lineitem ID', False, 'Donor Email')
+    actblue.column_mapping = {
+        'Transaction ID': {'target': 'Lineitem ID', 'default': ''},
+        'Secondary ID': {'target': 'Order Number', 'default': ''},
+        'Date Clean': {'target': 'Paid At', 'default': ''},
+        'Recipient': {'target': 'Recipient', 'default': ''},
+        'Contribution Form URL': {'target': 'Contribution Form URL', 'default': ''},
+        'Donor First Name': {'target': 'Donor First Name', 'default': ''},
+        'Donor Last Name': {'target': 'Donor Last Name', 'default': ''},
+        'Donor Address Line 1': {'target': 'Donor Address Line 1', 'default': ''},
+        'Donor City': {'target': 'Donor City', 'default': ''},
+        'Donor State': {'target': 'Donor State', 'default': ''},
+        'Donor ZIP': {'target': 'Donor ZIP', 'default': ''},
+        'Donor Country': {'target': 'Donor Country', 'default': ''},
+        'Donor Occupation': {'target': 'Donor Occupation', 'default': ''},
+        'Donor Employer': {'target': 'Donor Employer', 'default': ''},
+        'Donor Email': {'target': 'Donor Email', 'default': ''},
+        'Donor Phone': {'target': 'Donor Phone', 'default': ''},
+        'Initial Recurring Contribution Date': {'target': 'Initial Recurring Contribution Date', 'default': ''},
+        'Is Recurring': {'target': 'Is Recurring', 'default': 'FALSE'},
+        'Recurring ID': {'target': 'N/A', 'default': ''},  # Don't map Recurring ID - we'll set it manually
+    }
+
+    return {
+        'EveryAction': everyaction,
+        'ActBlue': actblue
+    }
+
+
+def load_platforms(config_path=PLATFORM_CONFIG_FILE):
+    """Load Platform instances from the JSON platform config, keyed by name."""
+    try:
+        with open(config_path, 'r') as f:
+            platforms_data = json.load(f)
+    except FileNotFoundError:
+        logging.info("No platform configuration file found. Using default platforms.")
+        return default_platforms()
+
+    platforms = {}
+    for platform_data in platforms_data:
+        platform = Platform.from_dict(platform_data)
+        platforms[platform.name] = platform
+    logging.info("Platforms loaded successfully")
+    return platforms
+
+
+def find_input_files(platform, location):
+    """Expand a file, directory or glob into a sorted list of input files for platform.
+
+    Directories are searched with the platform's file_pattern.
+    """
+    pattern = os.path.join(location, platform.file_pattern or '*.xlsx') if os.path.isdir(location) else location
+    files = sorted(path for path in glob.glob(pattern) if os.path.isfile(path))
+    # Skip Excel lock files left behind by open workbooks
+    return [path for path in files if not os.path.basename(path).startswith('~$')]
+
+
+def parse_recurring_flags(values):
+    """Boolean recurring flag per row of an 'Is Recurring' column.
+
+    Text is recurring when it reads 'TRUE' in any case and blank cells are
+    not recurring; anything else goes by its truthiness. Files that fill the
+    column and files that leave it blank concatenate to a column mixing all three.
+    """
+    values = values.astype(object)
+    is_string = values.map(lambda value: isinstance(value, str)).astype(bool)
+    is_other = values.notna() & ~is_string
+    is_recurring = np.zeros(len(values), dtype=bool)
+    is_recurring[is_other.to_numpy()] = values[is_other].astype(bool).to_numpy()
+    is_recurring[is_string.to_numpy()] = (values[is_string].str.upper() == 'TRUE').to_numpy()
+    return pd.Series(is_recurring, index=values.index)
+
+
+class TransactionCompilePipeline:
+    """Reads platform exports, resolves Relationship IDs, flags duplicates and writes the final file.
+
+    progress_callback, if given, is called as progress_callback(percent, message).
+    fuzzy_match_threshold, if given, links donors without an email or ID whose
+    name and address are at least that similar (see record_linkage).
+    backend 'polars' builds the final file as one multi-threaded lazy query (see
+    polars_engine); 'duckdb' runs full compiles out of core against the
+    inputs staged in DuckDB (see compile_out_of_core and duckdb_backend).
+    input_cache is the InputFileCache the input files are read through, in
+    every reader process (default_cache if None).
+    """
+
+    def __init__(self, platforms, progress_callback=None, ingest_workers=DEFAULT_MAX_WORKERS,
+                 compile_store_dir=DEFAULT_COMPILE_STORE_DIR, output_format=None, fuzzy_match_threshold=None,
+                 backend='pandas', backend_memory_limit=DEFAULT_MEMORY_LIMIT, input_cache=None):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown backend '{backend}'. Use one of: {', '.join(BACKENDS)}")
+        if backend == 'duckdb' and not HAS_DUCKDB:
+            raise ImportError("The DuckDB backend requires duckdb. Install it or use the pandas backend.")
+        if backend == 'polars' and not HAS_POLARS:
+            raise ImportError("The Polars backend requires polars. Install it or use the pandas backend.")
+        if backend == 'duckdb' and fuzzy_match_threshold is not None:
+            # Fuzzy linking compares every fallback donor with every other, so they would all be in memory
+            raise ValueError("Fuzzy matching is not available with the duckdb backend")
+        self.platforms = platforms
+        self.progress_callback = progress_callback
+        self.ingest_workers = ingest_workers
+        self.compile_store_dir = compile_store_dir
+        self.output_format = output_format  # None picks the format from the output file extension
+        self.fuzzy_match_threshold = fuzzy_match_threshold
+        self.backend = backend
+        self.backend_memory_limit = backend_memory_limit
+        self.input_cache = input_cache or default_cache
+        self.duplicate_matches = None  # Explains every base row flagged as a duplicate
+        self.identity_resolver = None
+        self.transaction_keys = None
+        self.changed_identity_roots = set()
+        self.run_report = RunReport()
+
+    def report_progress(self, percent, message=''):
+        if self.progress_callback:
+            self.progress_callback(percent, message)
+
+    def run(self, input_files, output_file, incremental=False):
+        """Compile input_files (platform name -> list of paths) into output_file and return the final frame.
+
+        With the duckdb backend the returned table is already closed; only its length is left.
+        """
+        logging.info("Processing files")
+        report = self.run_report = RunReport()
+        report.details = {'output_file': output_file, 'incremental': incremental, 'status': 'failed',
+                          'backend': self.backend,
+                          'input_files': {name: list(files) for name, files in input_files.items()}}
+        final_df = None
+        try:
+            if self.backend == 'duckdb' and not incremental:
+                # Reading, transaction values and the final file all run against the staged inputs
+                final_df = self.compile_out_of_core(input_files)
+            else:
+                # Read and combine input files
+                with report.stage("read files") as stage:
+                    platform_dfs = read_platform_files(input_files, max_workers=self.ingest_workers,
+                                                       progress_callback=self.report_file_progress,
+                                                       reader=cached_reader(self.input_cache),
+                                                       columns=self.get_required_columns(input_files))
+                    stage['rows_out'] = sum(len(df) for df in platform_dfs.values())
+
+                if incremental:
+                    if self.backend == 'duckdb':
+                        logging.warning("Incremental compiles do not use the duckdb backend; using pandas")
+                    final_df = self.compile_incremental(platform_dfs)
+                else:
+                    # Generate Transaction Values (Relationship IDs)
+                    logging.info("Generating transaction values")
+                    platform_dfs = self.generate_transaction_values(platform_dfs)
+                    self.report_progress(60, "generated transaction values")
+
+                    # Process data
+                    logging.info("Creating final file")
+                    final_df = self.create_final_file(platform_dfs)
+            self.report_progress(80, "created final file")
+
+            # Save the result
+            logging.info(f"Saving file to: {output_file}")
+            with report.stage("save output", rows_in=len(final_df)):
+                self.save_output_file(final_df, output_file)
+            with report.stage("save duplicate matches", rows_in=len(self.duplicate_matches)):
+                self.save_duplicate_matches(self.duplicate_matches, output_file)
+            if not isinstance(final_df, DuckDBFinalTable):
+                with report.stage("save sort index", rows_in=len(final_df)):
+                    self.save_sort_index(final_df, output_file)
+            report.details['status'] = 'completed'
+            report.details['rows_out'] = len(final_df)
+            self.report_progress(100, "done")
+            return final_df
+        finally:
+            if isinstance(final_df, DuckDBFinalTable):
+                final_df.close()
+            report.log_summary()
+            self.save_run_report(output_file)
+
+    def save_run_report(self, output_file):
+        """Write the run report as JSON next to the final file."""
+        report_file = f"{os.path.splitext(output_file)[0]} - Run Report.json"
+        try:
+            self.run_report.save(report_file)
+        except Exception as e:
+            # A missing report must not hide the outcome of the run itself
+            logging.error(f"Error saving run report to: {report_file}")
+            logging.error(str(e))
+
+    def get_required_columns(self, input_files):
+        """Source columns to read per platform; everything else in the exports is skipped."""
+        # Raw columns that already carry a final column's name pass straight through to the output
+        extra_columns = FINAL_COLUMNS + FALLBACK_ID_COLUMNS + ['Is Recurring Commitment']
+        return {name: self.platforms[name].get_required_columns(extra_columns) for name in input_files}
+
+    def report_file_progress(self, file_path, files_done, total_files, error):
+        status = "failed" if error else "read"
+        logging.info(f"File {files_done}/{total_files} {status}: {os.path.basename(file_path)}")
+        self.report_progress(int(20 * files_done / total_files), f"{status} {os.path.basename(file_path)}")
+
+    def save_output_file(self, df, file_path):
+        """Write the final file as xlsx, CSV or Parquet (by output_format or the file extension)."""
+        def report_rows(rows_written, total_rows):
+            self.report_progress(80 + int(19 * rows_written / max(total_rows, 1)), f"wrote {rows_written}/{total_rows} rows")
+
+        try:
+            if isinstance(df, DuckDBFinalTable) and get_output_format(file_path, self.output_format) == 'parquet':
+                df.write_parquet(file_path)
+            elif isinstance(df, DuckDBFinalTable):
+                write_output(df, file_path, output_format=self.output_format, progress_callback=report_rows,
+                             prepare_chunk=lambda chunk: to_file_values(self.restore_staged_rows(chunk)))
+            else:
+                write_output(df, file_path, output_format=self.output_format, progress_callback=report_rows,
+                             prepare_chunk=to_file_values)
+            logging.info(f"Successfully saved file to: {file_path}")
+        except Exception as e:
+            logging.error(f"Error saving file to: {file_path}")
+            logging.error(str(e))
+            logging.error(traceback.format_exc())
+            raise
+
+    def compile_incremental(self, platform_dfs):
+        """Merge newly read platform files into the compile store and return the full final frame.
+
+        Only the new rows go through the compile phases. Stored rows are kept
+        as they are, except that rows whose identity component gained new keys
+        get their Relationship ID rewritten and stored base rows that duplicate
+        a new transaction are dropped.
+        """
+        logging.info(f"Running incremental compile against store: {self.compile_store_dir}")
+        report = self.run_report
+        store = IncrementalCompileStore(self.compile_store_dir)
+        with report.stage("load compile store") as stage:
+            has_history = store.load()
+            stage['rows_out'] = len(store.rows) if has_history else 0
+
+        base_platform = next(platform for platform in self.platforms.values() if platform.is_base_platform())
+        if base_platform.get_platform_name() not in platform_dfs:
+            platform_dfs[base_platform.get_platform_name()] = self._empty_platform_frame(base_platform)
+
+        # Give every new row a row number that is unique across the whole store
+        next_row_id = store.next_row_id()
+        for df in platform_dfs.values():
+            df.index = pd.RangeIndex(next_row_id, next_row_id + len(df))
+            next_row_id += len(df)
+
+        platform_dfs = self.generate_transaction_values(platform_dfs, resolver=store.resolver,
+                                                        stored_keys=store.transaction_keys)
+        resolver = self.identity_resolver
+        new_keys = self.transaction_keys
+        self.report_progress(60)
+
+        for df in platform_dfs.values():
+            df[STORE_ROW_COLUMN] = df.index
+        new_rows = self.create_final_file(platform_dfs, extra_columns=[STORE_ROW_COLUMN, IDENTITY_KEY_COLUMN])
+        new_rows[IDENTITY_ROOT_COLUMN] = self._find_identity_roots(resolver, new_rows[IDENTITY_KEY_COLUMN])
+        base_keys = new_keys['base_keys'][~new_keys['base_keys']['Base Row'].isin(self.duplicate_matches['Base Row'])]
+        matched_keys = new_keys['matched_keys']
+
+        report.start("merge with compile store", rows_in=len(new_rows))
+        if has_history:
+            stored_rows = store.rows
+            stored_keys = store.transaction_keys
+
+            base_links = pd.concat([stored_keys['base_links'], new_keys['base_links']], ignore_index=True).drop_duplicates()
+            matched_keys = pd.concat([stored_keys['matched_keys'], matched_keys], ignore_index=True)
+
+            # Stored base rows can only become duplicates through base IDs the new keys link to
+            affected_ids = set(new_keys['base_links']['Base ID'])
+            if not new_keys['matched_keys'].empty:
+                affected_ids.update(new_keys['matched_keys'].merge(base_links, on='Matched Key')['Base ID'])
+            candidate_keys = stored_keys['base_keys'][stored_keys['base_keys']['Base ID'].isin(affected_ids)]
+            stored_matches = find_duplicate_transactions(base_platform, candidate_keys, base_links, matched_keys)
+            if not stored_matches.empty:
+                logging.info(f"Removing {stored_matches['Base Row'].nunique()} stored rows duplicated by new transactions")
+                stored_rows = stored_rows[~stored_rows[STORE_ROW_COLUMN].isin(stored_matches['Base Row'])]
+                self.duplicate_matches = pd.concat([self.duplicate_matches, stored_matches], ignore_index=True)
+            stored_base_keys = stored_keys['base_keys'][~stored_keys['base_keys']['Base Row'].isin(stored_matches['Base Row'])]
+
+            stored_rows = self._relabel_changed_identities(stored_rows, resolver)
+            base_keys = pd.concat([stored_base_keys, base_keys], ignore_index=True)
+            final_df = pd.concat([stored_rows, new_rows], ignore_index=True)
+            # Categoricals with different categories concatenate as plain text
+            final_df = self.sort_final_rows(to_typed_frame(final_df), [len(stored_rows), len(new_rows)])
+        else:
+            base_links = new_keys['base_links']
+            final_df = new_rows
+
+        report.end(len(final_df))
+
+        with report.stage("save compile store", rows_in=len(final_df)):
+            store.save(resolver, final_df,
+                       {'base_keys': base_keys, 'base_links': base_links, 'matched_keys': matched_keys},
+                       next_row_id, self.platforms.keys())
+        return final_df.drop(columns=STORE_COLUMNS)
+
+    def _relabel_changed_identities(self, rows, resolver):
+        """Rewrite the Relationship ID of stored rows whose identity component changed."""
+        changed = rows[IDENTITY_ROOT_COLUMN].isin(self.changed_identity_roots)
+        if not changed.any():
+            return rows
+
+        rows = rows.copy()
+        old_roots = rows.loc[changed, IDENTITY_ROOT_COLUMN]
+        new_roots = {root: resolver.find(root) for root in old_roots.unique()}
+        relationship_ids = old_roots.map({root: resolver.resolve(root) for root in new_roots})
+
+        # Components that still have no base platform ID keep their fallback IDs
+        has_id = relationship_ids.notna()
+        rows.loc[changed, IDENTITY_ROOT_COLUMN] = old_roots.map(new_roots)
+        # New IDs are not in the stored categories; the merged rows are typed again afterwards
+        stored_ids = rows['Relationship ID'].astype(object)
+        stored_ids[relationship_ids[has_id].index] = self.normalize_relationship_ids(relationship_ids[has_id]).astype(object)
+        rows['Relationship ID'] = stored_ids
+        logging.info(f"Rewrote Relationship IDs of {int(has_id.sum())} stored rows in {len(new_roots)} changed identities")
+        return rows
+
+    def _find_identity_roots(self, resolver, identity_keys):
+        """Map each row's identity key to the root of its component."""
+        roots = {key: resolver.find(key) for key in identity_keys.dropna().unique() if key in resolver}
+        return identity_keys.map(roots)
+
+    def _empty_platform_frame(self, platform):
+        columns = [platform.get_id_field(), platform.get_date_field(), platform.get_amount_field(),
+                   platform.relationship_id_key, platform.get_identity_link_field()]
+        return pd.DataFrame(columns=list(dict.fromkeys(col for col in columns if col)))
+
+    def save_duplicate_matches(self, match_table, output_file):
+        """Write the duplicate match table next to the final file."""
+        matches_file = f"{os.path.splitext(output_file)[0]} - Duplicate Matches.csv"
+        try:
+            match_table.to_csv(matches_file, index=False)
+            logging.info(f"Saved {len(match_table)} duplicate matches to: {matches_file}")
+        except Exception as e:
+            logging.error(f"Error saving duplicate matches to: {matches_file}")
+            logging.error(str(e))
+            logging.error(traceback.format_exc())
+            raise
+
+    def generate_transaction_values(self, platform_dfs, resolver=None, stored_keys=None):
+        """Resolve Relationship IDs and flag duplicates for the given platform frames.
+
+        An existing resolver and the stored transaction keys of earlier runs can
+        be passed in for an incremental compile; new keys are merged into them.
+        """
+        logging.info("Generating transaction values")
+        try:
+            base_platform = next(platform for platform in self.platforms.values() if platform.is_base_platform())
+            base_name = base_platform.get_platform_name()
+            base_df = platform_dfs[base_name]
+            other_platforms = [(name, self.platforms[name], df) for name, df in platform_dfs.items() if name != base_name]
+
+            report = self.run_report
+            total_rows = sum(len(df) for df in platform_dfs.values())
+
+            with report.stage("transaction values: parse dates", rows_in=total_rows) as stage:
+                self.parse_platform_dates(platform_dfs)
+                stage['rows_out'] = total_rows
+
+            # PHASE 1: Build key columns
+            logging.info("Phase 1: Building key columns")
+            report.start("transaction values: build key columns", rows_in=total_rows)
+            base_primary_keys = base_platform.get_relationship_id_keys(base_df)
+            base_secondary_keys = base_platform.get_identity_link_keys(base_df)
+            base_ids = base_df[base_platform.get_id_field()]
+            base_id_keys = base_platform.get_id_keys(base_df)
+
+            other_keys = {}
+            for platform_name, platform, df in other_platforms:
+                other_keys[platform_name] = (platform.get_relationship_id_keys(df), platform.get_identity_link_keys(df))
+            report.end(total_rows)
+            self.report_progress(40)
+
+            # PHASE 2: Resolve identities with a union-find over email, secondary ID and base ID keys
+            logging.info("Phase 2: Resolving donor identities")
+            report.start("transaction values: resolve identities", rows_in=total_rows)
+            if resolver is None:
+                resolver = IdentityResolver()
+
+            base_links = self.base_identity_links(base_ids, base_id_keys, base_primary_keys, base_secondary_keys)
+
+            # Remember which existing components the new keys touch before they get merged
+            self.changed_identity_roots = set()
+            if len(resolver):
+                new_keys = set(base_links['id_key']) | set(base_links['primary_key']) | set(base_links['secondary_key'])
+                for primary_keys, secondary_keys in other_keys.values():
+                    new_keys.update(primary_keys.unique())
+                    new_keys.update(secondary_keys.unique())
+                self.changed_identity_roots = {resolver.find(key) for key in new_keys if key in resolver}
+
+            self.link_base_identities(resolver, base_links)
+            self.report_progress(50)
+
+            for platform_name, (primary_keys, secondary_keys) in other_keys.items():
+                self.link_other_identities(resolver, self.other_identity_links(primary_keys, secondary_keys))
+            self.report_progress(60)
+
+            logging.info(f"Resolved {len(resolver)} identity keys")
+            report.end(len(resolver))
+
+            # PHASE 3: Apply final relationship IDs to all rows
+            logging.info("Phase 3: Applying final relationship IDs to all rows")
+            report.start("transaction values: apply relationship ids", rows_in=total_rows)
+
+            self.apply_base_relationship_ids(resolver, base_df, base_ids, base_id_keys, base_primary_keys,
+                                             base_secondary_keys)
+            self.report_progress(70)
+
+            # Apply to other platforms
+            fallback_rows = {}
+            for platform_name, platform, df in other_platforms:
+                no_key = self.apply_other_relationship_ids(resolver, df, *other_keys[platform_name])
+                if no_key.any():
+                    fallback_rows[platform_name] = no_key
+            report.end(total_rows)
+
+            if self.fuzzy_match_threshold is not None and fallback_rows:
+                self.link_fallback_donors(platform_dfs, fallback_rows)
+            self.report_progress(75)
+
+            # Find base platform transactions that also appear on another platform
+            logging.info("Detecting duplicate transactions across platforms")
+            report.start("transaction values: detect duplicates", rows_in=total_rows)
+            base_keys = build_base_transaction_keys(base_df, base_platform)
+            base_links = build_base_link_keys(base_ids, [base_primary_keys, base_secondary_keys])
+            matched_keys = pd.concat([
+                build_matched_transaction_keys(df, platform, {
+                    'Relationship Key': other_keys[platform_name][0],
+                    'ID': other_keys[platform_name][1]
+                })
+                for platform_name, platform, df in other_platforms
+            ], ignore_index=True) if other_platforms else pd.DataFrame()
+            self.identity_resolver = resolver
+            self.transaction_keys = {'base_keys': base_keys, 'base_links': base_links, 'matched_keys': matched_keys}
+            if stored_keys is not None:
+                # Earlier runs' keys take part in matching the new base rows
+                base_links = pd.concat([stored_keys['base_links'], base_links], ignore_index=True).drop_duplicates()
+                matched_keys = pd.concat([stored_keys['matched_keys'], matched_keys], ignore_index=True)
+            self.duplicate_matches = find_duplicate_transactions(base_platform, base_keys, base_links, matched_keys)
+            flag_duplicates(base_df, base_platform, self.duplicate_matches)
+            report.end(len(self.duplicate_matches))
+
+            # Handle additional processing for each platform
+            report.start("transaction values: recurring flags", rows_in=total_rows)
+            for platform_name, platform, df in other_platforms:
+                self.set_recurring_ids(platform, df)
+            self.set_commitment_flags(base_df)
+            report.end(total_rows)
+
+            logging.info("Transaction values generation completed")
+            return platform_dfs
+
+        except Exception as e:
+            logging.error("Error in generate_transaction_values function")
+            logging.error(str(e))
+            logging.error(traceback.format_exc())
+            raise
+
+    def base_identity_links(self, base_ids, id_keys, primary_keys, secondary_keys):
+        """The distinct (base ID, ID key, relationship key, secondary key) combinations on base platform rows."""
+        return pd.DataFrame({
+            'id_value': base_ids.astype(str).where(base_ids.notna()),
+            'id_key': id_keys,
+            'primary_key': primary_keys,
+            'secondary_key': secondary_keys
+        }).drop_duplicates()
+
+    def other_identity_links(self, primary_keys, secondary_keys):
+        """The distinct (relationship key, ID key) pairs on another platform's rows."""
+        return pd.DataFrame({'primary_key': primary_keys, 'secondary_key': secondary_keys}).drop_duplicates()
+
+    def link_base_identities(self, resolver, links):
+        """Base platform rows link their relationship key, secondary ID and base ID together."""
+        for id_value, id_key, primary_key, secondary_key in zip(
+                links['id_value'], links['id_key'], links['primary_key'], links['secondary_key']):
+            if id_key:
+                resolver.add_relationship_id(id_key, id_value)
+            resolver.union_keys([id_key, primary_key, secondary_key])
+
+    def link_other_identities(self, resolver, links):
+        """Other platforms link their relationship key with their ID."""
+        for primary_key, secondary_key in zip(links['primary_key'], links['secondary_key']):
+            resolver.union_keys([primary_key, secondary_key])
+
+    def apply_base_relationship_ids(self, resolver, base_df, base_ids, id_keys, primary_keys, secondary_keys):
+        """Set the Relationship ID of base platform rows; every key on a row belongs to the same component."""
+        row_keys = primary_keys.where(primary_keys != '', secondary_keys)
+        row_keys = row_keys.where(row_keys != '', id_keys)
+        relationship_ids = self._resolve_keys(resolver, row_keys)
+        base_df['Relationship ID'] = relationship_ids.where(relationship_ids.notna(), base_ids)
+        base_df['Identity Key'] = row_keys.where(row_keys != '', None)
+
+    def apply_other_relationship_ids(self, resolver, df, primary_keys, secondary_keys):
+        """Set the Relationship ID of another platform's rows and return the mask of rows on a fallback ID."""
+        row_keys = primary_keys.where(primary_keys != '', secondary_keys)
+        relationship_ids = self._resolve_keys(resolver, row_keys)
+
+        # Handle cases where no match is found
+        unmatched = relationship_ids.isna()
+        relationship_ids[unmatched] = primary_keys[unmatched]
+        no_key = unmatched & (primary_keys == '')
+        if no_key.any():
+            relationship_ids[no_key] = generate_fallback_ids(df.loc[no_key])
+        df['Relationship ID'] = relationship_ids
+        df['Identity Key'] = row_keys.where(row_keys != '', None)
+        return no_key
+
+    def set_recurring_ids(self, platform, df):
+        """Parse another platform's 'Is Recurring' flags and give recurring rows their ID as Recurring ID."""
+        # Handle ActBlue recurring donations; strings are compared to 'TRUE', everything else by truthiness
+        values = df['Is Recurring'] if 'Is Recurring' in df.columns else pd.Series(False, index=df.index)
+        df['Is Recurring'] = parse_recurring_flags(values)
+        is_recurring = df['Is Recurring']
+
+        order_numbers = df[platform.get_id_field()]  # This is Order Number for ActBlue
+        recurring_mask = is_recurring & order_numbers.notna() & (order_numbers != '')
+        if recurring_mask.any():
+            if 'Recurring ID' not in df.columns:
+                df['Recurring ID'] = pd.Series(index=df.index, dtype=object)
+            df.loc[recurring_mask, 'Recurring ID'] = order_numbers[recurring_mask]
+
+    def set_commitment_flags(self, base_df):
+        """Turn the base platform's 1/0 'Is Recurring Commitment' values into True/False."""
+        # Handle EveryAction recurring flag
+        commitments = base_df.get('Is Recurring Commitment', pd.Series(0, index=base_df.index))
+        recurring_flags = commitments.astype(object)
+        recurring_flags[commitments == 1] = True
+        recurring_flags[commitments == 0] = False
+        base_df['Is Recurring Commitment'] = recurring_flags
+
+    def link_fallback_donors(self, platform_dfs, fallback_rows):
+        """Give donors on fallback IDs that look like the same person one Relationship ID, across platforms.
+
+        fallback_rows maps platform name -> mask of the rows on a fallback ID.
+        """
+        donors = pd.concat([platform_dfs[name].loc[mask] for name, mask in fallback_rows.items()], ignore_index=True)
+        with self.run_report.stage("transaction values: link fallback donors", rows_in=len(donors)) as stage:
+            links = link_fallback_donors(donors, donors['Relationship ID'], self.fuzzy_match_threshold)
+            for name, mask in fallback_rows.items():
+                df = platform_dfs[name]
+                fallback_ids = df.loc[mask, 'Relationship ID']
+                df.loc[mask, 'Relationship ID'] = fallback_ids.map(links).fillna(fallback_ids)
+            stage['rows_out'] = len(links)
+        self.run_report.details['linked_fallback_donors'] = len(links)
+
+    def parse_platform_dates(self, platform_dfs):
+        """Replace each platform's date columns with parsed datetime64 columns, in place.
+
+        Every later stage reads the parsed columns instead of parsing the text
+        again. What could not be parsed is logged and kept in the run report.
+        """
+        date_reports = self.run_report.details.setdefault('date_parsing', {})
+        for platform_name, df in platform_dfs.items():
+            for field, date_format in self.platforms[platform_name].get_date_formats().items():
+                if field not in df.columns:
+                    continue
+                df[field], date_report = parse_date_column(df[field], date_format)
+                log_date_report(platform_name, field, date_report)
+                date_reports.setdefault(platform_name, {})[field] = date_report
+
+    def _resolve_keys(self, resolver, keys):
+        """Resolve each distinct key once and map the results back onto the rows."""
+        resolved = {key: resolver.resolve(key) for key in keys.unique()}
+        return keys.map(resolved).astype(object)
+
+    def process_platform_data(self, platform, df, output_columns):
+        """Narrow frame with output_columns for one platform, built by the platform's transform plan."""
+        return platform.build_transform_plan(output_columns).apply(df)
+
+    def normalize_relationship_ids(self, relationship_ids):
+        """Convert Relationship IDs to numbers where possible, keeping the rest as strings.
+
+        Returns them as a categorical. Each distinct ID is converted once and
+        the rows only get its integer code.
+        """
+        codes, unique_ids = pd.factorize(relationship_ids)
+        unique_ids = pd.Series(unique_ids, dtype=object)
+        numeric_ids = pd.to_numeric(unique_ids, errors='coerce')
+        if (codes == -1).any() and pd.api.types.is_integer_dtype(numeric_ids):
+            # Missing IDs make the converted column float, as converting every row did
+            numeric_ids = numeric_ids.astype('float64')
+        unique_ids = numeric_ids.astype(object).where(numeric_ids.notna(), unique_ids)
+
+        # IDs that convert to the same number ('0123' and '123') share a category
+        id_table = pd.Categorical(unique_ids, categories=self._sorted_id_categories(unique_ids, numeric_ids))
+        row_codes = np.append(id_table.codes, -1)[codes]  # Missing IDs have code -1, which picks the -1
+        return pd.Series(pd.Categorical.from_codes(row_codes, categories=id_table.categories),
+                         index=relationship_ids.index, name=relationship_ids.name)
+
+    def _sorted_id_categories(self, unique_ids, numeric_ids):
+        """Distinct IDs in the order pandas sorts them: numbers first, then text.
+
+        Sorting the numbers and the text apart skips pandas' failed attempt
+        to sort the mix as one; None lets pandas order anything else.
+        """
+        is_number = numeric_ids.notna().to_numpy()
+        if is_number.all() or not is_number.any():
+            return None
+        try:
+            return np.concatenate([np.sort(numeric_ids[is_number].unique()).astype(object),
+                                   np.sort(unique_ids[~is_number].unique())])
+        except TypeError:
+            return None
+
+    def create_final_file(self, platform_dfs, extra_columns=()):
+        logging.info("Creating final file")
+        try:
+            report = self.run_report
+            output_columns = FINAL_COLUMNS + list(extra_columns)
+            if self.backend == 'polars':
+                return self.create_final_file_lazily(platform_dfs, output_columns)
+            final_dfs = []
+            for platform_name, df in platform_dfs.items():
+                platform_obj = self.platforms[platform_name]
+                with report.stage(f"process data: {platform_name}", rows_in=len(df)) as stage:
+                    processed_df = self.process_platform_data(platform_obj, df, output_columns)
+                    stage['rows_out'] = len(processed_df)
+                final_dfs.append(processed_df)
+
+            # Combine the processed dataframes
+            logging.info("Combining processed dataframes")
+            report.start("create final file", rows_in=sum(len(df) for df in final_dfs))
+            final_df = pd.concat(final_dfs, ignore_index=True)
+            self.report_progress(75)
+            final_df = self.finish_final_rows(final_df)
+            report.end(len(final_df))
+
+            # Sort the final dataframe
+            logging.info("Sorting final dataframe")
+            with report.stage("sort final file", rows_in=len(final_df)) as stage:
+                final_df = self.sort_final_rows(final_df, [len(df) for df in final_dfs])
+                stage['rows_out'] = len(final_df)
+            self.report_progress(80)
+
+            logging.info("Final file created successfully")
+            return final_df
+
+        except Exception as e:
+            logging.error("Error in create_final_file function")
+            logging.error(str(e))
+            logging.error(traceback.format_exc())
+            raise
+
+    def sort_final_rows(self, final_df, run_lengths):
+        """final_df in FINAL_SORT_COLUMNS order, merging its runs of run_lengths rows (one per platform).
+
+        Falls back to a global sort when the sort columns are not all dates and numbers.
+        """
+        order = merged_sort_order(final_df['Date Clean'], final_df['Amount'], run_lengths)
+        if order is None:
+            return final_df.sort_values(by=FINAL_SORT_COLUMNS)
+        return final_df.take(order)
+
+    def save_sort_index(self, final_df, output_file):
+        """Save the donor order of the written rows for the Giving Dashboard; a missing index only costs a sort."""
+        try:
+            save_sort_index(final_df, output_file, FINAL_SORT_COLUMNS)
+        except Exception as e:
+            logging.error(f"Error saving sort index for: {output_file}")
+            logging.error(str(e))
+
+    def finish_final_rows(self, final_df):
+        """Normalize IDs, drop invalid emails and type the combined final rows."""
+        final_df['Relationship ID'] = self.normalize_relationship_ids(final_df['Relationship ID'])
+
+        # Set invalid email values to null
+        final_df.loc[~final_df['Donor Email'].str.contains('@', na=False), 'Donor Email'] = None
+
+        # Categories are only shared once the platforms are combined
+        final_df = to_typed_frame(final_df)
+        self.run_report.details['final_memory_mb'] = memory_usage_mb(final_df)
+        return final_df
+
+    def create_final_file_lazily(self, platform_dfs, output_columns):
+        """create_final_file for the polars backend: projection, concat and sort run as one Polars query."""
+        report = self.run_report
+        plans = {name: self.platforms[name].build_transform_plan(output_columns) for name in platform_dfs}
+        rows_in = sum(len(df) for df in platform_dfs.values())
+        with report.stage("create final file: polars query", rows_in=rows_in) as stage:
+            final_df = build_final_frame(plans, platform_dfs, FINAL_SORT_COLUMNS)
+            stage['rows_out'] = len(final_df)
+        self.report_progress(75)
+        with report.stage("create final file", rows_in=len(final_df)) as stage:
+            final_df = self.finish_final_rows(final_df)
+            stage['rows_out'] = len(final_df)
+        self.report_progress(80)
+        logging.info("Final file created successfully")
+        return final_df
+
+    def compile_out_of_core(self, input_files):
+        """Full compile for the duckdb backend; returns a DuckDBFinalTable of the sorted final rows.
+
+        Each input file is staged in DuckDB as soon as it is read, then the
+        staged rows go through the compile phases a chunk at a time in two
+        passes: the first stages every row's identity links and transaction
+        keys, which are resolved (distinct links only) and joined into the
+        duplicate match table; the second applies the Relationship IDs,
+        duplicate and recurring flags and the transform plan, and stages the
+        final rows. Gives the same rows as the pandas path, apart from
+        dtypes of columns outside the typed schema (see duckdb_backend).
+        """
+        database = DuckDBCompileDatabase(memory_limit=self.backend_memory_limit)
+        try:
+            report = self.run_report
+            with report.stage("read and stage files") as stage:
+                self.stage_input_files(database, input_files)
+                stage['rows_out'] = database.input_rows()
+            total_rows = database.input_rows()
+
+            base_platform = next(platform for platform in self.platforms.values() if platform.is_base_platform())
+            base_name = base_platform.get_platform_name()
+            if base_name not in database.inputs:
+                raise ValueError(f"A full compile needs {base_name} files")
+
+            logging.info("Phase 1: Building key columns")
+            with report.stage("transaction values: build key columns", rows_in=total_rows) as stage:
+                recurring_platforms = self.stage_transaction_keys(database, base_name)
+                stage['rows_out'] = total_rows
+            self.report_progress(40)
+
+            logging.info("Phase 2: Resolving donor identities")
+            with report.stage("transaction values: resolve identities", rows_in=total_rows) as stage:
+                resolver = IdentityResolver()
+                self.link_base_identities(resolver, database.distinct_keys('base_identity_links'))
+                self.report_progress(50)
+                self.link_other_identities(resolver, database.distinct_keys('other_identity_links'))
+                logging.info(f"Resolved {len(resolver)} identity keys")
+                stage['rows_out'] = len(resolver)
+            self.identity_resolver = resolver
+            self.changed_identity_roots = set()
+            self.report_progress(60)
+
+            logging.info("Detecting duplicate transactions across platforms")
+            with report.stage("transaction values: detect duplicates", rows_in=total_rows) as stage:
+                self.duplicate_matches = database.find_duplicate_transactions(base_platform)
+                stage['rows_out'] = len(self.duplicate_matches)
+            self.report_progress(70)
+
+            logging.info("Phase 3: Applying final relationship IDs and creating the final rows")
+            table = self.stage_final_rows(database, base_name, resolver, recurring_platforms)
+            # Typed once over all staged rows: a chunk on its own could spell one donor's ID two ways (12345 / 12345.0)
+            with report.stage("encode relationship ids", rows_in=len(table)) as stage:
+                table.encode_column('Relationship ID', self.normalize_relationship_ids)
+                stage['rows_out'] = len(table)
+            logging.info(f"Staged {len(table)} final rows")
+            return table
+
+        except Exception as e:
+            database.close()
+            logging.error("Error in compile_out_of_core function")
+            logging.error(str(e))
+            logging.error(traceback.format_exc())
+            raise
+
+    def stage_input_files(self, database, input_files):
+        """Read input_files in order and stage each file in database, with its date columns parsed, as it arrives.
+
+        A date format inferred from a platform's first file is used for the
+        rest of its files, as parsing the concatenated column would; the date
+        reports are merged per platform and column.
+        """
+        date_reports = self.run_report.details.setdefault('date_parsing', {})
+        date_formats = {name: self.platforms[name].get_date_formats() for name in input_files}
+        for platform_name, file_path, df in iter_platform_files(input_files, max_workers=self.ingest_workers,
+                                                                progress_callback=self.report_file_progress,
+                                                                reader=cached_reader(self.input_cache),
+                                                                columns=self.get_required_columns(input_files)):
+            formats = date_formats[platform_name]
+            reports = date_reports.setdefault(platform_name, {})
+            for field, date_format in formats.items():
+                if field not in df.columns:
+                    continue
+                df[field], date_report = parse_date_column(df[field], date_format)
+                formats[field] = date_report['format']
+                reports[field] = merge_date_reports(reports[field], date_report) if field in reports else date_report
+            database.stage_input(platform_name, df)
+            del df
+        for platform_name, reports in date_reports.items():
+            for field, date_report in reports.items():
+                log_date_report(platform_name, field, date_report)
+
+    def stage_transaction_keys(self, database, base_name):
+        """First duckdb pass: stage the identity links and transaction keys of every staged row.
+
+        Returns the names of the platforms with Recurring IDs once their
+        recurring flags are set, which the transform plan only knows per chunk.
+        """
+        recurring_platforms = set()
+        for platform_name in database.inputs:
+            platform = self.platforms[platform_name]
+            for chunk in database.iter_input_chunks(platform_name):
+                primary_keys = platform.get_relationship_id_keys(chunk)
+                secondary_keys = platform.get_identity_link_keys(chunk)
+                if platform_name == base_name:
+                    ids = chunk[platform.get_id_field()]
+                    database.stage_keys('base_identity_links', self.base_identity_links(
+                        ids, platform.get_id_keys(chunk), primary_keys, secondary_keys))
+                    database.stage_keys('base_keys', build_base_transaction_keys(chunk, platform))
+                    database.stage_keys('base_links', build_base_link_keys(ids, [primary_keys, secondary_keys]))
+                else:
+                    database.stage_keys('other_identity_links', self.other_identity_links(primary_keys, secondary_keys))
+                    database.stage_keys('matched_keys', build_matched_transaction_keys(chunk, platform, {
+                        'Relationship Key': primary_keys,
+                        'ID': secondary_keys
+                    }))
+                    self.set_recurring_ids(platform, chunk)
+                if 'Recurring ID' in chunk.columns and chunk['Recurring ID'].notna().any():
+                    recurring_platforms.add(platform_name)
+        return recurring_platforms
+
+    def stage_final_rows(self, database, base_name, resolver, recurring_platforms):
+        """Second duckdb pass: build the final rows of every staged row and stage them in a DuckDBFinalTable."""
+        report = self.run_report
+        table = database.create_final_table(FINAL_COLUMNS, FINAL_SORT_COLUMNS)
+        for platform_name in database.inputs:
+            platform = self.platforms[platform_name]
+            plan = platform.build_transform_plan(FINAL_COLUMNS)
+            plan.has_recurring_ids = platform_name in recurring_platforms
+            with report.stage(f"process data: {platform_name}", rows_in=database.input_rows(platform_name)) as stage:
+                rows_out = 0
+                for chunk in database.iter_input_chunks(platform_name):
+                    primary_keys = platform.get_relationship_id_keys(chunk)
+                    secondary_keys = platform.get_identity_link_keys(chunk)
+                    if platform_name == base_name:
+                        self.apply_base_relationship_ids(resolver, chunk, chunk[platform.get_id_field()],
+                                                         platform.get_id_keys(chunk), primary_keys, secondary_keys)
+                        flag_duplicates(chunk, platform, self.duplicate_matches)
+                        self.set_commitment_flags(chunk)
+                    else:
+                        self.apply_other_relationship_ids(resolver, chunk, primary_keys, secondary_keys)
+                        self.set_recurring_ids(platform, chunk)
+                    if plan.has_recurring_ids and 'Recurring ID' not in chunk.columns:
+                        # Rows of a chunk without recurring donations are blank, not defaulted
+                        chunk['Recurring ID'] = pd.Series(index=chunk.index, dtype=object)
+                    final_rows = plan.apply(chunk)
+                    final_rows.loc[~final_rows['Donor Email'].str.contains('@', na=False), 'Donor Email'] = None
+                    table.append(final_rows)
+                    rows_out += len(final_rows)
+                stage['rows_out'] = rows_out
+        self.report_progress(80)
+        return table
+
+    def restore_staged_rows(self, chunk):
+        """Staged rows read back from the duckdb backend, with the values create_final_file gives them.
+
+        Relationship IDs come back already normalized over the whole table (see compile_out_of_core).
+        """
+        return to_typed_frame(chunk)
+
+
+def emit_event(event, **fields):
+    """Write one machine-readable progress event to stdout as a JSON line."""
+    print(json.dumps({'event': event, 'time': round(time.time(), 3), **fields}, default=str), flush=True)
+
+
+def parse_input_args(input_args, platforms):
+    """Turn repeated PLATFORM=LOCATION arguments into a platform name -> files mapping."""
+    input_files = {}
+    for input_arg in input_args:
+        name, separator, location = input_arg.partition('=')
+        if not separator or name not in platforms:
+            raise ValueError(f"Invalid --input '{input_arg}'. Expected PLATFORM=PATH with PLATFORM one of: "
+                             f"{', '.join(platforms)}")
+        files = find_input_files(platforms[name], location)
+        if not files:
+            raise ValueError(f"No {name} files found for '{location}'")
+        input_files.setdefault(name, []).extend(files)
+    return input_files
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compile platform exports into the final transaction file without the GUI")
+    parser.add_argument('--config', default=PLATFORM_CONFIG_FILE, help="platform config JSON")
+    parser.add_argument('--input', action='append', required=True, metavar='PLATFORM=PATH',
+                        help="input file, directory (searched with the platform's file_pattern) or glob; repeatable")
+    parser.add_argument('--output', required=True, help="final file to write (.xlsx, .csv or .parquet)")
+    parser.add_argument('--format', choices=sorted(set(OUTPUT_FORMATS.values())),
+                        help="output format; defaults to the --output extension")
+    parser.add_argument('--incremental', action='store_true', help="merge the inputs into the compile store")
+    parser.add_argument('--store', default=DEFAULT_COMPILE_STORE_DIR, help="compile store folder for --incremental")
+    parser.add_argument('--workers', type=int, default=DEFAULT_MAX_WORKERS, help="files to read in parallel")
+    parser.add_argument('--backend', choices=BACKENDS, default='pandas',
+                        help="polars builds the final file on all cores; duckdb stages the inputs on disk and "
+                             "compiles them there a chunk at a time (full compiles only; no --fuzzy-match)")
+    parser.add_argument('--memory-limit', default=DEFAULT_MEMORY_LIMIT,
+                        help=f"memory the duckdb backend may use before spilling to disk (default {DEFAULT_MEMORY_LIMIT})")
+    parser.add_argument('--fuzzy-match', nargs='?', type=float, const=DEFAULT_MATCH_THRESHOLD, metavar='THRESHOLD',
+                        help="link donors without an email or ID by similar name and address "
+                             f"(similarity 0-1, default {DEFAULT_MATCH_THRESHOLD})")
+    parser.add_argument('--no-cache', action='store_true', help="parse every input file instead of using the input cache")
+    parser.add_argument('--log-file', help="also write the debug log to this file")
+    args = parser.parse_args(argv)
+
+    handlers = [logging.StreamHandler(sys.stderr)]
+    if args.log_file:
+        handlers.append(logging.FileHandler(args.log_file))
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s', handlers=handlers)
+
+    start_time = time.time()
+    try:
+        platforms = load_platforms(args.config)
+        input_files = parse_input_args(args.input, platforms)
+        base_name = next(name for name, platform in platforms.items() if platform.is_base_platform())
+        if not args.incremental and base_name not in input_files:
+            raise ValueError(f"A full compile needs {base_name} files")
+        emit_event('start', inputs=input_files, output=args.output, incremental=args.incremental)
+
+        pipeline = TransactionCompilePipeline(
+            platforms,
+            progress_callback=lambda percent, message: emit_event('progress', percent=percent, message=message),
+            ingest_workers=args.workers,
+            compile_store_dir=args.store,
+            output_format=args.format,
+            fuzzy_match_threshold=args.fuzzy_match,
+            backend=args.backend,
+            backend_memory_limit=args.memory_limit,
+            input_cache=InputFileCache(enabled=not args.no_cache)
+        )
+        final_df = pipeline.run(input_files, args.output, incremental=args.incremental)
+        emit_event('complete', output=args.output, rows=len(final_df),
+                   duplicates=int(pipeline.duplicate_matches['Base Row'].nunique()),
+                   seconds=round(time.time() - start_time, 2))
+        return 0
+    except Exception as e:
+        logging.error(f"Error occurred: {str(e)}")
+        logging.error(traceback.format_exc())
+        emit_event('error', message=str(e), seconds=round(time.time() - start_time, 2))
+        return 1
+
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    sys.exit(main())
@@ -1,6 +1,14 @@
+import numpy as np
 import pandas as pd
 import logging
 from abc import ABC, abstractmethod
+from date_normalization import as_dates
+
+# Source columns process_data falls back to for the display name
+CONTACT_NAME_COLUMNS = ['Contact Name', 'ContactName', 'contact_name', 'CONTACT NAME', 'Primary Contact']
+
+# Columns process_data reads directly when the export already has them
+PASSTHROUGH_COLUMNS = ['Is Recurring', 'Recurring ID', 'Reason', 'Donor First Name', 'Donor Last Name']
 
 class Platform(ABC):
     def __init__(self, name, file_pattern, date_field, amount_field, id_field, secondary_id_field, is_base_platform, relationship_id_key, has_display_name=False, date_fallback_field=None):
@@ -8,6 +16,8 @@ class Platform(ABC):
         self.sample_file_path = None  # Store path to sample file
         self.recurring_true_value = None  # Store value that indicates recurring donation
         self._recurring_values = []  # Store available recurring values
+        self.date_format = None  # strftime format of date_field; inferred from the data when not set
+        self.date_fallback_format = None  # strftime format of date_fallback_field
         self.name = name
         self.file_pattern = file_pattern
         self.date_field = date_field
@@ -19,152 +29,25 @@ class Platform(ABC):
         self.column_mapping = {}
         self.relationship_id_key = relationship_id_key
 
-    def process_data(self, df):
-        logging.info(f"Processing data for platform: {self.name}")
-        logging.info(f"Is base platform: {self._is_base_platform}")
-        logging.info(f"Relationship ID key: {self.relationship_id_key}")
-
-        # Handle date fallback if configured
-        if self.date_fallback_field and self.date_fallback_field in df.columns:
-            logging.info(f"Checking date fallback field: {self.date_fallback_field}")
-            mask = pd.isna(df[self.date_field]) | (df[self.date_field] == '')
-            df.loc[mask, self.date_field] = df.loc[mask, self.date_fallback_field]
-            logging.info(f"Applied date fallback for {mask.sum()} rows")
-
-        # Set Date Clean directly from processed date field
-        try:
-            df['Date Clean'] = pd.to_datetime(df[self.date_field]).dt.date
-            logging.info("Successfully set Date Clean field")
-        except Exception as e:
-            logging.error(f"Error setting Date Clean field: {str(e)}")
-            df['Date Clean'] = ''
-
-        # Copy amount field to Amount column
-        try:
-            df['Amount'] = df[self.amount_field]
-            logging.info("Successfully set Amount field")
-        except Exception as e:
-            logging.error(f"Error setting Amount field: {str(e)}")
-            df['Amount'] = ''
-
-        df['Giving Platform'] = self.get_platform_name()
-
-        # Initialize has_display_name if not set
-        if not hasattr(self, 'has_display_name'):
-            self.has_display_name = False
-            
-        # Initialize Display Name
-        df['Display Name'] = ''
-        
-        # Only initialize Recurring ID if it doesn't exist or is empty
-        if 'Recurring ID' not in df.columns or df['Recurring ID'].isna().all():
-            df['Recurring ID'] = ''
-            
-        # Initialize Is Recurring if it doesn't exist with proper boolean value
-        if 'Is Recurring' not in df.columns:
-            df['Is Recurring'] = False
-
-        for target_col, mapping in self.column_mapping.items():
-            source_col = mapping['target']
-            default_value = mapping['default']
-            logging.info(f"Mapping column: Target = {target_col}, Source = {source_col}")
-            
-            try:
-                if target_col == 'Recurring ID':
-                    if source_col != 'N/A':
-                        if source_col in df.columns:
-                            df[target_col] = df[source_col]
-                        else:
-                            logging.warning(f"Source column {source_col} not found for Recurring ID. Using default value \"{default_value}\"")
-                            df[target_col] = default_value
-                else:
-                    if source_col != 'N/A':
-                        if source_col in df.columns:
-                            df[target_col] = df[source_col]
-                            logging.info(f"Successfully mapped {source_col} to {target_col}")
-                        else:
-                            logging.warning(f"Source column {source_col} not found in DataFrame. Using default value \"{default_value}\" for {target_col}")
-                            df[target_col] = default_value
-                    elif target_col != 'Recurring ID':  # Don't set default for Recurring ID when source is N/A
-                        if target_col == 'Is Recurring':
-                            if self.recurring_true_value and source_col in df.columns:
-                                # Use configured recurring true value if available
-                                df[target_col] = df[source_col].astype(str) == self.recurring_true_value
-                                logging.info(f"Set Is Recurring based on value '{self.recurring_true_value}'")
-                            else:
-                                # Fall back to default TRUE/FALSE behavior
-                                bool_value = default_value.upper() == 'TRUE'
-                                df[target_col] = bool_value
-                                logging.info(f"Set Is Recurring to boolean value {bool_value}")
-                        else:
-                            df[target_col] = default_value
-                            logging.info(f"Using default value \"{default_value}\" for {target_col}")
-            except Exception as e:
-                logging.error(f"Error processing column {target_col}: {str(e)}")
-                logging.info(f"Continuing to next column")
-                continue
-
-        if self._is_base_platform:
-            duplicate_col = self.get_duplicate_column_name()
-            if duplicate_col in df.columns:
-                df = df[df[duplicate_col] != 'Duplicate']
-                logging.info(f"Filtered out duplicate entries using column: {duplicate_col}")
-            else:
-                logging.warning(f"Duplicate column {duplicate_col} not found. Skipping duplicate filtering.")
-        
-        # Store important columns that need to be preserved
-        recurring_ids = df['Recurring ID'].copy()
-
-        # Handle Match? column based on Reason column if it exists
-        df['Match?'] = 'Not a Match'  # Default value
-        if 'Reason' in df.columns:
-            df.loc[df['Reason'] == 'Match', 'Match?'] = 'Match'
+    def process_data(self, df, output_columns):
+        """Build the final-file columns for this platform's rows. See TransformPlan."""
+        return self.build_transform_plan(output_columns).apply(df)
 
-        # Handle Display Name logic after all column mappings are done
-        if not self.has_display_name:
-            logging.info("Processing display name logic")
-            
-            # Get mapped donor name fields (these will be in the final output)
-            first_name = df.get('Donor First Name', pd.Series(''))
-            last_name = df.get('Donor Last Name', pd.Series(''))
-            
-            # Create initial display name from first/last name
-            df['Display Name'] = first_name.fillna('').str.strip() + ' ' + last_name.fillna('').str.strip()
-            df['Display Name'] = df['Display Name'].str.strip()
-            
-            # Identify rows where display name is empty or just whitespace
-            empty_display_mask = (df['Display Name'].isna()) | (df['Display Name'] == '')
-            logging.debug(f"Found {empty_display_mask.sum()} rows with empty display names")
-            
-            # Try to get contact name from source data (before column mapping)
-            # Check various possible column names for contact name
-            contact_name_columns = ['Contact Name', 'ContactName', 'contact_name', 'CONTACT NAME', 'Primary Contact']
-            source_contact_name = None
-            
-            for col in contact_name_columns:
-                if col in df.columns:
-                    source_contact_name = df[col]
-                    logging.info(f"Found contact name in source column: {col}")
-                    break
-            
-            if source_contact_name is not None:
-                # Use contact name as fallback where available
-                has_contact_mask = source_contact_name.notna() & (source_contact_name != '')
-                fallback_mask = empty_display_mask & has_contact_mask
-                
-                if fallback_mask.any():
-                    logging.info(f"Using contact name as fallback for {fallback_mask.sum()} rows")
-                    df.loc[fallback_mask, 'Display Name'] = source_contact_name[fallback_mask].str.strip()
-            
-            # Log final results
-            final_empty_mask = (df['Display Name'].isna()) | (df['Display Name'] == '')
-            logging.info(f"Final count of empty display names: {final_empty_mask.sum()}")
+    def build_transform_plan(self, output_columns):
+        return TransformPlan(self, output_columns)
 
-        # Restore Recurring ID after display name processing
-        df['Recurring ID'] = recurring_ids
+    def get_required_columns(self, extra_columns=()):
+        """Source columns the compiler reads from this platform's exports.
 
-        logging.info(f"Finished processing data for platform: {self.name}")
-        return df
+        Covers the configured fields, every mapped source column and the columns
+        process_data picks up when present. Columns missing from an export are
+        simply absent from the projected read, exactly as with a full read.
+        """
+        fields = [self.date_field, self.date_fallback_field, self.amount_field, self.id_field,
+                  self.secondary_id_field, self.relationship_id_key, self.get_duplicate_column_name()]
+        mapped = [mapping['target'] for mapping in self.column_mapping.values() if mapping.get('target') != 'N/A']
+        columns = fields + mapped + CONTACT_NAME_COLUMNS + PASSTHROUGH_COLUMNS + list(extra_columns)
+        return sorted({col for col in columns if col})
 
     def get_unique_transaction_key(self, row):
         return f"{row[self.id_field]}{int(pd.to_datetime(row[self.date_field]).date().strftime('%Y%m%d'))}{row[self.amount_field]}"
@@ -172,12 +55,43 @@ class Platform(ABC):
     def get_relationship_id_key(self, row):
         return str(row[self.relationship_id_key]).lower() if pd.notnull(row[self.relationship_id_key]) else ''
 
+    def get_identity_link_field(self):
+        """Field that links rows to other platforms: the secondary ID on the base platform, the ID elsewhere."""
+        return self.secondary_id_field if self._is_base_platform else self.id_field
+
+    def get_relationship_id_keys(self, df):
+        """Vectorized get_relationship_id_key for a whole DataFrame."""
+        return self._build_key_column(df, self.relationship_id_key, lower=True)
+
+    def get_id_keys(self, df):
+        """Identity graph keys for the platform's own IDs ('<id field>:<id>'), '' where missing."""
+        ids = df[self.id_field]
+        return (self.id_field + ':' + ids.astype(str)).where(ids.notna(), '')
+
+    def get_identity_link_keys(self, df):
+        """Stringified identity link field for a whole DataFrame, '' where missing."""
+        return self._build_key_column(df, self.get_identity_link_field())
+
+    def _build_key_column(self, df, column, lower=False):
+        values = df[column]
+        keys = values.astype(str)
+        if lower:
+            keys = keys.str.lower()
+        return keys.where(values.notna(), '')
+
     def get_platform_name(self):
         return self.name
 
     def get_date_field(self):
         return self.date_field
 
+    def get_date_formats(self):
+        """Date columns to parse, mapped to their configured format (None to infer it)."""
+        formats = {self.date_field: self.date_format}
+        if self.date_fallback_field:
+            formats.setdefault(self.date_fallback_field, self.date_fallback_format)
+        return formats
+
     def get_amount_field(self):
         return self.amount_field
 
@@ -228,6 +142,8 @@ class Platform(ABC):
             'file_pattern': self.file_pattern,
             'date_field': self.date_field,
             'date_fallback_field': self.date_fallback_field,
+            'date_format': self.date_format,
+            'date_fallback_format': self.date_fallback_format,
             'amount_field': self.amount_field,
             'id_field': self.id_field,
             'secondary_id_field': self.secondary_id_field,
@@ -256,8 +172,177 @@ class Platform(ABC):
             data.get('date_fallback_field')  # Optional field
         )
         platform.column_mapping = data['column_mapping']
+        platform.date_format = data.get('date_format')
+        platform.date_fallback_format = data.get('date_fallback_format')
         platform.sample_columns = data.get('sample_columns', [])
         platform.sample_file_path = data.get('sample_file_path')
         platform.recurring_true_value = data.get('recurring_true_value')
         platform._recurring_values = data.get('recurring_values', [])
         return platform
+
+
+class TransformPlan:
+    """Per-platform recipe that turns a wide export into the narrow final-file columns.
+
+    The plan is compiled once from the platform's fields and column_mapping:
+    every output column becomes a spec tuple saying where its values come
+    from. apply() evaluates the specs against only the source columns they
+    name and returns a new frame with exactly output_columns, leaving the
+    source frame untouched. Mappings are resolved in order, so a mapping whose
+    source is an earlier mapping's target picks up that target's values.
+    """
+
+    def __init__(self, platform, output_columns):
+        self.platform_name = platform.get_platform_name()
+        self.output_columns = list(output_columns)
+        self.duplicate_column = platform.get_duplicate_column_name() if platform.is_base_platform() else None
+        self.source_columns = set()
+        # Whether the whole export has Recurring IDs, for plans applied a chunk at a time; None checks each frame
+        self.has_recurring_ids = None
+
+        # The date field itself carries the fallback, since mappings may read it too
+        date = self._column(platform.date_field, '')
+        assigned = {}
+        if platform.date_fallback_field:
+            self.source_columns.add(platform.date_fallback_field)
+            date = ('date_fallback', platform.date_field, platform.date_fallback_field)
+            assigned[platform.date_field] = date
+        assigned.update({
+            'Date Clean': ('date', date),
+            'Amount': self._column(platform.amount_field, ''),
+            'Giving Platform': ('constant', self.platform_name),
+            'Display Name': ('constant', ''),
+            'Recurring ID': ('recurring_id', self._column('Recurring ID', '')),
+            'Is Recurring': self._column('Is Recurring', False)
+        })
+
+        for target_col, mapping in platform.column_mapping.items():
+            source_col = mapping['target']
+            default_value = mapping['default']
+            try:
+                if source_col != 'N/A':
+                    assigned[target_col] = assigned[source_col] if source_col in assigned \
+                        else self._column(source_col, default_value, mapped=True)
+                elif target_col == 'Is Recurring':
+                    assigned[target_col] = ('constant', default_value.upper() == 'TRUE')
+                elif target_col != 'Recurring ID':  # Recurring ID keeps the export's own values
+                    assigned[target_col] = ('constant', default_value)
+            except Exception as e:
+                logging.error(f"Error processing column {target_col}: {str(e)}")
+                continue
+
+        if not getattr(platform, 'has_display_name', False):
+            assigned['Display Name'] = ('display_name',
+                                        self._assigned_column(assigned, 'Donor First Name'),
+                                        self._assigned_column(assigned, 'Donor Last Name'),
+                                        [self._assigned_column(assigned, col) for col in CONTACT_NAME_COLUMNS])
+        assigned['Match?'] = ('match', self._assigned_column(assigned, 'Reason'))
+
+        # Anything not produced above passes through from the export or is left blank
+        self.specs = [(column, assigned.get(column) or self._column(column, ''))
+                      for column in self.output_columns]
+
+    def _column(self, name, default, mapped=False):
+        self.source_columns.add(name)
+        return ('column', name, default, mapped)
+
+    def _assigned_column(self, assigned, name):
+        return assigned[name] if name in assigned else self._column(name, None)
+
+    def apply(self, df):
+        """Evaluate the plan on one platform frame and return the final-file columns."""
+        logging.info(f"Processing data for platform: {self.platform_name}")
+        source = self.select_source(df)
+
+        # Filled column by column: building from a dict of mixed scalars and Series copies every block twice
+        values = {}
+        result = pd.DataFrame(index=source.index)
+        for column, spec in self.specs:
+            result[column] = self._evaluate(spec, source, values)
+        logging.info(f"Finished processing data for platform: {self.platform_name}")
+        return result
+
+    def select_source(self, df):
+        """The rows and source columns of df the plan reads: duplicates of other platforms are dropped."""
+        needed = [col for col in df.columns if col in self.source_columns]
+        source = df[needed]
+        if self.duplicate_column:
+            if self.duplicate_column in df.columns:
+                keep = (df[self.duplicate_column] != 'Duplicate').values
+                source = df.loc[keep, needed]
+                logging.info(f"Filtered out {(~keep).sum()} duplicate entries using column: {self.duplicate_column}")
+            else:
+                logging.warning(f"Duplicate column {self.duplicate_column} not found. Skipping duplicate filtering.")
+
+        for spec in {spec for _, spec in self.specs if spec[0] == 'column' and spec[3]}:
+            if spec[1] not in source.columns:
+                logging.warning(f"Source column {spec[1]} not found. Using default value \"{spec[2]}\"")
+        return source
+
+    def _evaluate(self, spec, source, values):
+        # Specs shared by several columns are computed once
+        key = id(spec)
+        if key not in values:
+            values[key] = self._compute(spec, source, values)
+        return values[key]
+
+    def _compute(self, spec, source, values):
+        kind = spec[0]
+        if kind == 'constant':
+            return spec[1]
+        if kind == 'column':
+            return source[spec[1]] if spec[1] in source.columns else spec[2]
+        if kind == 'date_fallback':
+            date_field, fallback_field = spec[1], spec[2]
+            if date_field not in source.columns:
+                return ''
+            dates = source[date_field]
+            if fallback_field not in source.columns:
+                return dates
+            missing = dates.isna() | (dates == '')
+            logging.info(f"Applied date fallback for {missing.sum()} rows")
+            return dates.mask(missing, source[fallback_field])
+        if kind == 'date':
+            # Day-precision datetime64; create_final_file turns the combined column into dates once
+            try:
+                return as_dates(self._evaluate(spec[1], source, values)).dt.normalize()
+            except Exception as e:
+                logging.error(f"Error setting Date Clean field: {str(e)}")
+                return ''
+        if kind == 'recurring_id':
+            # Blank unless the export has at least one Recurring ID
+            recurring_ids = self._evaluate(spec[1], source, values)
+            if not isinstance(recurring_ids, pd.Series):
+                return ''
+            has_recurring_ids = recurring_ids.notna().any() if self.has_recurring_ids is None else self.has_recurring_ids
+            return recurring_ids if has_recurring_ids else ''
+        if kind == 'match':
+            reasons = self._evaluate(spec[1], source, values)
+            if not isinstance(reasons, pd.Series):
+                return 'Not a Match'
+            return pd.Series(np.where(reasons == 'Match', 'Match', 'Not a Match'), index=source.index, dtype=object)
+        if kind == 'display_name':
+            return self._display_names(spec, source, values)
+        raise ValueError(f"Unknown transform spec: {kind}")
+
+    def _display_names(self, spec, source, values):
+        """'First Last' from the donor name columns, else the first contact name column present."""
+        first_name = self._text_column(self._evaluate(spec[1], source, values), source.index)
+        last_name = self._text_column(self._evaluate(spec[2], source, values), source.index)
+        display_names = (first_name + ' ' + last_name).str.strip()
+
+        contact_names = next((self._evaluate(contact, source, values) for contact in spec[3]
+                              if contact[0] != 'column' or contact[1] in source.columns), None)
+        if isinstance(contact_names, pd.Series):
+            fallback = (display_names.isna() | (display_names == '')) & contact_names.notna() & (contact_names != '')
+            if fallback.any():
+                logging.info(f"Using contact name as fallback for {fallback.sum()} rows")
+                display_names = display_names.mask(fallback, contact_names.str.strip())
+
+        logging.info(f"Final count of empty display names: {(display_names.isna() | (display_names == '')).sum()}")
+        return display_names
+
+    def _text_column(self, names, index):
+        if not isinstance(names, pd.Series):
+            return pd.Series('' if names is None else str(names).strip(), index=index, dtype=object)
+        return names.fillna('').str.strip()
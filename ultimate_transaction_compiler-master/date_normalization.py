@@ -0,0 +1,134 @@
+"""Parse each platform's date columns once into typed datetime64 columns.
+
+Text dates are parsed with the platform's configured format or, failing that,
+the format guessed from a sample of the column, and only the values that do
+not fit it go through pandas' slower mixed-format mode. Values
+that still cannot be parsed, and day/month orders the data cannot confirm,
+are counted and logged instead of silently turning into NaT.
+"""
+import logging
+import warnings
+import pandas as pd
+from pandas.tseries.api import guess_datetime_format
+
+FORMAT_SAMPLE_SIZE = 20
+MAX_EXTRA_FORMATS = 3
+MAX_EXAMPLES = 10
+
+
+def infer_date_format(texts):
+    """Most common strftime format guessed from a sample of date strings, or None."""
+    guesses = pd.Series([guess_datetime_format(text) for text in texts[:FORMAT_SAMPLE_SIZE]], dtype=object).dropna()
+    if guesses.empty:
+        return None
+    return guesses.value_counts().index[0]
+
+
+def _to_naive(parsed):
+    # Offsets are dropped, keeping the local date and time the export shows
+    if isinstance(parsed.dtype, pd.DatetimeTZDtype):
+        return parsed.tz_localize(None)
+    if parsed.dtype == object:
+        return pd.DatetimeIndex([value.tz_localize(None) if getattr(value, 'tzinfo', None) else value
+                                 for value in parsed])
+    return parsed
+
+
+def _parse(values, date_format):
+    """pd.to_datetime with unparsable values as NaT and any UTC offsets removed; returns a DatetimeIndex."""
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        try:
+            parsed = pd.to_datetime(values, format=date_format, errors='coerce')
+        except (ValueError, TypeError):
+            # Mixed UTC offsets cannot share one dtype; parse them one at a time
+            parsed = pd.Index([pd.to_datetime(value, format=date_format, errors='coerce') for value in values],
+                              dtype=object)
+    return pd.DatetimeIndex(_to_naive(pd.Index(parsed)))
+
+
+def _is_day_month_format(date_format):
+    # Year-first formats are always year-month-day
+    return bool(date_format) and '%d' in date_format and '%m' in date_format and not date_format.startswith('%Y')
+
+
+def _sample_texts(values):
+    sample = values.dropna().head(FORMAT_SAMPLE_SIZE * 5)
+    return [value for value in sample if isinstance(value, str) and value.strip()][:FORMAT_SAMPLE_SIZE]
+
+
+def parse_date_column(values, date_format=None):
+    """Parse a date column into naive datetime64 values and report what could not be parsed.
+
+    Returns (parsed Series with the index of values, report dict). Blank
+    cells count as missing, not as unparsable.
+    """
+    report = {'format': date_format, 'format_inferred': False, 'values': len(values), 'missing': 0,
+              'other_formats': [], 'unparsable': 0, 'ambiguous': 0, 'unparsable_examples': []}
+    if not pd.api.types.is_datetime64_any_dtype(values) and date_format is None:
+        date_format = infer_date_format(_sample_texts(values))
+        report['format'] = date_format
+        report['format_inferred'] = date_format is not None
+
+    # Cells already holding dates pass straight through; repeated text is parsed once (to_datetime caches it)
+    parsed = pd.Series(_parse(values, date_format), index=values.index)
+
+    # A guessed day/month order is only confirmed by a day above 12
+    if report['format_inferred'] and _is_day_month_format(date_format):
+        text_dates = parsed[values.map(type) == str].dropna()
+        if not (text_dates.dt.day > 12).any():
+            report['ambiguous'] = int((text_dates.dt.day != text_dates.dt.month).sum())
+
+    blank = values.isna()
+    leftover = parsed.isna() & ~blank
+    if leftover.any():
+        texts = values[leftover].astype(str).str.strip()
+        blank[texts.index[texts == '']] = True
+        texts = texts[texts != '']
+
+        # Exports mixing a few layouts: guess a format for what is left before falling back to mixed mode
+        for _ in range(MAX_EXTRA_FORMATS):
+            extra_format = infer_date_format(texts.tolist()) if len(texts) else None
+            if not extra_format:
+                break
+            extra_dates = _parse(texts, extra_format)
+            parsed[texts.index] = extra_dates
+            report['other_formats'].append(extra_format)
+            texts = texts[extra_dates.isna()]
+        if len(texts):
+            parsed[texts.index] = _parse(texts, 'mixed')
+
+    unparsable = parsed.isna() & ~blank
+    report['missing'] = int(blank.sum())
+    report['unparsable'] = int(unparsable.sum())
+    report['unparsable_examples'] = [str(value) for value in values[unparsable].unique()[:MAX_EXAMPLES]]
+    return parsed, report
+
+
+def merge_date_reports(report, other):
+    """One report for a column parsed in parts, e.g. file by file; report gives the format."""
+    merged = dict(report)
+    for count in ('values', 'missing', 'unparsable', 'ambiguous'):
+        merged[count] = report[count] + other[count]
+    merged['other_formats'] = list(dict.fromkeys(report['other_formats'] + other['other_formats']))
+    merged['unparsable_examples'] = list(dict.fromkeys(
+        report['unparsable_examples'] + other['unparsable_examples']))[:MAX_EXAMPLES]
+    return merged
+
+
+def as_dates(values):
+    """values as datetime64, parsing them only if an earlier stage has not already done so."""
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values
+    return pd.to_datetime(values, format='mixed', errors='coerce')
+
+
+def log_date_report(platform_name, field, report):
+    logging.info(f"Parsed {platform_name} '{field}' with format {report['format'] or 'mixed'}: "
+                 f"{report['values']} values, {report['missing']} missing")
+    if report['unparsable']:
+        logging.warning(f"{report['unparsable']} {platform_name} '{field}' values could not be parsed as dates, "
+                        f"e.g. {report['unparsable_examples']}")
+    if report['ambiguous']:
+        logging.warning(f"{report['ambiguous']} {platform_name} '{field}' values fit both day/month orders; "
+                        f"read them as {report['format']}. Set an explicit date format for the platform if that is wrong.")
@@ -1,6 +1,10 @@
+import numpy as np
 import pandas as pd
 import json
 import os
+from lookup_cache import read_value_map, read_column_maps, read_zip_ranges
+from zip_lookup import normalize_zip_codes
+from last_gift import add_last_gift_columns
 
 class DictionaryLookupManager:
     def __init__(self, dictionary_file='lookup_dictionaries.json'):
@@ -21,18 +25,142 @@ class DictionaryLookupManager:
             json.dump(self.lookups, f)
 
     def apply_lookup_dictionaries(self, df):
-        """Apply all configured lookup dictionaries to the dataframe."""
-        for lookup in self.lookups:
-            if lookup.get('use_multiple_values', False):
-                df = self.apply_multiple_values_lookup(df, lookup)
-            elif lookup.get('use_post_merger', False):
-                df = self.apply_post_merger_logic(df, lookup)
+        """Apply all configured lookup dictionaries to the dataframe.
+
+        The lookups run in the batches plan_lookups gives, which has the same
+        result as applying them one after the other.
+        """
+        for batch in self.plan_lookups(self.lookups):
+            df = self.apply_lookup_batch(df, batch)
+        return df
+
+    def plan_lookups(self, lookups):
+        """Split lookups into batches that can be resolved together, in order.
+
+        A batch ends before a lookup that reads a column an earlier lookup of
+        the batch writes: one of its output columns, or the lookup column a
+        post-merger lookup renames.
+        """
+        batches = []
+        batch = []
+        written = set()
+        for lookup in lookups:
+            if lookup['lookup_column'] in written:
+                batches.append(batch)
+                batch = []
+                written = set()
+            batch.append(lookup)
+            written.update(self._written_columns(lookup))
+        if batch:
+            batches.append(batch)
+        return batches
+
+    def _written_columns(self, lookup):
+        if lookup.get('use_multiple_values', False):
+            return list(read_column_maps(lookup['path']))
+        if lookup.get('use_post_merger', False):
+            return [lookup['output_column'], lookup['lookup_column']]
+        return [lookup['output_column']]
+
+    def apply_lookup_batch(self, df, lookups):
+        """Apply lookups that do not read each other's columns in one pass.
+
+        Each lookup column is factorized once. Every output column keyed on
+        it is mapped on its distinct values and gathered to the rows by the
+        codes. The columns are written in lookup order at the end.
+        """
+        factorized_columns = {}
+        outputs = []
+        for lookup in lookups:
+            column = lookup['lookup_column']
+            if column not in factorized_columns:
+                factorized_columns[column] = self._factorize_keys(df[column])
+            codes, unique_keys = factorized_columns[column]
+            if lookup.get('use_zip_ranges', False):
+                # The key becomes the position of the range holding the ZIP code, mapped to its value below
+                unique_keys = read_zip_ranges(lookup['path']).find(normalize_zip_codes(unique_keys))
             elif lookup.get('use_zip_validation', False):
-                df = self.apply_zip_validation_logic(df, lookup)
-            else:
-                df = self.apply_standard_lookup(df, lookup)
+                unique_keys = normalize_zip_codes(unique_keys)
+
+            for output_column, value_dict in self._value_maps(lookup):
+                mapped_values = self._handle_default_values(unique_keys.map(value_dict), lookup)
+                outputs.append((output_column, self._gather(mapped_values, codes, df.index)))
+            if lookup.get('use_post_merger', False):
+                outputs.append((column, self._clean_names(df[column], lookup)))
+
+        for column, values in outputs:
+            df[column] = values
         return df
 
+    def _factorize_keys(self, values):
+        """Codes of the rows and the distinct keys they point to; missing keys point to the last one."""
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            # Already factorized; the categories are mapped the way Series.map maps them
+            return None, values
+        codes, uniques = pd.factorize(values)
+        unique_keys = pd.Series(uniques, dtype=values.dtype)
+        if (codes == -1).any():
+            # Missing keys are looked up once, as a missing value of the column
+            unique_keys = pd.concat([unique_keys, values[codes == -1].iloc[:1]], ignore_index=True)
+        return codes, unique_keys
+
+    def _gather(self, mapped_values, codes, index):
+        if codes is None:
+            return mapped_values
+        # Code -1 (a missing key) takes the last value, the missing key's
+        values = mapped_values.take(codes)
+        values.index = index
+        return values
+
+    def _value_maps(self, lookup):
+        """(output column, value dictionary) pairs of a lookup, with empty dictionary values handled."""
+        if lookup.get('use_multiple_values', False):
+            # One mapping dictionary per value column, keyed on the first column
+            value_maps = list(read_column_maps(lookup['path']).items())
+        elif lookup.get('use_post_merger', False):
+            value_dict = {value['key']: value['value'] for value in lookup['values']}
+            value_dict.update({value['merger_key']: value['value']
+                               for value in lookup['values'] if value['merger_key']})
+            value_maps = [(lookup['output_column'], value_dict)]
+        elif lookup.get('use_zip_ranges', False):
+            value_maps = [(lookup['output_column'], dict(enumerate(read_zip_ranges(lookup['path']).values)))]
+        else:
+            # Dictionary without headers for simple key-value mapping
+            value_maps = [(lookup['output_column'], read_value_map(lookup['path']))]
+        return [(column, self._process_empty_dictionary_values(value_dict, lookup))
+                for column, value_dict in value_maps]
+
+    def _clean_names(self, values, lookup):
+        """The post-merger lookup column with each key replaced by its clean name.
+
+        The clean names are mapped on the distinct values (the categories of a
+        categorical column) and gathered to the rows by their codes.
+        """
+        clean_names = self._clean_name_map(lookup)
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            categories = pd.Series(values.cat.categories, dtype=object)
+            clean_categories = pd.Index(self._map_clean_names(categories, clean_names).infer_objects())
+            if clean_categories.is_unique and not clean_categories.hasnans:
+                return values.cat.rename_categories(clean_categories)
+            # Keys sharing a clean name cannot stay separate categories, so the column becomes plain values
+            clean_values = clean_categories.append(pd.Index([np.nan])).take(values.cat.codes)
+            return pd.Series(clean_values, index=values.index, name=values.name)
+        codes, unique_keys = self._factorize_keys(values)
+        clean_keys = self._map_clean_names(unique_keys.astype(object), clean_names)
+        return self._gather(clean_keys, codes, values.index).infer_objects()
+
+    def _clean_name_map(self, lookup):
+        """key -> clean name of a post-merger lookup; a key's own clean name wins over a merger key's."""
+        clean_names = {value['merger_key']: value.get('clean_merger_name', value['merger_key'])
+                       for value in lookup['values'] if value['merger_key']}
+        clean_names.update({value['key']: value.get('clean_name', value['key']) for value in lookup['values']})
+        return clean_names
+
+    def _map_clean_names(self, keys, clean_names):
+        # Keys without a clean name are left as they are; an object mapping keeps the clean names' own types
+        clean_name_series = pd.Series(list(clean_names.values()), index=list(clean_names), dtype=object)
+        return keys.map(clean_name_series).where(keys.isin(clean_name_series.index), keys)
+
     def _process_empty_dictionary_values(self, value_dict, lookup):
         """Process dictionary values before mapping.
         
@@ -68,113 +196,30 @@ class DictionaryLookupManager:
         """
         if lookup.get('use_default_value', False):
             default_value = lookup.get('default_value', '')
+            # Lookups on categorical columns can return categoricals, which only accept known categories
+            if isinstance(series.dtype, pd.CategoricalDtype) and default_value not in series.cat.categories:
+                series = series.cat.add_categories([default_value])
             series = series.fillna(default_value)
         return series
 
     def apply_multiple_values_lookup(self, df, lookup):
         """Apply multiple values dictionary lookup."""
-        # Read the dictionary file with headers
-        dict_df = pd.read_excel(lookup['path'])
-        
-        # Get the key column (first column) and value columns (all other columns)
-        key_column = dict_df.columns[0]
-        value_columns = dict_df.columns[1:]
-        
-        # Create a dictionary for each value column
-        for col in value_columns:
-            # Create mapping dictionary for this column
-            value_dict = dict(zip(dict_df[key_column], dict_df[col]))
-            
-            # Process dictionary values to handle empty values
-            value_dict = self._process_empty_dictionary_values(value_dict, lookup)
-            
-            # Apply mapping and handle default values
-            mapped_values = df[lookup['lookup_column']].map(value_dict)
-            df[col] = self._handle_default_values(mapped_values, lookup)
-        
-        return df
+        return self.apply_lookup_batch(df, [lookup])
 
     def apply_standard_lookup(self, df, lookup):
         """Apply standard dictionary lookup."""
-        # Read dictionary without headers for simple key-value mapping
-        dict_df = pd.read_excel(lookup['path'], header=None, names=['key', 'value'])
-        lookup_dict = dict(zip(dict_df['key'], dict_df['value']))
-        
-        # Process dictionary values to handle empty values
-        lookup_dict = self._process_empty_dictionary_values(lookup_dict, lookup)
-        
-        # Apply mapping and handle default values
-        mapped_values = df[lookup['lookup_column']].map(lookup_dict)
-        df[lookup['output_column']] = self._handle_default_values(mapped_values, lookup)
-        
-        return df
+        return self.apply_lookup_batch(df, [lookup])
 
     def apply_post_merger_logic(self, df, lookup):
         """Apply post-merger logic to the lookup."""
-        # Create dictionaries for the lookup values
-        value_dict = {value['key']: value['value'] for value in lookup['values']}
-        value_dict.update({value['merger_key']: value['value'] 
-                          for value in lookup['values'] if value['merger_key']})
-        
-        clean_name_dict = {value['key']: value.get('clean_name', value['key']) 
-                          for value in lookup['values']}
-        clean_merger_name_dict = {value['merger_key']: value.get('clean_merger_name', value['merger_key']) 
-                                 for value in lookup['values'] if value['merger_key']}
-        
-        # Process dictionary values to handle empty values
-        value_dict = self._process_empty_dictionary_values(value_dict, lookup)
-        
-        # Apply mapping and handle default values
-        mapped_values = df[lookup['lookup_column']].map(value_dict)
-        df[lookup['output_column']] = self._handle_default_values(mapped_values, lookup)
-        
-        # Apply the clean name logic to the lookup column
-        df[lookup['lookup_column']] = df[lookup['lookup_column']].apply(
-            lambda x: clean_name_dict.get(x, clean_merger_name_dict.get(x, x))
-        )
-        
-        return df
+        return self.apply_lookup_batch(df, [lookup])
 
     def apply_zip_validation_logic(self, df, lookup):
         """Apply zip code validation logic to the lookup."""
-        dict_df = pd.read_excel(lookup['path'], header=None, names=['key', 'value'])
-        lookup_dict = dict(zip(dict_df['key'], dict_df['value']))
-        
-        # Process dictionary values to handle empty values
-        lookup_dict = self._process_empty_dictionary_values(lookup_dict, lookup)
-        
-        # Process zip codes and apply lookup with default value handling
-        processed_zips = df[lookup['lookup_column']].apply(self._process_zip_code)
-        mapped_values = processed_zips.map(lookup_dict)
-        df[lookup['output_column']] = self._handle_default_values(mapped_values, lookup)
-        
-        return df
-
-    def _process_zip_code(self, zip_code):
-        """Process zip code for validation."""
-        if pd.isna(zip_code):
-            return None
-        
-        if isinstance(zip_code, float):
-            zip_code = str(int(zip_code))
-        else:
-            zip_code = str(zip_code).strip()
-
-        # Handle zip+4 format (e.g., 33613-7716)
-        if '-' in zip_code:
-            zip_code = zip_code.split('-')[0]
-
-        # Remove leading zeros
-        zip_code = zip_code.lstrip('0')
-
-        # Ensure it's a number
-        if zip_code.isdigit():
-            return int(zip_code)
-        else:
-            return None
+        return self.apply_lookup_batch(df, [lookup])
 
     def get_last_gift_columns(self, df, lookups=None):
-        """Get last gift values for specified columns."""
+        """Add last gift values for specified columns to df, in place, and return it."""
         if lookups is None:
             lookups = self.lookups
 
@@ -188,16 +233,9 @@ class DictionaryLookupManager:
             if lookup.get('include_in_last_gift', False):
                 if lookup.get('use_multiple_values', False):
                     # For multiple values dictionaries, include all value columns
-                    dict_df = pd.read_excel(lookup['path'])
-                    value_columns = dict_df.columns[1:]  # All columns except the first
-                    last_gift_columns.extend(value_columns)
+                    last_gift_columns.extend(read_column_maps(lookup['path']))
                 else:
                     # For standard dictionaries, include the output column
                     last_gift_columns.append(lookup['output_column'])
 
-        result_df = df.copy()
-        for col in last_gift_columns:
-            if col in df.columns:
-                result_df[f'Last Gift {col}'] = df.groupby('Relationship ID')[col].shift()
-
-        return result_df
+        return add_last_gift_columns(df, last_gift_columns)
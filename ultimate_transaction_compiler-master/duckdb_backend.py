@@ -0,0 +1,387 @@
+"""Optional out-of-core compile backend that runs a full compile against an on-disk DuckDB database.
+
+The pandas path holds every parsed export, its key columns, the combined
+final frame and its sorted copy in memory at the same time. With this
+backend each parsed input file is staged in a DuckDB table per platform as
+soon as it is read, and the compile then makes two passes over the staged
+rows a chunk at a time (see TransactionCompilePipeline.compile_out_of_core):
+the first stages every row's identity links and typed transaction keys, the
+second gives the rows their Relationship IDs and duplicate flags and stages
+the final rows. Duplicate detection joins the key tables in DuckDB, and
+DuckDB sorts the final rows (spilling to its temp folder past the memory
+limit) for the output writer to stream back. Only the distinct identity
+links, the resolved identities and the duplicate match table are held in
+memory, not the rows compiled.
+
+Staged inputs come back with the dtypes concatenating the files in pandas
+gives them, except that a column holding numbers in one file and text in
+another comes back as text. Final columns outside the typed schema are
+staged as text, so numbers in mixed columns (IDs, ZIP codes, phone numbers)
+come back as text, as in Parquet output.
+"""
+import logging
+import os
+import shutil
+import tempfile
+import numpy as np
+import pandas as pd
+from shared_config import BOOLEAN_COLUMNS, AMOUNT_COLUMNS, DATE_COLUMNS
+from final_schema import to_typed_frame
+from duplicate_detection import MATCH_TABLE_COLUMNS, finish_match_table
+
+try:
+    import duckdb
+    HAS_DUCKDB = True
+except ImportError:
+    HAS_DUCKDB = False
+
+DEFAULT_MEMORY_LIMIT = '2GB'
+STAGE_CHUNK_SIZE = 100000
+VECTOR_SIZE = 2048  # Rows per DuckDB vector; fetched chunks are whole vectors
+TABLE_NAME = 'final_rows'
+ROW_ORDER_COLUMN = '__row_order'  # Insertion order, so ties sort the way pandas' stable sort leaves them
+CODES_TABLE_PREFIX = 'codes_'
+INPUT_TABLE_PREFIX = 'input_'
+POSITION_COLUMN = '__position'  # Row number within a platform's staged inputs, the index pandas would give it
+KEY_ORDER_COLUMN = '__key_order'
+
+COLUMN_TYPES = {**dict.fromkeys(BOOLEAN_COLUMNS, 'BOOLEAN'), **dict.fromkeys(AMOUNT_COLUMNS, 'DOUBLE'),
+                **dict.fromkeys(DATE_COLUMNS, 'TIMESTAMP')}
+
+# Identity links and typed transaction keys of the staged inputs (see duplicate_detection)
+KEY_TABLES = {
+    'base_identity_links': {'id_value': 'VARCHAR', 'id_key': 'VARCHAR', 'primary_key': 'VARCHAR',
+                            'secondary_key': 'VARCHAR'},
+    'other_identity_links': {'primary_key': 'VARCHAR', 'secondary_key': 'VARCHAR'},
+    'base_keys': {'Base Row': 'BIGINT', 'Base Transaction ID': 'VARCHAR', 'Base ID': 'VARCHAR',
+                  'Date': 'TIMESTAMP_NS', 'Amount': 'BIGINT'},
+    'base_links': {'Matched Key': 'VARCHAR', 'Base ID': 'VARCHAR'},
+    # Key order keeps the first of several keys matching the same rows, as drop_duplicates does
+    'matched_keys': {'Matched Row': 'BIGINT', 'Matched Transaction ID': 'VARCHAR', 'Date': 'TIMESTAMP_NS',
+                     'Amount': 'BIGINT', 'Matched Via': 'VARCHAR', 'Matched Key': 'VARCHAR',
+                     'Matched Platform': 'VARCHAR', KEY_ORDER_COLUMN: 'BIGINT'}
+}
+
+DUPLICATE_QUERY = f"""
+SELECT m."Matched Row", m."Matched Transaction ID", m."Date", m."Amount", m."Matched Via", m."Matched Key",
+       m."Matched Platform", b."Base Row", b."Base Transaction ID", b."Base ID"
+FROM matched_keys m
+JOIN (SELECT DISTINCT * FROM base_links) l ON m."Matched Key" = l."Matched Key"
+JOIN base_keys b ON b."Base ID" = l."Base ID" AND b."Date" = m."Date" AND b."Amount" = m."Amount"
+QUALIFY row_number() OVER (PARTITION BY b."Base Row", m."Matched Platform", m."Matched Row"
+                           ORDER BY m.{KEY_ORDER_COLUMN}) = 1
+"""
+
+
+def _quote(column):
+    return '"' + str(column).replace('"', '""') + '"'
+
+
+def _staged_values(values, column_type):
+    if column_type == 'BOOLEAN':
+        return values.astype('boolean')
+    if column_type == 'DOUBLE':
+        return pd.to_numeric(values, errors='coerce').astype('float64')
+    if column_type == 'BIGINT':
+        return pd.to_numeric(values, errors='coerce').astype('Int64')
+    if column_type in ('TIMESTAMP', 'TIMESTAMP_NS'):
+        return pd.to_datetime(values, errors='coerce')
+    values = values.astype(object)
+    return values.astype(str).where(values.notna(), None)
+
+
+def _input_type(values):
+    """DuckDB type a parsed input column is staged as."""
+    if pd.api.types.is_bool_dtype(values):
+        return 'BOOLEAN'
+    if pd.api.types.is_integer_dtype(values):
+        return 'BIGINT'
+    if pd.api.types.is_float_dtype(values):
+        return 'DOUBLE'
+    if pd.api.types.is_datetime64_dtype(values):
+        return 'TIMESTAMP_NS'
+    return 'VARCHAR'
+
+
+def _widened_type(current_type, new_type):
+    if current_type == new_type:
+        return current_type
+    if {current_type, new_type} == {'BIGINT', 'DOUBLE'}:
+        return 'DOUBLE'
+    return 'VARCHAR'
+
+
+def _input_values(values, column_type):
+    if column_type == 'VARCHAR':
+        # Text as str() spells it, so keys and fallback IDs built from it match the pandas path
+        values = values.astype(object)
+        return values.map(str).where(values.notna(), None)
+    if column_type == 'DOUBLE':
+        return values.astype('float64')
+    return values
+
+
+def _restored_values(values, column_type, has_nulls):
+    """A staged input column with the dtype pandas gives it when the files are concatenated."""
+    if column_type == 'BIGINT' and has_nulls:
+        return values.astype('float64')
+    if column_type == 'BOOLEAN' and has_nulls:
+        return values.astype(object).where(values.notna(), np.nan)
+    if column_type == 'VARCHAR':
+        return values.astype(object).where(values.notna(), np.nan)
+    return values
+
+
+class StagedInput:
+    """One platform's parsed input files, staged as a DuckDB table."""
+
+    def __init__(self, table):
+        self.table = table
+        self.rows = 0
+        self.column_types = {}  # In order of first appearance, as pandas concatenates columns
+        self.untyped_columns = set()  # Only blank so far; they take the type of the first file that fills them
+        self.null_columns = None  # Set on the first chunk read
+
+
+class DuckDBCompileDatabase:
+    """On-disk DuckDB database a duckdb backend compile stages its inputs, keys and final rows in."""
+
+    def __init__(self, memory_limit=DEFAULT_MEMORY_LIMIT, work_dir=None):
+        if not HAS_DUCKDB:
+            raise ImportError("The DuckDB backend requires duckdb. Install it or use the pandas backend.")
+        # A folder of its own under work_dir (default: the system temp folder), removed again by close()
+        if work_dir:
+            os.makedirs(work_dir, exist_ok=True)
+        self.work_dir = tempfile.mkdtemp(prefix='compile_duckdb_', dir=work_dir)
+        self.connection = duckdb.connect(os.path.join(self.work_dir, 'compile.duckdb'))
+        self.connection.execute(f"SET memory_limit = '{memory_limit}'")
+        self.connection.execute(f"SET temp_directory = '{os.path.join(self.work_dir, 'spill')}'")
+        self.inputs = {}  # platform name -> StagedInput
+        for table, column_types in KEY_TABLES.items():
+            self.create_table(table, column_types)
+        self.key_rows = 0
+        logging.info(f"Staging the compile in {self.work_dir} (memory limit {memory_limit})")
+
+    def create_table(self, table, column_types):
+        column_definitions = ', '.join(f"{_quote(column)} {column_type}" for column, column_type in column_types.items())
+        self.connection.execute(f"CREATE TABLE {table} ({column_definitions})")
+
+    def insert(self, table, df):
+        """Append the columns of df to table by name; table columns missing from df are NULL."""
+        self.connection.register('staged_chunk', df)
+        try:
+            self.connection.execute(f"INSERT INTO {table} BY NAME SELECT * FROM staged_chunk")
+        finally:
+            self.connection.unregister('staged_chunk')
+
+    def stage_input(self, platform_name, df):
+        """Append one parsed input file to the platform's staged inputs.
+
+        A column the table does not have yet is added; one whose type differs
+        from earlier files is widened to DOUBLE (integers and decimals) or
+        else to text.
+        """
+        staged = self.inputs.get(platform_name)
+        if staged is None:
+            staged = self.inputs[platform_name] = StagedInput(f"{INPUT_TABLE_PREFIX}{len(self.inputs)}")
+            self.connection.execute(f"CREATE TABLE {staged.table} ({POSITION_COLUMN} BIGINT)")
+
+        values = {POSITION_COLUMN: np.arange(staged.rows, staged.rows + len(df), dtype='int64')}
+        for column in df.columns:
+            column_type = _input_type(df[column])
+            # A blank column reads as decimals or text whatever the export meant to hold
+            untyped = column_type in ('DOUBLE', 'VARCHAR') and df[column].isna().all()
+            self._add_input_column(staged, column, column_type, untyped)
+            if not untyped:
+                values[column] = _input_values(df[column], staged.column_types[column])
+        for start in range(0, len(df), STAGE_CHUNK_SIZE):
+            self.insert(staged.table, pd.DataFrame({column: column_values[start:start + STAGE_CHUNK_SIZE]
+                                                    for column, column_values in values.items()}))
+        staged.rows += len(df)
+
+    def _add_input_column(self, staged, column, column_type, untyped):
+        current_type = staged.column_types.get(column)
+        if current_type is None:
+            self.connection.execute(f"ALTER TABLE {staged.table} ADD COLUMN {_quote(column)} "
+                                    f"{'DOUBLE' if untyped else column_type}")
+            staged.column_types[column] = 'DOUBLE' if untyped else column_type
+            if untyped:
+                staged.untyped_columns.add(column)
+        elif untyped:
+            return
+        elif column in staged.untyped_columns:
+            # Every value so far is NULL, so nothing needs converting
+            self.connection.execute(f"ALTER TABLE {staged.table} ALTER {_quote(column)} TYPE {column_type} "
+                                    f"USING CAST(NULL AS {column_type})")
+            staged.column_types[column] = column_type
+            staged.untyped_columns.discard(column)
+        elif _widened_type(current_type, column_type) != current_type:
+            self._alter_input_column(staged, column, _widened_type(current_type, column_type))
+
+    def _alter_input_column(self, staged, column, column_type):
+        using = ''
+        if staged.column_types[column] == 'BOOLEAN':
+            # Spelled as str() spells them
+            using = f" USING CASE WHEN {_quote(column)} THEN 'True' WHEN NOT {_quote(column)} THEN 'False' END"
+        self.connection.execute(f"ALTER TABLE {staged.table} ALTER {_quote(column)} TYPE {column_type}{using}")
+        staged.column_types[column] = column_type
+
+    def input_rows(self, platform_name=None):
+        if platform_name is not None:
+            return self.inputs[platform_name].rows if platform_name in self.inputs else 0
+        return sum(staged.rows for staged in self.inputs.values())
+
+    def iter_input_chunks(self, platform_name, chunk_size=None):
+        """Yield the platform's staged inputs in order as pandas frames of up to chunk_size rows.
+
+        Every chunk has all of the platform's columns, with the same dtypes in
+        every chunk, and the row numbers of the concatenated inputs as its index.
+        """
+        staged = self.inputs[platform_name]
+        columns = list(staged.column_types)
+        if staged.null_columns is None and columns:
+            counts = self.connection.execute(
+                f"SELECT {', '.join(f'COUNT(*) - COUNT({_quote(column)})' for column in columns)} "
+                f"FROM {staged.table}").fetchone()
+            staged.null_columns = {column for column, nulls in zip(columns, counts) if nulls}
+        selected = ', '.join(_quote(column) for column in columns) or POSITION_COLUMN
+        chunk_size = chunk_size or STAGE_CHUNK_SIZE
+        for start in range(0, staged.rows, chunk_size):
+            chunk = self.connection.execute(
+                f"SELECT {selected} FROM {staged.table} WHERE {POSITION_COLUMN} >= ? AND {POSITION_COLUMN} < ? "
+                f"ORDER BY {POSITION_COLUMN}", [start, start + chunk_size]).fetch_df()
+            chunk.index = pd.RangeIndex(start, start + len(chunk))
+            yield pd.DataFrame({column: _restored_values(chunk[column], staged.column_types[column],
+                                                         column in (staged.null_columns or ()))
+                                for column in columns}, index=chunk.index)
+
+    def stage_keys(self, table, df):
+        """Append rows of identity links or transaction keys to one of the KEY_TABLES."""
+        column_types = KEY_TABLES[table]
+        staged = pd.DataFrame({column: _staged_values(df[column], column_type)
+                               for column, column_type in column_types.items() if column in df.columns})
+        if KEY_ORDER_COLUMN in column_types:
+            staged[KEY_ORDER_COLUMN] = np.arange(self.key_rows, self.key_rows + len(df), dtype='int64')
+            self.key_rows += len(df)
+        self.insert(table, staged)
+
+    def distinct_keys(self, table):
+        """The distinct rows of one of the identity link tables, as a frame with None for missing values."""
+        return self.connection.execute(f"SELECT DISTINCT * FROM {table}").fetch_df().astype(object)
+
+    def find_duplicate_transactions(self, base_platform):
+        """find_duplicate_transactions over the staged keys: the two hash joins run in DuckDB."""
+        matches = self.connection.execute(DUPLICATE_QUERY).fetch_df()
+        if matches.empty:
+            return pd.DataFrame(columns=MATCH_TABLE_COLUMNS)
+        return finish_match_table(matches, base_platform)
+
+    def create_final_table(self, columns, order_by):
+        return DuckDBFinalTable(self, columns, order_by)
+
+    def close(self):
+        """Close the database and delete everything staged from disk."""
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+            shutil.rmtree(self.work_dir, ignore_errors=True)
+
+
+class DuckDBFinalTable:
+    """Final file rows staged in a DuckDBCompileDatabase, with the len/columns the output writers need and sorted chunk reads.
+
+    Closing the table closes its database.
+    """
+
+    def __init__(self, database, columns, order_by):
+        self.database = database
+        self.connection = database.connection
+        self.columns = list(columns)
+        self.order_by = list(order_by)
+        self.column_types = {column: COLUMN_TYPES.get(column, 'VARCHAR') for column in self.columns}
+        self.rows = 0
+        self.encoded_columns = {}  # column -> (codes table, categories)
+        # Amounts only ever staged from integer columns come back as integers, as concatenating them in pandas keeps them
+        self.integer_columns = {column for column, column_type in self.column_types.items() if column_type == 'DOUBLE'}
+        database.create_table(TABLE_NAME, {**self.column_types, ROW_ORDER_COLUMN: 'BIGINT'})
+
+    def __len__(self):
+        return self.rows
+
+    def append(self, df):
+        """Stage final rows; df must have all of the table's columns.
+
+        Flags, amounts and dates are typed as to_typed_frame types them before
+        they are staged, so the rows sort on the values the pandas path sorts on.
+        """
+        df = to_typed_frame(df.copy(), only_columns=list(COLUMN_TYPES))
+        self.integer_columns = {column for column in self.integer_columns
+                                if pd.api.types.is_integer_dtype(df[column])}
+        for start in range(0, len(df), STAGE_CHUNK_SIZE):
+            chunk = df.iloc[start:start + STAGE_CHUNK_SIZE]
+            staged = pd.DataFrame({column: _staged_values(chunk[column], column_type)
+                                   for column, column_type in self.column_types.items()})
+            staged[ROW_ORDER_COLUMN] = range(self.rows, self.rows + len(chunk))
+            self.database.insert(TABLE_NAME, staged)
+            self.rows += len(chunk)
+
+    def encode_column(self, column, encode):
+        """Stage column as codes of encode(its distinct staged values), computed once over all staged rows.
+
+        encode returns the distinct values as a categorical Series. Chunks read
+        back get the column as that categorical, so no chunk decides on its own
+        how a value is spelled; Parquet output gets the categories as text.
+        """
+        distinct = self.connection.execute(f"SELECT DISTINCT {_quote(column)} FROM {TABLE_NAME}").fetch_df()[column]
+        encoded = encode(distinct)
+        codes_table = f"{CODES_TABLE_PREFIX}{len(self.encoded_columns)}"
+        codes = pd.DataFrame({'value': distinct.astype(object),
+                              'code': encoded.cat.codes.to_numpy().astype('int64'),
+                              'text': encoded.astype(object).map(str).where(encoded.notna(), None)})
+        self.connection.register('staged_codes', codes)
+        try:
+            self.connection.execute(f"CREATE TABLE {codes_table} AS SELECT CAST(value AS VARCHAR) AS value, "
+                                    f"CAST(code AS BIGINT) AS code, CAST(text AS VARCHAR) AS text FROM staged_codes")
+        finally:
+            self.connection.unregister('staged_codes')
+        self.encoded_columns[column] = (codes_table, encoded.cat.categories)
+        logging.info(f"Encoded {len(distinct)} distinct {column} values over {self.rows} staged rows")
+
+    def _sorted_query(self, encoded_as='code'):
+        selected = []
+        joins = []
+        for column in self.columns:
+            if column in self.encoded_columns:
+                codes_table = self.encoded_columns[column][0]
+                # Missing values are not in the codes table and get code -1
+                value = f"COALESCE({codes_table}.code, -1)" if encoded_as == 'code' else f"{codes_table}.text"
+                selected.append(f"{value} AS {_quote(column)}")
+                joins.append(f"LEFT JOIN {codes_table} ON {TABLE_NAME}.{_quote(column)} = {codes_table}.value")
+            elif column in self.integer_columns and self.rows:
+                selected.append(f"CAST({TABLE_NAME}.{_quote(column)} AS BIGINT) AS {_quote(column)}")
+            else:
+                selected.append(f"{TABLE_NAME}.{_quote(column)}")
+        order = ', '.join([f"{TABLE_NAME}.{_quote(column)} ASC NULLS LAST" for column in self.order_by]
+                          + [f"{TABLE_NAME}.{ROW_ORDER_COLUMN}"])
+        return f"SELECT {', '.join(selected)} FROM {TABLE_NAME} {' '.join(joins)} ORDER BY {order}"
+
+    def iter_chunks(self, chunk_size):
+        """Yield the rows in sorted order as pandas frames of about chunk_size rows."""
+        result = self.connection.execute(self._sorted_query())
+        vectors_per_chunk = max(1, chunk_size // VECTOR_SIZE)
+        while True:
+            chunk = result.fetch_df_chunk(vectors_per_chunk)
+            if chunk.empty:
+                break
+            for column, (_, categories) in self.encoded_columns.items():
+                chunk[column] = pd.Categorical.from_codes(chunk[column].to_numpy(dtype='int64'), categories=categories)
+            yield chunk
+
+    def write_parquet(self, file_path):
+        """Let DuckDB write the sorted rows straight to a Parquet file."""
+        escaped_path = file_path.replace("'", "''")
+        self.connection.execute(f"COPY ({self._sorted_query(encoded_as='text')}) TO '{escaped_path}' (FORMAT PARQUET)")
+
+    def close(self):
+        """Close the database and delete the staged rows from disk."""
+        self.database.close()
@@ -0,0 +1,103 @@
+"""Cross-platform duplicate detection using typed (id, date, amount) keys and hash joins."""
+import logging
+import pandas as pd
+from date_normalization import as_dates
+
+MATCH_TABLE_COLUMNS = [
+    'Base Platform', 'Base Row', 'Base Transaction ID', 'Base ID', 'Date', 'Amount',
+    'Matched Platform', 'Matched Row', 'Matched Transaction ID', 'Matched Via', 'Matched Key'
+]
+
+
+def normalize_dates(values):
+    """Day-precision datetime64 values of a date column (NaT where unparsable)."""
+    return as_dates(values).dt.normalize()
+
+
+def normalize_amounts(values):
+    """Convert an amount column into integer cents (<NA> where not numeric)."""
+    amounts = pd.to_numeric(values, errors='coerce')
+    return (amounts * 100).round().astype('Int64')
+
+
+def _transaction_ids(df, platform):
+    source_col = platform.column_mapping.get('Transaction ID', {}).get('target')
+    if source_col and source_col in df.columns:
+        return df[source_col]
+    return pd.Series(pd.NA, index=df.index, dtype=object)
+
+
+def build_base_transaction_keys(df, platform):
+    """Typed (id, date, amount) key of every base platform row."""
+    ids = df[platform.get_id_field()]
+    return pd.DataFrame({
+        'Base Row': df.index,
+        'Base Transaction ID': _transaction_ids(df, platform).values,
+        'Base ID': ids.astype(str).where(ids.notna()).values,
+        'Date': normalize_dates(df[platform.get_date_field()]).values,
+        'Amount': normalize_amounts(df[platform.get_amount_field()]).values
+    }).dropna(subset=['Base ID', 'Date', 'Amount'])
+
+
+def build_base_link_keys(base_ids, key_columns):
+    """Map every non-empty identity key on the base platform to the base IDs that use it."""
+    base_ids = base_ids.astype(str).where(base_ids.notna())
+    links = pd.concat(
+        [pd.DataFrame({'Matched Key': keys.values, 'Base ID': base_ids.values}) for keys in key_columns],
+        ignore_index=True
+    )
+    links = links[(links['Matched Key'] != '') & links['Base ID'].notna()]
+    return links.drop_duplicates()
+
+
+def build_matched_transaction_keys(df, platform, key_columns):
+    """Typed (key, date, amount) rows of a non-base platform, one row per identity key.
+
+    key_columns maps a 'Matched Via' label to the key Series for df.
+    """
+    transactions = pd.DataFrame({
+        'Matched Row': df.index,
+        'Matched Transaction ID': _transaction_ids(df, platform).values,
+        'Date': normalize_dates(df[platform.get_date_field()]).values,
+        'Amount': normalize_amounts(df[platform.get_amount_field()]).values
+    })
+    frames = [transactions.assign(**{'Matched Via': via, 'Matched Key': keys.values})
+              for via, keys in key_columns.items()]
+    keyed = pd.concat(frames, ignore_index=True)
+    keyed = keyed[keyed['Matched Key'] != ''].dropna(subset=['Date', 'Amount'])
+    return keyed.assign(**{'Matched Platform': platform.get_platform_name()})
+
+
+def find_duplicate_transactions(base_platform, base_keys, base_links, matched_keys):
+    """Resolve cross-platform duplicates with two hash joins.
+
+    A base row is a duplicate when another platform has a transaction on the
+    same date with the same amount whose email or ID links to the base row's
+    ID. Returns the match table, one row per (base row, matched row) pair.
+    """
+    if matched_keys.empty or base_keys.empty:
+        return pd.DataFrame(columns=MATCH_TABLE_COLUMNS)
+
+    # Join other-platform transactions to the base IDs their keys point at,
+    # then to the base rows with the same (id, date, amount)
+    candidates = matched_keys.merge(base_links, on='Matched Key')
+    matches = candidates.merge(base_keys, on=['Base ID', 'Date', 'Amount'])
+    matches = matches.drop_duplicates(subset=['Base Row', 'Matched Platform', 'Matched Row'])
+    return finish_match_table(matches, base_platform)
+
+
+def finish_match_table(matches, base_platform):
+    """The match table from joined key rows, one per (base row, matched platform, matched row)."""
+    matches['Base Platform'] = base_platform.get_platform_name()
+    matches['Amount'] = matches['Amount'] / 100
+    matches['Date'] = matches['Date'].dt.date
+
+    logging.info(f"Found {matches['Base Row'].nunique()} duplicate {base_platform.get_platform_name()} transactions")
+    return matches[MATCH_TABLE_COLUMNS].sort_values(['Base Row', 'Matched Platform', 'Matched Row'], ignore_index=True)
+
+
+def flag_duplicates(df, platform, match_table):
+    """Set the platform's duplicate column from the match table."""
+    is_duplicate = pd.Series(df.index.isin(match_table['Base Row']), index=df.index)
+    df[platform.get_duplicate_column_name()] = is_duplicate.map({True: 'Duplicate', False: 'Not Duplicate'})
+    return df
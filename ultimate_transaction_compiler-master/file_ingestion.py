@@ -0,0 +1,171 @@
+"""Parallel reading of platform export files."""
+import functools
+import logging
+import os
+import traceback
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import pandas as pd
+from input_cache import default_cache
+
+DEFAULT_MAX_WORKERS = min(8, os.cpu_count() or 1)
+
+
+class FileIngestionError(Exception):
+    """Raised when one or more input files could not be read."""
+
+    def __init__(self, failures):
+        self.failures = failures  # file path -> error message
+        details = '\n'.join(f"{path}: {error}" for path, error in failures.items())
+        super().__init__(f"Failed to read {len(failures)} file(s):\n{details}")
+
+
+def _read_excel_columns(file_path, columns=None):
+    # usecols as a callable skips unknown columns instead of raising
+    usecols = None if columns is None else set(columns).__contains__
+    return pd.read_excel(file_path, usecols=usecols)
+
+
+def read_excel_file(file_path, columns=None, cache=None):
+    """Read a single export file through the input cache. Module level so worker processes can run it.
+
+    When columns is given only those columns are parsed; any that the file
+    does not have are skipped. cache defaults to the module's default_cache;
+    worker processes have their own copy of it, so settings made in the parent
+    only reach them through a cache passed in here (see cached_reader).
+    """
+    options = {} if columns is None else {'columns': sorted(columns)}
+    return (cache or default_cache).read(file_path, 'read_excel_columns', _read_excel_columns, **options)
+
+
+def cached_reader(cache):
+    """read_excel_file bound to cache, for read_platform_files; the cache is sent to each worker with the job."""
+    return functools.partial(read_excel_file, cache=cache)
+
+
+def _read_serially(jobs, reader, on_done):
+    for job in jobs:
+        try:
+            on_done(job, reader(job[1], job[3]), None)
+        except Exception as e:
+            on_done(job, None, e)
+
+
+def _read_in_pool(jobs, reader, on_done, max_workers):
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(reader, job[1], job[3]): job for job in jobs}
+        for future in as_completed(futures):
+            try:
+                on_done(futures[future], future.result(), None)
+            except Exception as e:
+                on_done(futures[future], None, e)
+
+
+def read_platform_files(input_files, max_workers=DEFAULT_MAX_WORKERS, progress_callback=None, reader=read_excel_file,
+                        columns=None):
+    """Read every platform's files, in parallel when there is more than one file.
+
+    input_files maps a platform name to its list of file paths. Files are read
+    in a process pool of up to max_workers processes and concatenated per
+    platform in their original order. progress_callback, if given, is called as
+    progress_callback(file_path, files_done, total_files, error) after each file.
+    columns optionally maps a platform name to the only columns to read from
+    its files.
+    All files are attempted; any failures are raised together as a
+    FileIngestionError.
+    """
+    columns = columns or {}
+    jobs = [(platform, file_path, position, columns.get(platform))
+            for platform, files in input_files.items()
+            for position, file_path in enumerate(files)]
+    total = len(jobs)
+    results = {}
+    failures = {}
+
+    def on_done(job, df, error):
+        platform, file_path, position, _ = job
+        if error is None:
+            results[(platform, position)] = df
+            logging.info(f"Successfully read file: {file_path} ({len(df)} rows)")
+        else:
+            failures[file_path] = str(error)
+            logging.error(f"Error reading file: {file_path}")
+            logging.error(''.join(traceback.format_exception(error)))
+        if progress_callback:
+            progress_callback(file_path, len(results) + len(failures), total, error)
+
+    workers = max(1, min(max_workers or 1, total))
+    logging.info(f"Reading {total} file(s) with {workers} worker(s)")
+    if workers == 1:
+        _read_serially(jobs, reader, on_done)
+    else:
+        _read_in_pool(jobs, reader, on_done, workers)
+
+    if failures:
+        raise FileIngestionError(failures)
+
+    platform_dfs = {}
+    for platform, files in input_files.items():
+        dfs = [results[(platform, position)] for position in range(len(files))]
+        if dfs:
+            platform_dfs[platform] = pd.concat(dfs, ignore_index=True)
+    return platform_dfs
+
+
+def iter_platform_files(input_files, max_workers=DEFAULT_MAX_WORKERS, progress_callback=None, reader=read_excel_file,
+                        columns=None):
+    """Yield (platform, file_path, frame) for every input file in input_files order.
+
+    Like read_platform_files, but each frame is handed over as soon as it and
+    the files before it are read instead of being concatenated, and at most
+    max_workers files are read ahead, so only those frames are in memory at
+    once. Failed files are skipped; once every file has been attempted the
+    failures are raised together as a FileIngestionError.
+    """
+    columns = columns or {}
+    jobs = [(platform, file_path, columns.get(platform)) for platform, files in input_files.items() for file_path in files]
+    total = len(jobs)
+    failures = {}
+    workers = max(1, min(max_workers or 1, total))
+    logging.info(f"Reading {total} file(s) with {workers} worker(s)")
+
+    def results():
+        if workers == 1:
+            for job in jobs:
+                try:
+                    yield job, reader(job[1], job[2]), None
+                except Exception as e:
+                    yield job, None, e
+            return
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            pending = deque()
+            for job in jobs:
+                pending.append((job, executor.submit(reader, job[1], job[2])))
+                if len(pending) > workers:
+                    yield _result(*pending.popleft())
+            while pending:
+                yield _result(*pending.popleft())
+
+    for files_done, (job, df, error) in enumerate(results(), 1):
+        platform, file_path, _ = job
+        if error is None:
+            logging.info(f"Successfully read file: {file_path} ({len(df)} rows)")
+        else:
+            failures[file_path] = str(error)
+            logging.error(f"Error reading file: {file_path}")
+            logging.error(''.join(traceback.format_exception(error)))
+        if progress_callback:
+            progress_callback(file_path, files_done, total, error)
+        if error is None:
+            yield platform, file_path, df
+        del df
+
+    if failures:
+        raise FileIngestionError(failures)
+
+
+def _result(job, future):
+    try:
+        return job, future.result(), None
+    except Exception as e:
+        return job, None, e
@@ -0,0 +1,95 @@
+"""Compact typed representation of the final transaction table.
+
+The compiler, the Giving Dashboard and the RFM tools keep the final file
+columns listed in shared_config in these types while they work on them:
+repeated text as categoricals, Relationship IDs as categoricals (an integer
+code per donor plus the table of distinct IDs), Is Recurring as a nullable
+boolean, amounts as numbers and dates as datetime64 days. Files are still written with the values
+the tools always wrote ('TRUE'/'FALSE', plain dates).
+"""
+import pandas as pd
+from date_normalization import as_dates
+from shared_config import CATEGORY_COLUMNS, IDENTITY_COLUMNS, BOOLEAN_COLUMNS, AMOUNT_COLUMNS, DATE_COLUMNS
+
+# A column becomes categorical only when its values repeat at least this often on average
+MIN_VALUES_PER_CATEGORY = 2
+BOOLEAN_VALUES = {'TRUE': True, 'FALSE': False, '1': True, '0': False}
+
+
+def _is_blank(values):
+    return values.isna() | (values.astype(str).str.strip() == '')
+
+
+def _to_category(values):
+    if isinstance(values.dtype, pd.CategoricalDtype) or values.dtype != object:
+        return values
+    non_null = values.dropna()
+    if non_null.nunique() * MIN_VALUES_PER_CATEGORY > len(non_null):
+        return values
+    return values.astype('category')
+
+
+def _to_identity(values):
+    # Every ID is kept as it is, however rarely it repeats; groupbys and sorts then run on the codes
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        return values
+    return values.astype('category')
+
+
+def _to_boolean(values):
+    # Anything that is not a recognisable true/false flag is missing, as it always was in the final file
+    if pd.api.types.is_bool_dtype(values):
+        return values.astype('boolean')
+    flags = values.map({True: True, False: False})
+    is_text = values.map(type) == str
+    if is_text.any():
+        flags[is_text] = values[is_text].str.strip().str.upper().map(BOOLEAN_VALUES)
+    return flags.astype('boolean')
+
+
+def _to_amount(values):
+    # Kept in dollars; text that is not a number leaves the column as it was
+    if pd.api.types.is_numeric_dtype(values):
+        return values
+    amounts = pd.to_numeric(values, errors='coerce')
+    if (amounts.isna() & ~_is_blank(values)).any():
+        return values
+    return amounts
+
+
+def _to_date(values):
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values.dt.normalize()
+    dates = as_dates(values)
+    if (dates.isna() & ~_is_blank(values)).any():
+        return values
+    return dates.dt.normalize()
+
+
+def to_typed_frame(df, only_columns=None):
+    """Convert the final file columns present in df to their compact types, in place, and return df.
+
+    Safe to call again on a frame that is already typed, e.g. after stored
+    and new rows were concatenated. only_columns limits the conversion to those columns.
+    """
+    for columns, convert in ((BOOLEAN_COLUMNS, _to_boolean), (AMOUNT_COLUMNS, _to_amount),
+                             (DATE_COLUMNS, _to_date), (IDENTITY_COLUMNS, _to_identity), (CATEGORY_COLUMNS, _to_category)):
+        for column in columns:
+            if column in df.columns and (only_columns is None or column in only_columns):
+                df[column] = convert(df[column])
+    return df
+
+
+def to_file_values(df):
+    """Copy of df with booleans as 'TRUE'/'FALSE' and the typed date columns as plain dates, as the compiler writes them."""
+    df = df.copy()
+    for column in df.columns:
+        if isinstance(df[column].dtype, pd.BooleanDtype):
+            df[column] = df[column].map({True: 'TRUE', False: 'FALSE'}).astype(object)
+        elif column in DATE_COLUMNS and pd.api.types.is_datetime64_any_dtype(df[column]):
+            df[column] = df[column].dt.date
+    return df
+
+
+def memory_usage_mb(df):
+    return round(df.memory_usage(deep=True).sum() / 2 ** 20, 1)
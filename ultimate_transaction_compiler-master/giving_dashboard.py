@@ -1,5 +1,6 @@
 import tkinter as tk
 from tkinter import filedialog, messagebox
+import numpy as np
 import pandas as pd
 from datetime import datetime
 import os
@@ -7,6 +8,10 @@ import subprocess
 import threading
 import time
 from utils import update_progress
+from input_cache import cached_read_final_file
+from final_schema import to_typed_frame
+from sort_index import load_donor_order
+from last_gift import is_donor_ordered
 from dictionary_lookup_manager import DictionaryLookupManager
 from shared_ui_components import BaseToolFrame
 
@@ -47,7 +52,7 @@ class GivingDashboard(BaseToolFrame):
             # Read the input file
             update_progress(self.progress_queue, 0)
             self.log("Reading input file...")
-            self.final_data = pd.read_excel(self.input_file_path)
+            self.final_data = to_typed_frame(cached_read_final_file(self.input_file_path))
             update_progress(self.progress_queue, 10)
 
             # Define the steps for processing
@@ -112,11 +117,18 @@ class GivingDashboard(BaseToolFrame):
         self.final_data['Gift Range Chart'] = self.final_data['Amount'].apply(get_gift_range_value)
 
     def generate_gift_number_segment(self):
-        # Sort the data by Relationship ID and Date Clean
-        self.final_data = self.final_data.sort_values(['Relationship ID', 'Date Clean'])
+        # Sort the data by Relationship ID and Date Clean, or reuse the order the compiler saved for this file
+        donor_order = load_donor_order(self.input_file_path, len(self.final_data))
+        if donor_order is not None:
+            self.log("Using the saved sort index of the final file")
+            self.final_data = self.final_data.take(donor_order)
+        elif is_donor_ordered(self.final_data):
+            self.log("The final file is already in Relationship ID and date order")
+        else:
+            self.final_data = self.final_data.sort_values(['Relationship ID', 'Date Clean'])
         
         # Group by Relationship ID and create a cumulative count
-        self.final_data['Gift Number'] = self.final_data.groupby('Relationship ID').cumcount() + 1
+        self.final_data['Gift Number'] = self.final_data.groupby('Relationship ID', observed=True).cumcount() + 1
         
         # Create a function to determine the gift segment
         def get_gift_segment(gift_number):
@@ -141,22 +153,20 @@ class GivingDashboard(BaseToolFrame):
         self.final_data = self.dict_manager.get_last_gift_columns(self.final_data)
 
     def generate_income_segment(self):
-        def get_income_segment(row):
-            if pd.isnull(row['Last Gift Date Clean']):
-                return "New"
-            elif (row['Date Clean'] - row['Last Gift Date Clean']).days > 395:
-                return "Restore"
-            elif row['Is Recurring'] == 'monthly' or row['Last Gift Is Recurring'] == 'monthly':
-                return "Retained"
-            else:
-                return "Returning"
-
         # Ensure 'Date Clean' and 'Last Gift Date Clean' are in datetime format
         self.final_data['Date Clean'] = pd.to_datetime(self.final_data['Date Clean'])
         self.final_data['Last Gift Date Clean'] = pd.to_datetime(self.final_data['Last Gift Date Clean'])
 
-        # Apply the function to create the Income Segment column
-        self.final_data['Income Segment'] = self.final_data.apply(get_income_segment, axis=1)
+        # Compared as plain values, so a missing Is Recurring flag is simply not 'monthly'
+        is_monthly = (self.final_data['Is Recurring'].astype(object).eq('monthly') |
+                      self.final_data['Last Gift Is Recurring'].astype(object).eq('monthly'))
+        days_since_last_gift = (self.final_data['Date Clean'] - self.final_data['Last Gift Date Clean']).dt.days
+
+        # First matching rule wins: New, Restore, Retained, else Returning
+        self.final_data['Income Segment'] = np.select(
+            [self.final_data['Last Gift Date Clean'].isna(), days_since_last_gift > 395, is_monthly],
+            ["New", "Restore", "Retained"], default="Returning"
+        )
 
     def set_month_column(self):
         self.final_data['Month'] = pd.to_datetime(self.final_data['Date Clean']).dt.month
@@ -0,0 +1,116 @@
+"""Disjoint-set (union-find) identity resolution used to build Relationship IDs."""
+
+RELATIONSHIP_ID_SEPARATOR = ' + '
+
+
+def _relationship_id_sort_key(relationship_id):
+    """Sort numeric IDs numerically and everything else alphabetically after them."""
+    try:
+        return (0, float(relationship_id), relationship_id)
+    except (TypeError, ValueError):
+        return (1, 0.0, relationship_id)
+
+
+class IdentityResolver:
+    """Union-find over donor keys (emails, secondary IDs and base platform IDs).
+
+    Every key that appears on the same transaction row is unioned into one
+    component. Base platform IDs (e.g. VANIDs) are attached to their component
+    as relationship IDs, and each component resolves to a single canonical
+    Relationship ID built from all of the base IDs it contains.
+    """
+
+    def __init__(self):
+        self.parent = {}
+        self.rank = {}
+        self.relationship_ids = {}  # root key -> set of base platform IDs
+        self._resolved = {}  # root key -> canonical Relationship ID string
+
+    def __contains__(self, key):
+        return key in self.parent
+
+    def __len__(self):
+        return len(self.parent)
+
+    def add(self, key):
+        """Register a key as its own component if it has not been seen yet."""
+        if key not in self.parent:
+            self.parent[key] = key
+            self.rank[key] = 0
+
+    def find(self, key):
+        """Return the root of the component containing key, compressing the path."""
+        root = key
+        parent = self.parent
+        while parent[root] != root:
+            root = parent[root]
+        while parent[key] != root:
+            parent[key], key = root, parent[key]
+        return root
+
+    def union(self, key_a, key_b):
+        """Merge the components containing key_a and key_b (union by rank)."""
+        self.add(key_a)
+        self.add(key_b)
+        root_a = self.find(key_a)
+        root_b = self.find(key_b)
+        if root_a == root_b:
+            return root_a
+
+        if self.rank[root_a] < self.rank[root_b]:
+            root_a, root_b = root_b, root_a
+        self.parent[root_b] = root_a
+        if self.rank[root_a] == self.rank[root_b]:
+            self.rank[root_a] += 1
+
+        # Merge the smaller set of relationship IDs into the larger one
+        ids_a = self.relationship_ids.pop(root_a, None)
+        ids_b = self.relationship_ids.pop(root_b, None)
+        if ids_a is not None or ids_b is not None:
+            if ids_a is None or (ids_b is not None and len(ids_b) > len(ids_a)):
+                ids_a, ids_b = ids_b, ids_a
+            if ids_b:
+                ids_a.update(ids_b)
+            self.relationship_ids[root_a] = ids_a
+        self._resolved.pop(root_a, None)
+        self._resolved.pop(root_b, None)
+        return root_a
+
+    def union_keys(self, keys):
+        """Union every non-empty key in keys into a single component."""
+        first = None
+        for key in keys:
+            if key is None or key == '':
+                continue
+            if first is None:
+                first = key
+                self.add(key)
+            else:
+                self.union(first, key)
+        return first
+
+    def add_relationship_id(self, key, relationship_id):
+        """Attach a base platform ID to the component containing key."""
+        self.add(key)
+        root = self.find(key)
+        ids = self.relationship_ids.setdefault(root, set())
+        if relationship_id not in ids:
+            ids.add(relationship_id)
+            self._resolved.pop(root, None)
+
+    def resolve(self, key, default=None):
+        """Return the canonical Relationship ID for key's component, or default.
+
+        Components that contain no base platform ID resolve to default.
+        """
+        if key is None or key == '' or key not in self.parent:
+            return default
+        root = self.find(key)
+        resolved = self._resolved.get(root)
+        if resolved is None:
+            ids = self.relationship_ids.get(root)
+            if not ids:
+                return default
+            resolved = RELATIONSHIP_ID_SEPARATOR.join(sorted(ids, key=_relationship_id_sort_key))
+            self._resolved[root] = resolved
+        return resolved
@@ -0,0 +1,91 @@
+"""Local store of the identity graph and compiled rows used by incremental compiles."""
+import json
+import logging
+import os
+import pickle
+from datetime import datetime
+import pandas as pd
+
+STORE_INFO_FILE = 'store_info.json'
+IDENTITY_GRAPH_FILE = 'identity_graph.pkl'
+COMPILED_ROWS_FILE = 'compiled_rows.pkl'
+TRANSACTION_KEYS_FILE = 'transaction_keys.pkl'
+
+# Bookkeeping columns kept on stored rows but never written to the final file
+STORE_ROW_COLUMN = 'Store Row'
+IDENTITY_KEY_COLUMN = 'Identity Key'
+IDENTITY_ROOT_COLUMN = 'Identity Root'
+STORE_COLUMNS = [STORE_ROW_COLUMN, IDENTITY_KEY_COLUMN, IDENTITY_ROOT_COLUMN]
+
+
+class IncrementalCompileStore:
+    """Persists everything an incremental compile needs between runs.
+
+    The store directory holds the resolved identity graph, the compiled final
+    rows (with their identity bookkeeping columns) and the typed transaction
+    keys used for duplicate detection against later runs.
+    """
+
+    def __init__(self, store_dir):
+        self.store_dir = store_dir
+        self.info = {}
+        self.resolver = None
+        self.rows = None
+        self.transaction_keys = None
+
+    def _path(self, file_name):
+        return os.path.join(self.store_dir, file_name)
+
+    def exists(self):
+        return os.path.exists(self._path(STORE_INFO_FILE))
+
+    def next_row_id(self):
+        return self.info.get('next_row_id', 0)
+
+    def load(self):
+        """Load the stored graph, rows and keys. Returns False if the store is empty."""
+        if not self.exists():
+            logging.info(f"No compile store found at {self.store_dir}. A full compile will initialise it.")
+            return False
+
+        with open(self._path(STORE_INFO_FILE), 'r') as f:
+            self.info = json.load(f)
+        with open(self._path(IDENTITY_GRAPH_FILE), 'rb') as f:
+            self.resolver = pickle.load(f)
+        self.rows = pd.read_pickle(self._path(COMPILED_ROWS_FILE))
+        with open(self._path(TRANSACTION_KEYS_FILE), 'rb') as f:
+            self.transaction_keys = pickle.load(f)
+
+        logging.info(f"Loaded compile store with {len(self.rows)} rows and {len(self.resolver)} identity keys "
+                     f"(last updated {self.info.get('updated_at')})")
+        return True
+
+    def save(self, resolver, rows, transaction_keys, next_row_id, platforms):
+        """Replace the stored state with the result of the latest run."""
+        os.makedirs(self.store_dir, exist_ok=True)
+        if self.exists():
+            os.remove(self._path(STORE_INFO_FILE))
+
+        with open(self._path(IDENTITY_GRAPH_FILE), 'wb') as f:
+            pickle.dump(resolver, f, protocol=pickle.HIGHEST_PROTOCOL)
+        rows.to_pickle(self._path(COMPILED_ROWS_FILE))
+        with open(self._path(TRANSACTION_KEYS_FILE), 'wb') as f:
+            pickle.dump(transaction_keys, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+        now = datetime.now().isoformat()
+        self.info = {
+            'created_at': self.info.get('created_at', now),
+            'updated_at': now,
+            'next_row_id': int(next_row_id),
+            'row_count': len(rows),
+            'identity_keys': len(resolver),
+            'platforms': list(platforms)
+        }
+        # Written last so a partially written store is never picked up as complete
+        with open(self._path(STORE_INFO_FILE), 'w') as f:
+            json.dump(self.info, f, indent=2)
+
+        self.resolver = resolver
+        self.rows = rows
+        self.transaction_keys = transaction_keys
+        logging.info(f"Saved compile store with {len(rows)} rows to {self.store_dir}")
@@ -0,0 +1,264 @@
+"""Local cache of parsed input files, keyed by file content hash and reader options.
+
+Parsing large Excel exports dominates the start of every compiler, dashboard
+and RFM run. Parsed DataFrames are stored in a columnar format (Feather when
+pyarrow is installed and the frame reads back from it unchanged, pickle
+otherwise) so unchanged inputs skip parsing.
+
+Run ``python input_cache.py --purge`` to empty the cache, or ``--stats`` to
+show its size.
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+import time
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401 - only needed for the Feather format
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+DEFAULT_CACHE_DIR = os.path.join(os.getcwd(), 'input_cache')
+DEFAULT_MAX_SIZE_MB = 2048
+DEFAULT_MAX_AGE_DAYS = 30
+CACHE_FORMAT_VERSION = 2
+
+FEATHER_EXTENSION = '.feather'
+PICKLE_EXTENSION = '.pkl'
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def file_content_hash(file_path):
+    """SHA-256 of a file's contents."""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _object_columns(df):
+    return [i for i, dtype in enumerate(df.dtypes) if dtype == object]
+
+
+def _fits_feather(df):
+    # Feather reads missing values in object columns back as None, which _read_feather turns into NaN as
+    # read_excel and read_csv give them; a frame that already holds None could not be restored exactly
+    return df.index.equals(pd.RangeIndex(len(df))) and not any(
+        any(value is None for value in df.iloc[:, i].to_numpy()) for i in _object_columns(df))
+
+
+def _read_feather(path):
+    df = pd.read_feather(path)
+    for i in _object_columns(df):
+        values = df.iloc[:, i]
+        df.isetitem(i, values.where(values.notna(), np.nan))
+    return df
+
+
+class InputFileCache:
+    """Content-addressed store of parsed input files with size and age eviction."""
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_size_mb=DEFAULT_MAX_SIZE_MB,
+                 max_age_days=DEFAULT_MAX_AGE_DAYS, enabled=True):
+        self.cache_dir = cache_dir
+        self.max_size_bytes = max_size_mb * 1024 * 1024
+        self.max_age_seconds = max_age_days * 24 * 60 * 60
+        self.enabled = enabled
+
+    def cache_key(self, file_path, reader, options):
+        """Key covering the file contents, the reader and its options."""
+        key_data = json.dumps({
+            'content': file_content_hash(file_path),
+            'reader': reader,
+            'options': options,
+            'pandas': pd.__version__,
+            'format': CACHE_FORMAT_VERSION
+        }, sort_keys=True, default=str)
+        return hashlib.sha256(key_data.encode('utf-8')).hexdigest()
+
+    def _entry_paths(self, key):
+        base = os.path.join(self.cache_dir, key)
+        return [base + FEATHER_EXTENSION, base + PICKLE_EXTENSION]
+
+    def get(self, key):
+        """Return the cached DataFrame for key, or None on a miss."""
+        for path in self._entry_paths(key):
+            if not os.path.exists(path):
+                continue
+            try:
+                if path.endswith(FEATHER_EXTENSION):
+                    df = _read_feather(path)
+                else:
+                    df = pd.read_pickle(path)
+            except FileNotFoundError:
+                continue  # Evicted by another process since the exists check: a miss
+            except Exception as e:
+                logging.warning(f"Discarding unreadable cache entry {path}: {str(e)}")
+                self._remove(path)
+                continue
+            # Touch the entry so size eviction drops the least recently used first
+            try:
+                os.utime(path)
+            except OSError:
+                pass  # Evicted by another process after it was read; the frame is still good
+            return df
+        return None
+
+    def put(self, key, df):
+        """Store df under key. Falls back to pickle for frames Feather cannot give back exactly."""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        feather_path, pickle_path = self._entry_paths(key)
+        if HAS_PYARROW and _fits_feather(df):
+            if self._write(feather_path, lambda tmp: df.to_feather(tmp)) and self._reads_back(feather_path, df):
+                self.evict()
+                return
+            self._remove(feather_path)
+        self._write(pickle_path, lambda tmp: df.to_pickle(tmp))
+        self.evict()
+
+    def _reads_back(self, path, df):
+        # Feather turns object columns of numbers into float columns, among others; a hit must equal a fresh parse
+        try:
+            return _read_feather(path).equals(df)
+        except Exception as e:
+            logging.debug(f"Could not read back cache entry {path}: {str(e)}")
+            return False
+
+    def _write(self, path, writer):
+        # Write to a temporary file first so concurrent readers never see a partial entry
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            writer(tmp_path)
+            os.replace(tmp_path, path)
+            return True
+        except Exception as e:
+            logging.debug(f"Could not write cache entry {path}: {str(e)}")
+            self._remove(tmp_path)
+            return False
+
+    def _remove(self, path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def _entries(self):
+        if not os.path.isdir(self.cache_dir):
+            return []
+        entries = []
+        try:
+            names = os.listdir(self.cache_dir)
+        except OSError:
+            return []
+        for name in names:
+            if name.endswith((FEATHER_EXTENSION, PICKLE_EXTENSION)):
+                path = os.path.join(self.cache_dir, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue  # Removed by another process evicting the same folder
+                entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def evict(self):
+        """Drop entries older than the age limit, then the least recently used until under the size limit."""
+        now = time.time()
+        entries = []
+        for mtime, size, path in self._entries():
+            if now - mtime > self.max_age_seconds:
+                self._remove(path)
+            else:
+                entries.append((mtime, size, path))
+
+        total_size = sum(size for _, size, _ in entries)
+        for mtime, size, path in sorted(entries):
+            if total_size <= self.max_size_bytes:
+                break
+            self._remove(path)
+            total_size -= size
+
+    def purge(self):
+        """Remove every cache entry. Returns the number of entries removed."""
+        entries = self._entries()
+        for _, _, path in entries:
+            self._remove(path)
+        logging.info(f"Purged {len(entries)} entries from input cache {self.cache_dir}")
+        return len(entries)
+
+    def stats(self):
+        entries = self._entries()
+        return {'entries': len(entries), 'size_mb': round(sum(size for _, size, _ in entries) / (1024 * 1024), 2)}
+
+    def read(self, file_path, reader, read_function, **options):
+        """Return the parsed file from the cache, parsing and storing it on a miss."""
+        if not self.enabled:
+            return read_function(file_path, **options)
+
+        key = self.cache_key(file_path, reader, options)
+        df = self.get(key)
+        if df is not None:
+            logging.info(f"Loaded {os.path.basename(file_path)} from input cache")
+            return df
+
+        df = read_function(file_path, **options)
+        self.put(key, df)
+        return df
+
+
+default_cache = InputFileCache()
+
+
+def cached_read_excel(file_path, cache=None, **options):
+    """pd.read_excel through the input cache."""
+    return (cache or default_cache).read(file_path, 'read_excel', pd.read_excel, **options)
+
+
+def read_excel_sheets(file_path, **options):
+    """pd.read_excel of every sheet, concatenated in sheet order."""
+    sheets = pd.read_excel(file_path, sheet_name=None, **options)
+    return pd.concat(list(sheets.values()), ignore_index=True)
+
+
+def cached_read_final_file(file_path, cache=None, **options):
+    """Read a final file through the input cache.
+
+    Final files longer than the Excel row limit continue on Sheet2 and later
+    sheets (see output_writer.write_xlsx); their rows are read back as one frame.
+    """
+    return (cache or default_cache).read(file_path, 'read_excel_sheets', read_excel_sheets, **options)
+
+
+def cached_read_csv(file_path, cache=None, **options):
+    """pd.read_csv through the input cache."""
+    return (cache or default_cache).read(file_path, 'read_csv', pd.read_csv, **options)
+
+
+def cached_read_input(file_path, cache=None, **options):
+    """Read a CSV or Excel input file through the input cache, chosen by extension."""
+    if file_path.lower().endswith('.csv'):
+        return cached_read_csv(file_path, cache, **options)
+    return cached_read_excel(file_path, cache, **options)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Manage the parsed input file cache")
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR)
+    parser.add_argument('--purge', action='store_true', help="remove every cached file")
+    parser.add_argument('--evict', action='store_true', help="apply the size and age limits now")
+    parser.add_argument('--stats', action='store_true', help="show the number and size of cached files")
+    args = parser.parse_args()
+
+    cache = InputFileCache(args.cache_dir)
+    if args.purge:
+        print(f"Removed {cache.purge()} cached files")
+    if args.evict:
+        cache.evict()
+    if args.stats or not (args.purge or args.evict):
+        stats = cache.stats()
+        print(f"{args.cache_dir}: {stats['entries']} cached files, {stats['size_mb']} MB")
@@ -0,0 +1,588 @@
+"""The original row-by-row code paths, kept as the reference for output equivalence checks.
+
+LegacyTransactionCompilePipeline runs the pre-optimization
+generate_transaction_values (iterrows lookups, string-merged Relationship IDs
+and string transaction keys), the original full-frame process_data and the
+original create_final_file (plain concat, Relationship IDs converted row by
+row and a global sort) inside the current pipeline.
+LegacyDictionaryLookupManager runs the Giving Dashboard's original
+one-lookup-at-a-time dictionary mapping and per-column groupby Last Gift
+values. They are slow and are not used by the applications;
+output_equivalence.py compares them and any new code path against each other.
+"""
+import logging
+import traceback
+from collections import defaultdict
+import pandas as pd
+from compile_pipeline import TransactionCompilePipeline, FINAL_COLUMNS
+from dictionary_lookup_manager import DictionaryLookupManager
+from duplicate_detection import MATCH_TABLE_COLUMNS
+from data_platform import CONTACT_NAME_COLUMNS
+from utils import generate_fallback_id, add_unique_id
+
+
+class LegacyTransactionCompilePipeline(TransactionCompilePipeline):
+    """TransactionCompilePipeline with the original generate_transaction_values, process_data and create_final_file."""
+
+    def generate_transaction_values(self, platform_dfs):
+        logging.info("Generating transaction values")
+        try:
+            # Create dictionaries for faster lookup
+            dict_indices = defaultdict(list)
+            dict_id = {}
+            dict_primary_id = defaultdict(dict)
+            dict_primary_unique = defaultdict(dict)
+            dict_secondary_id = defaultdict(dict)
+            dict_secondary_id_unique = defaultdict(dict)
+            pre_rel_ids = {}
+
+            # Set up progress tracking
+            total_rows = sum(len(df) for df in platform_dfs.values())
+            rows_processed = 0
+
+            # PHASE 1: Build indices and unique transaction keys
+            logging.info("Phase 1: Building indices and unique transaction keys")
+            
+            # Process base platform data
+            base_platform = next(platform for platform in self.platforms.values() if platform.is_base_platform())
+            base_df = platform_dfs[base_platform.get_platform_name()]
+            
+            for idx, row in base_df.iterrows():
+                primary_key = base_platform.get_relationship_id_key(row)
+                secondary_key = str(row[base_platform.get_secondary_id_field()]) if pd.notnull(row[base_platform.get_secondary_id_field()]) else ''
+                amount = row[base_platform.get_amount_field()]
+                date = pd.to_datetime(row[base_platform.get_date_field()]).date()
+                id_value = row[base_platform.get_id_field()]
+
+                dict_id[idx] = id_value
+                unique_key = base_platform.get_unique_transaction_key(row)
+                
+                base_df.at[idx, 'Unique Transaction'] = unique_key
+
+                if primary_key:
+                    dict_indices[primary_key].append(idx)
+                if secondary_key:
+                    dict_indices[secondary_key].append(idx)
+
+                rows_processed += 1
+                if rows_processed % 100 == 0:
+                    progress = 20 + int((rows_processed / total_rows) * 10)
+                    self.report_progress(progress)
+
+            # Process other platform data for indices
+            for platform_name, df in platform_dfs.items():
+                if platform_name == base_platform.get_platform_name():
+                    continue  # Skip base platform as it's already processed
+                
+                platform = self.platforms[platform_name]
+                for idx, row in df.iterrows():
+                    primary_key = platform.get_relationship_id_key(row)
+                    secondary_key = str(row[platform.get_id_field()])
+                    amount = row[platform.get_amount_field()]
+                    date = pd.to_datetime(row[platform.get_date_field()]).date()
+
+                    if primary_key:
+                        if primary_key in dict_indices:
+                            if idx not in dict_primary_id[platform_name]:
+                                all_ids_primary = dict_indices[primary_key]
+                                unique_keys_primary = set()
+                                for id_value in all_ids_primary:
+                                    id_value = dict_id[id_value]
+                                    unique_key = f"{id_value}{int(date.strftime('%Y%m%d'))}{amount}"
+                                    unique_keys_primary.add(unique_key)
+                                dict_primary_id[platform_name][idx] = all_ids_primary
+                                dict_primary_unique[platform_name][idx] = unique_keys_primary
+                                df.at[idx, f'Unique Transaction {platform_name}'] = '|'.join(unique_keys_primary)
+
+                    if secondary_key:
+                        if secondary_key in dict_indices:
+                            if idx not in dict_secondary_id[platform_name]:
+                                all_ids_secondary = dict_indices[secondary_key]
+                                unique_keys_secondary = set()
+                                for id_value in all_ids_secondary:
+                                    id_value = dict_id[id_value]
+                                    unique_key = f"{id_value}{int(date.strftime('%Y%m%d'))}{amount}"
+                                    unique_keys_secondary.add(unique_key)
+                                dict_secondary_id[platform_name][idx] = all_ids_secondary
+                                dict_secondary_id_unique[platform_name][idx] = unique_keys_secondary
+                                df.at[idx, f'Unique Transaction {platform_name} ID'] = '|'.join(unique_keys_secondary)
+
+                    rows_processed += 1
+                    if rows_processed % 100 == 0:
+                        progress = 30 + int((rows_processed / total_rows) * 10)
+                        self.report_progress(progress)
+
+            # PHASE 2: Build complete relationship ID mappings
+            logging.info("Phase 2: Building complete relationship ID mappings")
+            
+            # First process base platform data to build initial relationship IDs
+            for idx, row in base_df.iterrows():
+                primary_key = base_platform.get_relationship_id_key(row)
+                secondary_key = str(row[base_platform.get_secondary_id_field()]) if pd.notnull(row[base_platform.get_secondary_id_field()]) else ''
+                id_value = row[base_platform.get_id_field()]
+
+                # Handle preRelIDs
+                if primary_key and secondary_key:
+                    if secondary_key in pre_rel_ids and primary_key in pre_rel_ids:
+                        combined_id = add_unique_id(pre_rel_ids[secondary_key], pre_rel_ids[primary_key])
+                        pre_rel_ids[secondary_key] = combined_id
+                        pre_rel_ids[primary_key] = combined_id
+                    elif secondary_key in pre_rel_ids:
+                        pre_rel_ids[primary_key] = pre_rel_ids[secondary_key]
+                    elif primary_key in pre_rel_ids:
+                        pre_rel_ids[secondary_key] = pre_rel_ids[primary_key]
+                    else:
+                        pre_rel_ids[secondary_key] = str(id_value)
+                        pre_rel_ids[primary_key] = str(id_value)
+                elif primary_key:
+                    if primary_key not in pre_rel_ids:
+                        pre_rel_ids[primary_key] = str(id_value)
+                    else:
+                        pre_rel_ids[primary_key] = add_unique_id(pre_rel_ids[primary_key], str(id_value))
+                elif secondary_key:
+                    if secondary_key not in pre_rel_ids:
+                        pre_rel_ids[secondary_key] = str(id_value)
+                    else:
+                        pre_rel_ids[secondary_key] = add_unique_id(pre_rel_ids[secondary_key], str(id_value))
+
+                if idx % 100 == 0:
+                    progress = 40 + int((idx / len(base_df)) * 10)
+                    self.report_progress(progress)
+
+            # Then process other platforms to complete relationship ID mappings
+            for platform_name, df in platform_dfs.items():
+                if platform_name == base_platform.get_platform_name():
+                    continue  # Skip base platform as it's already processed
+                
+                platform = self.platforms[platform_name]
+                for idx, row in df.iterrows():
+                    primary_key = platform.get_relationship_id_key(row)
+                    secondary_key = str(row[platform.get_id_field()])
+
+                    # Update relationship ID mappings
+                    if primary_key and primary_key in pre_rel_ids and secondary_key and secondary_key in pre_rel_ids:
+                        # Both keys exist, combine them
+                        combined_id = add_unique_id(pre_rel_ids[primary_key], pre_rel_ids[secondary_key])
+                        pre_rel_ids[primary_key] = combined_id
+                        pre_rel_ids[secondary_key] = combined_id
+                    elif primary_key and primary_key in pre_rel_ids:
+                        if secondary_key:
+                            pre_rel_ids[secondary_key] = pre_rel_ids[primary_key]
+                    elif secondary_key and secondary_key in pre_rel_ids:
+                        if primary_key:
+                            pre_rel_ids[primary_key] = pre_rel_ids[secondary_key]
+
+                if len(df) > 0 and idx % 100 == 0:
+                    progress = 50 + int((idx / len(df)) * 10)
+                    self.report_progress(progress)
+
+            # PHASE 3: Apply final relationship IDs to all rows
+            logging.info("Phase 3: Applying final relationship IDs to all rows")
+            
+            # Apply to base platform
+            for idx, row in base_df.iterrows():
+                primary_key = base_platform.get_relationship_id_key(row)
+                secondary_key = str(row[base_platform.get_secondary_id_field()]) if pd.notnull(row[base_platform.get_secondary_id_field()]) else ''
+                id_value = row[base_platform.get_id_field()]
+                
+                # Apply the most up-to-date relationship ID
+                if primary_key and primary_key in pre_rel_ids:
+                    base_df.at[idx, 'Relationship ID'] = pre_rel_ids[primary_key]
+                elif secondary_key and secondary_key in pre_rel_ids:
+                    base_df.at[idx, 'Relationship ID'] = pre_rel_ids[secondary_key]
+                else:
+                    base_df.at[idx, 'Relationship ID'] = id_value
+
+                if idx % 100 == 0:
+                    progress = 60 + int((idx / len(base_df)) * 10)
+                    self.report_progress(progress)
+
+            # Apply to other platforms
+            for platform_name, df in platform_dfs.items():
+                if platform_name == base_platform.get_platform_name():
+                    continue  # Skip base platform as it's already processed
+                
+                platform = self.platforms[platform_name]
+                for idx, row in df.iterrows():
+                    primary_key = platform.get_relationship_id_key(row)
+                    secondary_key = str(row[platform.get_id_field()])
+                    
+                    # Apply the most up-to-date relationship ID
+                    if primary_key and primary_key in pre_rel_ids:
+                        df.at[idx, 'Relationship ID'] = pre_rel_ids[primary_key]
+                    elif secondary_key and secondary_key in pre_rel_ids:
+                        df.at[idx, 'Relationship ID'] = pre_rel_ids[secondary_key]
+                    else:
+                        # Handle cases where no match is found
+                        unique_id = platform.get_relationship_id_key(row)
+                        if pd.isna(unique_id) or unique_id == '':
+                            unique_id = generate_fallback_id(row)
+                        df.at[idx, 'Relationship ID'] = unique_id
+
+                if len(df) > 0 and idx % 100 == 0:
+                    progress = 70 + int((idx / len(df)) * 5)
+                    self.report_progress(progress)
+
+            # Find unique transactions across platforms and set duplicate flags
+            all_unique_transactions = set()
+            for platform_name in dict_primary_unique:
+                for idx in dict_primary_unique[platform_name]:
+                    all_unique_transactions.update(dict_primary_unique[platform_name][idx])
+            for platform_name in dict_secondary_id_unique:
+                for idx in dict_secondary_id_unique[platform_name]:
+                    all_unique_transactions.update(dict_secondary_id_unique[platform_name][idx])
+
+            for platform_name, df in platform_dfs.items():
+                platform = self.platforms[platform_name]
+                if platform.is_base_platform():
+                    for idx, row in df.iterrows():
+                        unique_key = row['Unique Transaction']
+                        if unique_key in all_unique_transactions:
+                            df.at[idx, platform.get_duplicate_column_name()] = 'Duplicate'
+                        else:
+                            df.at[idx, platform.get_duplicate_column_name()] = 'Not Duplicate'
+
+            # Handle additional processing for each platform
+            for platform_name, df in platform_dfs.items():
+                platform = self.platforms[platform_name]
+                if not platform.is_base_platform():
+                    for idx, row in df.iterrows():
+                        # Handle ActBlue recurring donations
+                        is_recurring = row.get('Is Recurring', False)
+                        
+                        # Handle both string and boolean values
+                        if isinstance(is_recurring, str):
+                            is_recurring = is_recurring.upper() == 'TRUE'
+                        
+                        if is_recurring:
+                            df.at[idx, 'Is Recurring'] = True
+                            order_number = row[platform.get_id_field()]  # This is Order Number for ActBlue
+                            if pd.notnull(order_number) and order_number != '':
+                                df.at[idx, 'Recurring ID'] = order_number
+                        else:
+                            df.at[idx, 'Is Recurring'] = False
+                else:
+                    for idx, row in df.iterrows():
+                        # Handle EveryAction recurring flag
+                        if row.get('Is Recurring Commitment', 0) == 1:
+                            df.at[idx, 'Is Recurring Commitment'] = True
+                        elif row.get('Is Recurring Commitment', 0) == 0:
+                            df.at[idx, 'Is Recurring Commitment'] = False
+
+            # The legacy path explains no matches; the output only carries the duplicate flag
+            self.duplicate_matches = pd.DataFrame(columns=MATCH_TABLE_COLUMNS)
+            logging.info("Transaction values generation completed")
+            return platform_dfs
+
+        except Exception as e:
+            logging.error("Error in generate_transaction_values function")
+            logging.error(str(e))
+            logging.error(traceback.format_exc())
+            raise
+
+    def process_platform_data(self, platform, df, output_columns):
+        processed_df = legacy_process_data(platform, df)
+        return processed_df.reindex(columns=output_columns, fill_value='')
+
+    def create_final_file(self, platform_dfs, extra_columns=()):
+        logging.info("Creating final file")
+        try:
+            final_columns = FINAL_COLUMNS + list(extra_columns)
+            final_dfs = [self.process_platform_data(self.platforms[platform_name], df, final_columns)
+                         for platform_name, df in platform_dfs.items()]
+
+            # Combine the processed dataframes
+            logging.info("Combining processed dataframes")
+            final_df = pd.concat(final_dfs, ignore_index=True)
+            self.report_progress(75)
+
+            # Convert 'Relationship ID' to numeric where possible, filling back non-numeric values with the originals
+            original_values = final_df['Relationship ID'].copy()
+            final_df['Relationship ID'] = pd.to_numeric(final_df['Relationship ID'], errors='coerce').fillna(original_values)
+
+            # Map Is Recurring to 'TRUE'/'FALSE'
+            recurring_ids = final_df['Recurring ID'].copy()
+            final_df['Is Recurring'] = final_df['Is Recurring'].map({True: 'TRUE', False: 'FALSE'})
+            final_df['Date Clean'] = pd.to_datetime(final_df['Date Clean']).dt.date
+            final_df['Recurring ID'] = recurring_ids
+
+            # Set invalid email values to null
+            final_df.loc[~final_df['Donor Email'].str.contains('@', na=False), 'Donor Email'] = None
+
+            # Sort the final dataframe
+            logging.info("Sorting final dataframe")
+            final_df = final_df.sort_values(by=['Date Clean', 'Amount'])
+            self.report_progress(80)
+
+            logging.info("Final file created successfully")
+            return final_df
+
+        except Exception as e:
+            logging.error("Error in create_final_file function")
+            logging.error(str(e))
+            logging.error(traceback.format_exc())
+            raise
+
+
+class LegacyDictionaryLookupManager(DictionaryLookupManager):
+    """DictionaryLookupManager with the original per-lookup mapping and per-column groupby Last Gift values.
+
+    Dictionaries are read with pd.read_excel on every use, bypassing the lookup cache.
+    """
+
+    def apply_lookup_dictionaries(self, df):
+        """Apply all configured lookup dictionaries to the dataframe."""
+        for lookup in self.lookups:
+            if lookup.get('use_zip_ranges', False):
+                raise ValueError(f"Lookup {lookup.get('name', lookup['output_column'])} uses ZIP ranges, "
+                                 "which have no legacy reference path")
+            if lookup.get('use_multiple_values', False):
+                df = self.apply_multiple_values_lookup(df, lookup)
+            elif lookup.get('use_post_merger', False):
+                df = self.apply_post_merger_logic(df, lookup)
+            elif lookup.get('use_zip_validation', False):
+                df = self.apply_zip_validation_logic(df, lookup)
+            else:
+                df = self.apply_standard_lookup(df, lookup)
+        return df
+
+    def apply_multiple_values_lookup(self, df, lookup):
+        """Apply multiple values dictionary lookup."""
+        dict_df = pd.read_excel(lookup['path'])
+        key_column = dict_df.columns[0]
+        for col in dict_df.columns[1:]:
+            value_dict = self._process_empty_dictionary_values(dict(zip(dict_df[key_column], dict_df[col])), lookup)
+            mapped_values = df[lookup['lookup_column']].map(value_dict)
+            df[col] = self._handle_default_values(mapped_values, lookup)
+        return df
+
+    def apply_standard_lookup(self, df, lookup):
+        """Apply standard dictionary lookup."""
+        dict_df = pd.read_excel(lookup['path'], header=None, names=['key', 'value'])
+        lookup_dict = self._process_empty_dictionary_values(dict(zip(dict_df['key'], dict_df['value'])), lookup)
+        mapped_values = df[lookup['lookup_column']].map(lookup_dict)
+        df[lookup['output_column']] = self._handle_default_values(mapped_values, lookup)
+        return df
+
+    def apply_post_merger_logic(self, df, lookup):
+        """Apply post-merger logic to the lookup."""
+        value_dict = {value['key']: value['value'] for value in lookup['values']}
+        value_dict.update({value['merger_key']: value['value']
+                          for value in lookup['values'] if value['merger_key']})
+        clean_name_dict = {value['key']: value.get('clean_name', value['key'])
+                           for value in lookup['values']}
+        clean_merger_name_dict = {value['merger_key']: value.get('clean_merger_name', value['merger_key'])
+                                  for value in lookup['values'] if value['merger_key']}
+
+        value_dict = self._process_empty_dictionary_values(value_dict, lookup)
+        mapped_values = df[lookup['lookup_column']].map(value_dict)
+        df[lookup['output_column']] = self._handle_default_values(mapped_values, lookup)
+
+        # Apply the clean name logic to the lookup column
+        df[lookup['lookup_column']] = df[lookup['lookup_column']].apply(
+            lambda x: clean_name_dict.get(x, clean_merger_name_dict.get(x, x))
+        )
+        return df
+
+    def apply_zip_validation_logic(self, df, lookup):
+        """Apply zip code validation logic to the lookup."""
+        dict_df = pd.read_excel(lookup['path'], header=None, names=['key', 'value'])
+        lookup_dict = self._process_empty_dictionary_values(dict(zip(dict_df['key'], dict_df['value'])), lookup)
+        processed_zips = df[lookup['lookup_column']].apply(legacy_process_zip_code)
+        mapped_values = processed_zips.map(lookup_dict)
+        df[lookup['output_column']] = self._handle_default_values(mapped_values, lookup)
+        return df
+
+    def get_last_gift_columns(self, df, lookups=None):
+        """Get last gift values for specified columns."""
+        if lookups is None:
+            lookups = self.lookups
+
+        last_gift_columns = [
+            'Transaction ID', 'Date Clean', 'Amount', 'Giving Platform',
+            'Gift Range Chart', 'Gift Segment', 'Is Recurring'
+        ]
+        for lookup in lookups:
+            if lookup.get('include_in_last_gift', False):
+                if lookup.get('use_multiple_values', False):
+                    last_gift_columns.extend(pd.read_excel(lookup['path']).columns[1:])
+                else:
+                    last_gift_columns.append(lookup['output_column'])
+
+        result_df = df.copy()
+        for col in last_gift_columns:
+            if col in df.columns:
+                result_df[f'Last Gift {col}'] = df.groupby('Relationship ID', observed=True)[col].shift()
+        return result_df
+
+
+def legacy_process_zip_code(zip_code):
+    """The original DictionaryLookupManager._process_zip_code: one ZIP code to its integer key, or None."""
+    if pd.isna(zip_code):
+        return None
+
+    if isinstance(zip_code, float):
+        zip_code = str(int(zip_code))
+    else:
+        zip_code = str(zip_code).strip()
+
+    # Handle zip+4 format (e.g., 33613-7716)
+    if '-' in zip_code:
+        zip_code = zip_code.split('-')[0]
+
+    # Remove leading zeros
+    zip_code = zip_code.lstrip('0')
+
+    # Ensure it's a number
+    if zip_code.isdigit():
+        return int(zip_code)
+    else:
+        return None
+
+
+def legacy_process_data(platform, df):
+    """The original Platform.process_data: mutates and returns the full source frame."""
+    logging.info(f"Processing data for platform: {platform.name}")
+    logging.info(f"Is base platform: {platform._is_base_platform}")
+    logging.info(f"Relationship ID key: {platform.relationship_id_key}")
+
+    # Handle date fallback if configured
+    if platform.date_fallback_field and platform.date_fallback_field in df.columns:
+        logging.info(f"Checking date fallback field: {platform.date_fallback_field}")
+        mask = pd.isna(df[platform.date_field]) | (df[platform.date_field] == '')
+        df.loc[mask, platform.date_field] = df.loc[mask, platform.date_fallback_field]
+        logging.info(f"Applied date fallback for {mask.sum()} rows")
+
+    # Set Date Clean directly from processed date field
+    try:
+        df['Date Clean'] = pd.to_datetime(df[platform.date_field]).dt.date
+        logging.info("Successfully set Date Clean field")
+    except Exception as e:
+        logging.error(f"Error setting Date Clean field: {str(e)}")
+        df['Date Clean'] = ''
+
+    # Copy amount field to Amount column
+    try:
+        df['Amount'] = df[platform.amount_field]
+        logging.info("Successfully set Amount field")
+    except Exception as e:
+        logging.error(f"Error setting Amount field: {str(e)}")
+        df['Amount'] = ''
+
+    df['Giving Platform'] = platform.get_platform_name()
+
+    # Initialize has_display_name if not set
+    if not hasattr(platform, 'has_display_name'):
+        platform.has_display_name = False
+        
+    # Initialize Display Name
+    df['Display Name'] = ''
+    
+    # Only initialize Recurring ID if it doesn't exist or is empty
+    if 'Recurring ID' not in df.columns or df['Recurring ID'].isna().all():
+        df['Recurring ID'] = ''
+        
+    # Initialize Is Recurring if it doesn't exist with proper boolean value
+    if 'Is Recurring' not in df.columns:
+        df['Is Recurring'] = False
+
+    for target_col, mapping in platform.column_mapping.items():
+        source_col = mapping['target']
+        default_value = mapping['default']
+        logging.info(f"Mapping column: Target = {target_col}, Source = {source_col}")
+        
+        try:
+            if target_col == 'Recurring ID':
+                if source_col != 'N/A':
+                    if source_col in df.columns:
+                        df[target_col] = df[source_col]
+                    else:
+                        logging.warning(f"Source column {source_col} not found for Recurring ID. Using default value \"{default_value}\"")
+                        df[target_col] = default_value
+            else:
+                if source_col != 'N/A':
+                    if source_col in df.columns:
+                        df[target_col] = df[source_col]
+                        logging.info(f"Successfully mapped {source_col} to {target_col}")
+                    else:
+                        logging.warning(f"Source column {source_col} not found in DataFrame. Using default value \"{default_value}\" for {target_col}")
+                        df[target_col] = default_value
+                elif target_col != 'Recurring ID':  # Don't set default for Recurring ID when source is N/A
+                    if target_col == 'Is Recurring':
+                        if platform.recurring_true_value and source_col in df.columns:
+                            # Use configured recurring true value if available
+                            df[target_col] = df[source_col].astype(str) == platform.recurring_true_value
+                            logging.info(f"Set Is Recurring based on value '{platform.recurring_true_value}'")
+                        else:
+                            # Fall back to default TRUE/FALSE behavior
+                            bool_value = default_value.upper() == 'TRUE'
+                            df[target_col] = bool_value
+                            logging.info(f"Set Is Recurring to boolean value {bool_value}")
+                    else:
+                        df[target_col] = default_value
+                        logging.info(f"Using default value \"{default_value}\" for {target_col}")
+        except Exception as e:
+            logging.error(f"Error processing column {target_col}: {str(e)}")
+            logging.info(f"Continuing to next column")
+            continue
+
+    if platform._is_base_platform:
+        duplicate_col = platform.get_duplicate_column_name()
+        if duplicate_col in df.columns:
+            df = df[df[duplicate_col] != 'Duplicate']
+            logging.info(f"Filtered out duplicate entries using column: {duplicate_col}")
+        else:
+            logging.warning(f"Duplicate column {duplicate_col} not found. Skipping duplicate filtering.")
+    
+    # Store important columns that need to be preserved
+    recurring_ids = df['Recurring ID'].copy()
+
+    # Handle Match? column based on Reason column if it exists
+    df['Match?'] = 'Not a Match'  # Default value
+    if 'Reason' in df.columns:
+        df.loc[df['Reason'] == 'Match', 'Match?'] = 'Match'
+
+    # Handle Display Name logic after all column mappings are done
+    if not platform.has_display_name:
+        logging.info("Processing display name logic")
+        
+        # Get mapped donor name fields (these will be in the final output)
+        first_name = df.get('Donor First Name', pd.Series(''))
+        last_name = df.get('Donor Last Name', pd.Series(''))
+        
+        # Create initial display name from first/last name
+        df['Display Name'] = first_name.fillna('').str.strip() + ' ' + last_name.fillna('').str.strip()
+        df['Display Name'] = df['Display Name'].str.strip()
+        
+        # Identify rows where display name is empty or just whitespace
+        empty_display_mask = (df['Display Name'].isna()) | (df['Display Name'] == '')
+        logging.debug(f"Found {empty_display_mask.sum()} rows with empty display names")
+        
+        # Try to get contact name from source data (before column mapping)
+        # Check various possible column names for contact name
+        source_contact_name = None
+        
+        for col in CONTACT_NAME_COLUMNS:
+            if col in df.columns:
+                source_contact_name = df[col]
+                logging.info(f"Found contact name in source column: {col}")
+                break
+        
+        if source_contact_name is not None:
+            # Use contact name as fallback where available
+            has_contact_mask = source_contact_name.notna() & (source_contact_name != '')
+            fallback_mask = empty_display_mask & has_contact_mask
+            
+            if fallback_mask.any():
+                logging.info(f"Using contact name as fallback for {fallback_mask.sum()} rows")
+                df.loc[fallback_mask, 'Display Name'] = source_contact_name[fallback_mask].str.strip()
+        
+        # Log final results
+        final_empty_mask = (df['Display Name'].isna()) | (df['Display Name'] == '')
+        logging.info(f"Final count of empty display names: {final_empty_mask.sum()}")
+
+    # Restore Recurring ID after display name processing
+    df['Recurring ID'] = recurring_ids
+
+    logging.info(f"Finished processing data for platform: {platform.name}")
+    return df
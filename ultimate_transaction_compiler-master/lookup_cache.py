@@ -0,0 +1,134 @@
+"""Compiled lookup dictionaries, parsed once and kept in a sidecar next to the workbook.
+
+The dashboard and the RFM tools look values up in the same dictionary
+workbooks (ZIP -> MSA, form URL -> split, ...) several times per run. Each
+workbook is parsed once into the structure the lookups use (a key -> value
+dict, one per value column, or a ZIP range table) and saved as
+``<dictionary> - Lookup Cache.pkl``, so later steps, tools and runs load the pickle instead. The
+sidecar is ignored once the workbook's size or modification time changes.
+
+The returned dicts and frames are shared; callers must not modify them.
+"""
+import logging
+import os
+import pickle
+import pandas as pd
+from zip_lookup import ZipRangeTable
+
+LOOKUP_CACHE_SUFFIX = ' - Lookup Cache.pkl'
+LOOKUP_CACHE_VERSION = 1
+
+
+def _file_stamp(path):
+    stat = os.stat(path)
+    return {'file_size': stat.st_size, 'file_mtime': stat.st_mtime, 'pandas': pd.__version__,
+            'format': LOOKUP_CACHE_VERSION}
+
+
+def _value_map(path):
+    # Two columns without a header; later rows win for repeated keys, as dict(zip(...)) always did
+    dict_df = pd.read_excel(path, header=None, names=['key', 'value'])
+    return dict(zip(dict_df['key'], dict_df['value']))
+
+
+def _column_maps(path):
+    # First column is the key, every other column a value column named by its header
+    dict_df = pd.read_excel(path)
+    key_column = dict_df.columns[0]
+    return {column: dict(zip(dict_df[key_column], dict_df[column])) for column in dict_df.columns[1:]}
+
+
+def _zip_ranges(path):
+    # Three columns without a header: start ZIP, end ZIP and the value of the range
+    dict_df = pd.read_excel(path, header=None, names=['start', 'end', 'value'])
+    return ZipRangeTable(dict_df['start'], dict_df['end'], dict_df['value'])
+
+
+def _table(path):
+    return pd.read_excel(path)
+
+
+BUILDERS = {'value_map': _value_map, 'column_maps': _column_maps, 'zip_ranges': _zip_ranges, 'table': _table}
+
+
+def lookup_cache_path(path):
+    return f"{os.path.splitext(path)[0]}{LOOKUP_CACHE_SUFFIX}"
+
+
+class LookupDictionaryCache:
+    """Compiled lookup dictionaries by workbook path, in memory and in sidecar files."""
+
+    def __init__(self, use_sidecars=True):
+        self.use_sidecars = use_sidecars
+        self.entries = {}  # path -> {'stamp': ..., 'compiled': {kind: structure}}
+
+    def get(self, path, kind):
+        """The workbook at path compiled as kind ('value_map', 'column_maps', 'zip_ranges' or 'table')."""
+        stamp = _file_stamp(path)
+        entry = self.entries.get(path)
+        if entry is None or entry['stamp'] != stamp:
+            entry = self._load_sidecar(path, stamp) or {'stamp': stamp, 'compiled': {}}
+            self.entries[path] = entry
+        if kind not in entry['compiled']:
+            entry['compiled'][kind] = BUILDERS[kind](path)
+            logging.info(f"Compiled lookup dictionary {os.path.basename(path)} ({kind})")
+            self._save_sidecar(path, entry)
+        return entry['compiled'][kind]
+
+    def _load_sidecar(self, path, stamp):
+        sidecar = lookup_cache_path(path)
+        if not self.use_sidecars or not os.path.exists(sidecar):
+            return None
+        try:
+            with open(sidecar, 'rb') as f:
+                entry = pickle.load(f)
+            if entry['stamp'] != stamp:
+                logging.info(f"Ignoring lookup cache {sidecar}: the dictionary changed since it was saved")
+                return None
+            logging.info(f"Loaded lookup dictionary {os.path.basename(path)} from {sidecar}")
+            return entry
+        except Exception as e:
+            logging.warning(f"Could not read lookup cache {sidecar}: {str(e)}")
+            return None
+
+    def _save_sidecar(self, path, entry):
+        if not self.use_sidecars:
+            return
+        sidecar = lookup_cache_path(path)
+        # Write to a temporary file first so another tool never reads a partial sidecar
+        tmp_path = f"{sidecar}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, sidecar)
+        except Exception as e:
+            # The dictionary folder may be read-only; the in-memory entry still serves this run
+            logging.warning(f"Could not save lookup cache {sidecar}: {str(e)}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def clear(self):
+        self.entries.clear()
+
+
+default_lookup_cache = LookupDictionaryCache()
+
+
+def read_value_map(path, cache=None):
+    """key -> value dict of a two-column dictionary workbook without a header."""
+    return (cache or default_lookup_cache).get(path, 'value_map')
+
+
+def read_column_maps(path, cache=None):
+    """value column -> (key -> value dict) of a multiple-values dictionary workbook, keyed on its first column."""
+    return (cache or default_lookup_cache).get(path, 'column_maps')
+
+
+def read_zip_ranges(path, cache=None):
+    """ZipRangeTable of a start ZIP / end ZIP / value dictionary workbook without a header."""
+    return (cache or default_lookup_cache).get(path, 'zip_ranges')
+
+
+def read_lookup_table(path, cache=None):
+    """A dictionary workbook as a frame, with its header row as the column names."""
+    return (cache or default_lookup_cache).get(path, 'table')
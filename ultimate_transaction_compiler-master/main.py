@@ -1,5 +1,6 @@
 import tkinter as tk
 import logging
+import multiprocessing
 import traceback
 import sys
 from app_launcher import AppLauncher
@@ -40,6 +41,8 @@ class ThemeManager:
             self.current_theme = "minimal"
 
 if __name__ == "__main__":
+    # Needed for the process pool used to read input files in the frozen executable
+    multiprocessing.freeze_support()
     logging.basicConfig(filename='application.log', level=logging.DEBUG, 
                         format='%(asctime)s - %(levelname)s - %(message)s')
     logging.info("Starting Application Launcher")
@@ -0,0 +1,307 @@
+"""Golden-output equivalence checks between a reference and a candidate code path.
+
+Two frames are compared cell by cell after normalizing what should not count
+as a difference: row order, numbers stored as text or as floats, dates stored
+as dates, timestamps or text, booleans against 'TRUE'/'FALSE' and the
+different spellings of an empty cell.
+
+Command line usage, either on two saved outputs:
+
+    python output_equivalence.py --expected old.xlsx --actual new.xlsx --report diff
+
+or by running two compile paths on the same inputs:
+
+    python output_equivalence.py --input "EveryAction=ea.xlsx" --input "ActBlue=ab.xlsx" \\
+        --reference legacy --candidate current --report diff
+
+or by running the Giving Dashboard's lookup and Last Gift steps of two paths
+on the same final file:
+
+    python output_equivalence.py --final-file DynamicFinalFile.xlsx --lookups lookup_dictionaries.json \\
+        --reference legacy --candidate current --report diff
+"""
+import argparse
+import copy
+import datetime
+import functools
+import logging
+import sys
+import numpy as np
+import pandas as pd
+from input_cache import read_excel_sheets
+
+FINAL_FILE_KEY_COLUMNS = ['Giving Platform', 'Transaction ID']
+MISMATCH_COLUMNS = ['Row Key', 'Column', 'Expected', 'Actual']
+FLOAT_DECIMALS = 6
+MAX_EXAMPLE_LENGTH = 80
+
+
+def _canonical_value(value):
+    if value is None or value is pd.NaT or value is pd.NA:
+        return ''
+    if isinstance(value, (bool, np.bool_)):
+        return 'TRUE' if value else 'FALSE'
+    if isinstance(value, (pd.Timestamp, datetime.datetime)):
+        return value.strftime('%Y-%m-%d') if value == value.replace(hour=0, minute=0, second=0, microsecond=0) \
+            else value.isoformat()
+    if isinstance(value, datetime.date):
+        return value.isoformat()
+    if isinstance(value, (int, float, np.integer, np.floating)):
+        return '' if pd.isna(value) else _canonical_number(float(value))
+    text = str(value).strip()
+    if text.upper() in ('TRUE', 'FALSE'):
+        return text.upper()
+    if text.lower() in ('nan', 'none', 'nat'):
+        return ''
+    try:
+        return _canonical_number(float(text))
+    except ValueError:
+        return text
+
+
+def _canonical_number(number):
+    rounded = round(number, FLOAT_DECIMALS)
+    return str(int(rounded)) if rounded.is_integer() else repr(rounded)
+
+
+def _shorten(text):
+    # Full values stay in the mismatches CSV; the summary only needs enough to recognize them
+    return text if len(text) <= MAX_EXAMPLE_LENGTH else f"{text[:MAX_EXAMPLE_LENGTH - 3]}..."
+
+
+def normalize_frame(df):
+    """Every cell as a canonical string, so equal values compare equal whatever their dtype."""
+    normalized = {}
+    for column in df.columns:
+        values = df[column]
+        if pd.api.types.is_bool_dtype(values):
+            normalized[column] = values.map({True: 'TRUE', False: 'FALSE'}).fillna('')
+        elif pd.api.types.is_numeric_dtype(values):
+            normalized[column] = values.astype(float).round(FLOAT_DECIMALS).map(
+                lambda number: '' if pd.isna(number) else _canonical_number(number))
+        else:
+            normalized[column] = values.map(_canonical_value)
+    return pd.DataFrame(normalized, index=df.index).astype(object)
+
+
+class EquivalenceReport:
+    """Result of comparing an expected (reference) frame with an actual (candidate) frame."""
+
+    def __init__(self, expected_rows, actual_rows):
+        self.expected_rows = expected_rows
+        self.actual_rows = actual_rows
+        self.key_columns = []
+        self.columns_only_expected = []
+        self.columns_only_actual = []
+        self.keys_only_expected = []
+        self.keys_only_actual = []
+        self.duplicate_keys = []
+        self.dtype_differences = {}
+        self.order_differs = False
+        self.mismatches = pd.DataFrame(columns=MISMATCH_COLUMNS)
+
+    @property
+    def is_equivalent(self):
+        return (self.expected_rows == self.actual_rows and not self.columns_only_expected
+                and not self.columns_only_actual and not self.keys_only_expected and not self.keys_only_actual
+                and self.mismatches.empty)
+
+    def summary(self, max_examples=10):
+        """Readable report of every kind of difference found."""
+        lines = [f"Equivalent: {'yes' if self.is_equivalent else 'NO'}",
+                 f"Rows: expected {self.expected_rows}, actual {self.actual_rows}"]
+        if self.key_columns:
+            lines.append(f"Rows matched on: {', '.join(self.key_columns)}")
+        if self.columns_only_expected:
+            lines.append(f"Columns missing from actual: {', '.join(map(str, self.columns_only_expected))}")
+        if self.columns_only_actual:
+            lines.append(f"Columns only in actual: {', '.join(map(str, self.columns_only_actual))}")
+        if self.keys_only_expected:
+            lines.append(f"{len(self.keys_only_expected)} row keys missing from (or fewer times in) actual, e.g. {self.keys_only_expected[:max_examples]}")
+        if self.keys_only_actual:
+            lines.append(f"{len(self.keys_only_actual)} row keys only (or more times) in actual, e.g. {self.keys_only_actual[:max_examples]}")
+        if self.duplicate_keys:
+            lines.append(f"{len(self.duplicate_keys)} row keys are not unique and were compared in sorted order")
+        if self.order_differs:
+            lines.append("Row order differs (ignored for the cell comparison)")
+        for column, (expected_dtype, actual_dtype) in self.dtype_differences.items():
+            lines.append(f"dtype of {column}: expected {expected_dtype}, actual {actual_dtype} (values normalized)")
+
+        if not self.mismatches.empty:
+            lines.append(f"{len(self.mismatches)} differing cells in {self.mismatches['Row Key'].nunique()} rows:")
+            counts = self.mismatches['Column'].value_counts()
+            for column, count in counts.items():
+                lines.append(f"  {column}: {count} cells")
+                examples = self.mismatches[self.mismatches['Column'] == column].head(max_examples)
+                for _, example in examples.iterrows():
+                    lines.append(f"    {example['Row Key']}: expected {_shorten(example['Expected'])!r}, "
+                                 f"actual {_shorten(example['Actual'])!r}")
+        return '\n'.join(lines)
+
+    def save(self, report_prefix):
+        """Write '<prefix>.txt' with the summary and '<prefix> - Mismatches.csv' with every differing cell."""
+        with open(f"{report_prefix}.txt", 'w') as f:
+            f.write(self.summary() + '\n')
+        self.mismatches.to_csv(f"{report_prefix} - Mismatches.csv", index=False)
+        logging.info(f"Saved equivalence report to: {report_prefix}.txt")
+
+
+def _row_keys(normalized, key_columns):
+    if key_columns:
+        return normalized[key_columns].agg(' | '.join, axis=1)
+    return pd.Series([f"row {position}" for position in range(len(normalized))], index=normalized.index)
+
+
+def compare_frames(expected, actual, key_columns=None, ignore_columns=()):
+    """Compare two frames cell by cell and return an EquivalenceReport.
+
+    Rows are matched on key_columns when given (for the final file,
+    FINAL_FILE_KEY_COLUMNS). Without keys both frames are sorted on all
+    shared columns and compared position by position.
+    """
+    report = EquivalenceReport(len(expected), len(actual))
+    ignore_columns = set(ignore_columns)
+    report.columns_only_expected = [c for c in expected.columns if c not in actual.columns and c not in ignore_columns]
+    report.columns_only_actual = [c for c in actual.columns if c not in expected.columns and c not in ignore_columns]
+    columns = [c for c in expected.columns if c in actual.columns and c not in ignore_columns]
+    report.dtype_differences = {c: (str(expected[c].dtype), str(actual[c].dtype)) for c in columns
+                                if expected[c].dtype != actual[c].dtype}
+
+    expected_norm = normalize_frame(expected[columns]).reset_index(drop=True)
+    actual_norm = normalize_frame(actual[columns]).reset_index(drop=True)
+    key_columns = [c for c in (key_columns or []) if c in columns]
+    report.key_columns = key_columns
+    sort_columns = key_columns + [c for c in columns if c not in key_columns]
+
+    expected_keys = _row_keys(expected_norm, key_columns)
+    actual_keys = _row_keys(actual_norm, key_columns)
+    if key_columns:
+        report.order_differs = len(expected_keys) == len(actual_keys) and not expected_keys.equals(actual_keys)
+        report.duplicate_keys = sorted(set(expected_keys[expected_keys.duplicated()]) |
+                                       set(actual_keys[actual_keys.duplicated()]))
+        # Keys present a different number of times on each side cannot be paired up row by row
+        expected_counts = expected_keys.value_counts()
+        actual_counts = actual_keys.value_counts().reindex(expected_counts.index.union(actual_keys.unique()), fill_value=0)
+        expected_counts = expected_counts.reindex(actual_counts.index, fill_value=0)
+        report.keys_only_expected = sorted(expected_counts.index[expected_counts > actual_counts])
+        report.keys_only_actual = sorted(actual_counts.index[actual_counts > expected_counts])
+        unpaired = set(report.keys_only_expected) | set(report.keys_only_actual)
+        expected_norm = expected_norm[~expected_keys.isin(unpaired)]
+        actual_norm = actual_norm[~actual_keys.isin(unpaired)]
+    elif len(expected_norm) != len(actual_norm):
+        logging.warning("Row counts differ and no key columns were given; skipped the cell comparison")
+        expected_norm, actual_norm = expected_norm.iloc[:0], actual_norm.iloc[:0]
+
+    expected_sorted = expected_norm.sort_values(sort_columns, kind='stable').reset_index(drop=True)
+    actual_sorted = actual_norm.sort_values(sort_columns, kind='stable').reset_index(drop=True)
+    row_keys = _row_keys(expected_sorted, key_columns)
+
+    differs = expected_sorted.ne(actual_sorted)
+    rows, cols = np.nonzero(differs.values)
+    report.mismatches = pd.DataFrame({
+        'Row Key': row_keys.values[rows],
+        'Column': np.array(columns, dtype=object)[cols],
+        'Expected': expected_sorted.values[rows, cols],
+        'Actual': actual_sorted.values[rows, cols]
+    }, columns=MISMATCH_COLUMNS)
+    return report
+
+
+def compare_pipelines(reference, candidate, platform_dfs, key_columns=FINAL_FILE_KEY_COLUMNS, ignore_columns=()):
+    """Run two pipelines on copies of the same platform frames and compare their final files.
+
+    reference and candidate are TransactionCompilePipeline instances (or
+    anything with generate_transaction_values and create_final_file).
+    """
+    outputs = []
+    for pipeline in (reference, candidate):
+        frames = {name: df.copy(deep=True) for name, df in platform_dfs.items()}
+        pipeline.platforms = copy.deepcopy(pipeline.platforms)
+        frames = pipeline.generate_transaction_values(frames)
+        outputs.append(pipeline.create_final_file(frames))
+    return compare_frames(outputs[0], outputs[1], key_columns=key_columns, ignore_columns=ignore_columns)
+
+
+def compare_dashboard_steps(reference, candidate, final_df, key_columns=FINAL_FILE_KEY_COLUMNS, ignore_columns=()):
+    """Run the dashboard's lookup and Last Gift steps of two paths on copies of final_df and compare the results.
+
+    reference and candidate are (lookup manager, typed) pairs: typed paths get
+    the frame in the compact types of final_schema, as the dashboard loads it
+    now, the others get it as read from the file. Both see the rows in the
+    same (Relationship ID, Date Clean) order.
+    """
+    from final_schema import to_typed_frame
+    from sort_index import donor_order
+    final_df = final_df.take(donor_order(to_typed_frame(final_df.copy())))
+    outputs = []
+    for manager, typed in (reference, candidate):
+        df = to_typed_frame(final_df.copy()) if typed else final_df.copy()
+        df = manager.apply_lookup_dictionaries(df)
+        outputs.append(manager.get_last_gift_columns(df))
+    return compare_frames(outputs[0], outputs[1], key_columns=key_columns, ignore_columns=ignore_columns)
+
+
+def _dashboard_paths(lookups_file):
+    from dictionary_lookup_manager import DictionaryLookupManager
+    from legacy_pipeline import LegacyDictionaryLookupManager
+    return {'legacy': (LegacyDictionaryLookupManager(lookups_file), False),
+            'current': (DictionaryLookupManager(lookups_file), True)}
+
+
+def _pipeline_classes():
+    # Imported here so comparing two saved files does not need the compile modules
+    from compile_pipeline import TransactionCompilePipeline
+    from legacy_pipeline import LegacyTransactionCompilePipeline
+    return {'legacy': LegacyTransactionCompilePipeline, 'current': TransactionCompilePipeline,
+            'polars': functools.partial(TransactionCompilePipeline, backend='polars')}
+
+
+def _read_frame(file_path):
+    # Long xlsx outputs continue on later sheets
+    return pd.read_csv(file_path) if file_path.lower().endswith('.csv') else read_excel_sheets(file_path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cell-by-cell equivalence check of two outputs or two compile paths")
+    parser.add_argument('--expected', help="reference output file (.xlsx or .csv)")
+    parser.add_argument('--actual', help="candidate output file (.xlsx or .csv)")
+    parser.add_argument('--key', action='append', help="key column to match rows on; repeatable")
+    parser.add_argument('--ignore', action='append', default=[], help="column to leave out of the comparison")
+    parser.add_argument('--config', default='platform_config.json', help="platform config JSON for --input")
+    parser.add_argument('--input', action='append', metavar='PLATFORM=PATH', help="compile input, as for compile_pipeline.py")
+    parser.add_argument('--final-file', help="final file to run the dashboard steps on (.xlsx or .csv)")
+    parser.add_argument('--lookups', default='lookup_dictionaries.json', help="lookup dictionaries JSON for --final-file")
+    parser.add_argument('--reference', default='legacy',
+                        help="reference path (legacy, current or polars; legacy or current with --final-file)")
+    parser.add_argument('--candidate', default='current',
+                        help="candidate path (legacy, current or polars; legacy or current with --final-file)")
+    parser.add_argument('--report', help="write '<REPORT>.txt' and '<REPORT> - Mismatches.csv'")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.WARNING, format='%(levelname)s - %(message)s')
+
+    if args.expected and args.actual:
+        report = compare_frames(_read_frame(args.expected), _read_frame(args.actual), key_columns=args.key,
+                                ignore_columns=args.ignore)
+    elif args.input:
+        from compile_pipeline import load_platforms, parse_input_args
+        from file_ingestion import read_platform_files
+        pipelines = _pipeline_classes()
+        platforms = load_platforms(args.config)
+        platform_dfs = read_platform_files(parse_input_args(args.input, platforms))
+        report = compare_pipelines(pipelines[args.reference](platforms), pipelines[args.candidate](platforms),
+                                   platform_dfs, key_columns=args.key or FINAL_FILE_KEY_COLUMNS, ignore_columns=args.ignore)
+    elif args.final_file:
+        paths = _dashboard_paths(args.lookups)
+        report = compare_dashboard_steps(paths[args.reference], paths[args.candidate], _read_frame(args.final_file),
+                                         key_columns=args.key or FINAL_FILE_KEY_COLUMNS, ignore_columns=args.ignore)
+    else:
+        parser.error("give either --expected and --actual, --input, or --final-file")
+
+    print(report.summary())
+    if args.report:
+        report.save(args.report)
+    return 0 if report.is_equivalent else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
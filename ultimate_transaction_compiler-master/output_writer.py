@@ -0,0 +1,159 @@
+"""Chunked writers for the final file: constant-memory xlsx, CSV and Parquet."""
+import logging
+import os
+import pandas as pd
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Alignment, Border, Font, Side
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+EXCEL_MAX_ROWS = 1048576  # Including the header row
+DEFAULT_CHUNK_SIZE = 50000
+OUTPUT_FORMATS = {'.xlsx': 'xlsx', '.csv': 'csv', '.parquet': 'parquet'}
+
+
+def get_output_format(file_path, output_format=None):
+    """Output format from the explicit option, else from the file extension."""
+    if output_format:
+        return output_format.lower()
+    extension = os.path.splitext(file_path)[1].lower()
+    if extension not in OUTPUT_FORMATS:
+        raise ValueError(f"Unsupported output file type '{extension}'. Use one of: {', '.join(OUTPUT_FORMATS)}")
+    return OUTPUT_FORMATS[extension]
+
+
+def _chunks(df, chunk_size, prepare_chunk=None):
+    # Tables staged outside pandas (see duckdb_backend) read their own chunks
+    if hasattr(df, 'iter_chunks'):
+        chunks = df.iter_chunks(chunk_size)
+    else:
+        chunks = (df.iloc[start:start + chunk_size] for start in range(0, len(df), chunk_size))
+    for chunk in chunks:
+        yield prepare_chunk(chunk) if prepare_chunk else chunk
+
+
+def _excel_rows(chunk):
+    # Missing values become empty cells; object dtype turns numpy scalars into plain Python values
+    values = chunk.astype(object).where(chunk.notna(), None)
+    return values.itertuples(index=False, name=None)
+
+
+def _header_cells(sheet, columns):
+    # Same look as the header pandas.to_excel writes
+    border = Side(style='thin')
+    cells = []
+    for column in columns:
+        cell = WriteOnlyCell(sheet, value=str(column))
+        cell.font = Font(bold=True)
+        cell.alignment = Alignment(horizontal='center', vertical='top')
+        cell.border = Border(left=border, right=border, top=border, bottom=border)
+        cells.append(cell)
+    return cells
+
+
+def _new_sheet(workbook, columns):
+    sheet = workbook.create_sheet(f"Sheet{len(workbook.worksheets) + 1}")
+    sheet.append(_header_cells(sheet, columns))
+    return sheet
+
+
+def write_xlsx(df, file_path, chunk_size=DEFAULT_CHUNK_SIZE, on_rows=None, max_rows=EXCEL_MAX_ROWS,
+               prepare_chunk=None):
+    """Stream df into a write-only workbook, starting a new sheet whenever one is full.
+
+    input_cache.cached_read_final_file reads the sheets back as one frame.
+    """
+    workbook = Workbook(write_only=True)
+    rows_per_sheet = max_rows - 1
+    sheet_count = max(1, -(-len(df) // rows_per_sheet))
+    if sheet_count > 1:
+        logging.info(f"{len(df)} rows exceed the Excel row limit; splitting across {sheet_count} sheets")
+
+    rows_written = 0
+    sheet = _new_sheet(workbook, df.columns)
+    sheet_rows = 0
+    for chunk in _chunks(df, chunk_size, prepare_chunk):
+        for row in _excel_rows(chunk):
+            if sheet_rows == rows_per_sheet:
+                sheet = _new_sheet(workbook, df.columns)
+                sheet_rows = 0
+            sheet.append(row)
+            sheet_rows += 1
+        rows_written += len(chunk)
+        if on_rows:
+            on_rows(rows_written)
+    workbook.save(file_path)
+
+
+def write_csv(df, file_path, chunk_size=DEFAULT_CHUNK_SIZE, on_rows=None, prepare_chunk=None):
+    """Write df to CSV a chunk at a time."""
+    if len(df) == 0:
+        pd.DataFrame(columns=df.columns).to_csv(file_path, index=False)
+        return
+
+    rows_written = 0
+    for chunk in _chunks(df, chunk_size, prepare_chunk):
+        chunk.to_csv(file_path, index=False, mode='w' if rows_written == 0 else 'a', header=rows_written == 0)
+        rows_written += len(chunk)
+        if on_rows:
+            on_rows(rows_written)
+
+
+def write_parquet(df, file_path, chunk_size=DEFAULT_CHUNK_SIZE, on_rows=None, prepare_chunk=None):
+    """Write df to Parquet with one row group per chunk. Needs pyarrow.
+
+    Parquet stores the typed columns as they are, so prepare_chunk is not applied.
+    """
+    if not HAS_PYARROW:
+        raise ImportError("Parquet output requires pyarrow. Install it or save as .xlsx or .csv instead.")
+
+    # Mixed-type object columns (numbers and text in one column) are stored as text
+    df = df.copy()
+    for column in df.columns[df.dtypes == object]:
+        df[column] = df[column].where(df[column].isna(), df[column].astype(str))
+    # So are categoricals with mixed categories, such as Relationship IDs with both numbers and 'A + B' IDs
+    for column in df.columns:
+        if not isinstance(df[column].dtype, pd.CategoricalDtype) or \
+                not pd.api.types.infer_dtype(df[column].cat.categories).startswith('mixed'):
+            continue
+        names = df[column].cat.categories.map(str)
+        if names.is_unique:
+            df[column] = df[column].cat.rename_categories(names)
+        else:
+            df[column] = df[column].astype(object).where(df[column].isna(), df[column].astype(str))
+
+    schema = pa.Schema.from_pandas(df, preserve_index=False)
+    rows_written = 0
+    with pq.ParquetWriter(file_path, schema) as writer:
+        for chunk in _chunks(df, chunk_size):
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+            rows_written += len(chunk)
+            if on_rows:
+                on_rows(rows_written)
+
+
+WRITERS = {'xlsx': write_xlsx, 'csv': write_csv, 'parquet': write_parquet}
+
+
+def write_output(df, file_path, output_format=None, chunk_size=DEFAULT_CHUNK_SIZE, progress_callback=None,
+                 prepare_chunk=None):
+    """Write the final frame as xlsx, CSV or Parquet in chunks.
+
+    progress_callback, if given, is called as progress_callback(rows_written, total_rows)
+    after every chunk. prepare_chunk, if given, converts each chunk to the
+    values written to xlsx and CSV files.
+    """
+    output_format = get_output_format(file_path, output_format)
+    if output_format not in WRITERS:
+        raise ValueError(f"Unsupported output format '{output_format}'. Use one of: {', '.join(WRITERS)}")
+
+    total_rows = len(df)
+    on_rows = (lambda rows_written: progress_callback(rows_written, total_rows)) if progress_callback else None
+    logging.info(f"Writing {total_rows} rows to {file_path} as {output_format}")
+    WRITERS[output_format](df, file_path, chunk_size=chunk_size, on_rows=on_rows, prepare_chunk=prepare_chunk)
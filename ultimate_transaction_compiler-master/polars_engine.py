@@ -0,0 +1,174 @@
+"""Optional Polars engine that builds the final file as one lazy query.
+
+Once the Relationship IDs are resolved, each platform's TransformPlan is
+compiled into Polars expressions over only the source columns it reads, the
+platforms are concatenated and the rows sorted, and Polars runs the whole
+query on all cores when it is collected. The plans are the same ones the
+pandas path applies, so the rows, their order and their index match it.
+
+Source columns holding both numbers and text are read as text, so numbers
+in mixed columns (IDs, ZIP codes, phone numbers) come back as text, as in
+Parquet output.
+"""
+import numpy as np
+import pandas as pd
+from date_normalization import as_dates
+from final_schema import MIN_VALUES_PER_CATEGORY
+from shared_config import AMOUNT_COLUMNS, CATEGORY_COLUMNS, DATE_COLUMNS
+
+try:
+    import polars as pl
+    HAS_POLARS = True
+except ImportError:
+    HAS_POLARS = False
+
+ROW_ORDER_COLUMN = '__row_order'  # Concatenated row number, kept as the index pandas would give the rows
+
+
+def _polars_series(name, values):
+    if values.dtype == object or isinstance(values.dtype, pd.api.extensions.ExtensionDtype):
+        values = values.astype(object)
+        values = values.where(values.notna(), None)
+        try:
+            return pl.Series(name, values.tolist())
+        except Exception:
+            # Mixed types cannot share one Polars dtype
+            return pl.Series(name, values.astype(str).where(values.notna(), None).tolist(), dtype=pl.String)
+    return pl.Series(name, values.to_numpy(), nan_to_null=True)
+
+
+def _date_source_columns(plan):
+    """Source columns the plan's 'date' specs read, which Polars is handed as parsed dates."""
+    columns = set()
+    for _, spec in plan.specs:
+        if spec[0] == 'date':
+            inner = spec[1]
+            if inner[0] == 'column':
+                columns.add(inner[1])
+            elif inner[0] == 'date_fallback':
+                columns.update(inner[1:])
+    return columns
+
+
+def _to_polars(source, plan):
+    date_columns = _date_source_columns(plan)
+    return pl.DataFrame([
+        _polars_series(column, as_dates(source[column]) if column in date_columns else source[column])
+        for column in source.columns if column in plan.source_columns
+    ])
+
+
+def _expression(spec, source):
+    """TransformPlan._compute as a Polars expression, or the scalar when the spec is not a column."""
+    kind = spec[0]
+    if kind == 'constant':
+        return spec[1]
+    if kind == 'column':
+        return pl.col(spec[1]) if spec[1] in source.columns else spec[2]
+    if kind == 'date_fallback':
+        date_field, fallback_field = spec[1], spec[2]
+        if date_field not in source.columns:
+            return ''
+        dates = pl.col(date_field)
+        if fallback_field not in source.columns:
+            return dates
+        return pl.when(dates.is_null()).then(pl.col(fallback_field)).otherwise(dates)
+    if kind == 'date':
+        dates = _expression(spec[1], source)
+        # A missing date column fails in the pandas path and leaves Date Clean blank
+        return dates.dt.truncate('1d') if isinstance(dates, pl.Expr) else ''
+    if kind == 'recurring_id':
+        recurring_ids = _expression(spec[1], source)
+        if isinstance(recurring_ids, pl.Expr) and source.select(recurring_ids.is_not_null().any()).item():
+            return recurring_ids
+        return ''
+    if kind == 'match':
+        reasons = _expression(spec[1], source)
+        if not isinstance(reasons, pl.Expr):
+            return 'Not a Match'
+        return pl.when(reasons.cast(pl.String) == 'Match').then(pl.lit('Match')).otherwise(pl.lit('Not a Match'))
+    if kind == 'display_name':
+        return _display_names(spec, source)
+    raise ValueError(f"Unknown transform spec: {kind}")
+
+
+def _text_expression(spec, source):
+    names = _expression(spec, source)
+    if not isinstance(names, pl.Expr):
+        return pl.lit('' if names is None else str(names).strip())
+    return names.cast(pl.String).fill_null('').str.strip_chars()
+
+
+def _display_names(spec, source):
+    display_names = (_text_expression(spec[1], source) + ' ' + _text_expression(spec[2], source)).str.strip_chars()
+    contacts = [contact for contact in spec[3] if contact[0] != 'column' or contact[1] in source.columns]
+    contact_names = _expression(contacts[0], source) if contacts else None
+    if isinstance(contact_names, pl.Expr):
+        contact_names = contact_names.cast(pl.String)
+        fallback = (display_names == '') & contact_names.is_not_null() & (contact_names != '')
+        display_names = pl.when(fallback).then(contact_names.str.strip_chars()).otherwise(display_names)
+    return display_names
+
+
+def _categorical_values(values):
+    """values as a pandas Categorical with sorted categories, as final_schema would make it, or None.
+
+    Repeated text is decoded once per category instead of once per row.
+    """
+    categories = values.drop_nulls().unique().sort()
+    if len(categories) * MIN_VALUES_PER_CATEGORY > len(values) - values.null_count():
+        return None
+    codes = values.cast(pl.Enum(categories)).to_physical().cast(pl.Int32).fill_null(-1).to_numpy()
+    return pd.Categorical.from_codes(codes, categories=categories.to_numpy())
+
+
+def _pandas_values(values, column):
+    # Missing text is NaN, as read from the exports, and all-missing columns stay object columns
+    if values.dtype == pl.String and column in CATEGORY_COLUMNS:
+        categorical = _categorical_values(values)
+        if categorical is not None:
+            return categorical
+    if values.dtype == pl.Null:
+        return np.full(len(values), np.nan, dtype=object)
+    array = values.to_numpy()
+    if array.dtype == object:
+        array = array.copy()
+        array[values.is_null().to_numpy()] = np.nan
+    return array
+
+
+def plan_query(plan, df):
+    """Lazy Polars query for one platform's final-file rows, compiled from its TransformPlan."""
+    source = _to_polars(plan.select_source(df), plan)
+    columns = []
+    for column, spec in plan.specs:
+        values = _expression(spec, source)
+        columns.append((values if isinstance(values, pl.Expr) else pl.lit(values)).alias(column))
+    # with_columns broadcasts the constant columns to the platform's rows
+    return source.lazy().with_columns(columns).select(plan.output_columns)
+
+
+def _sort_key(column, dtype):
+    # Dates mapped straight from an export still carry their time of day until the rows are typed
+    if column in AMOUNT_COLUMNS:
+        return pl.col(column).cast(pl.Float64, strict=False)
+    if column in DATE_COLUMNS and dtype == pl.Datetime:
+        return pl.col(column).dt.truncate('1d')
+    return pl.col(column)
+
+
+def build_final_frame(plans, platform_dfs, sort_columns):
+    """Final-file rows of every platform, concatenated and sorted in one Polars query.
+
+    plans maps platform name -> TransformPlan. Returns a pandas frame with the
+    rows, order and index the pandas path gives them before typing. Amounts
+    are sorted as numbers and dates as days, as they are once typed.
+    """
+    query = pl.concat([plan_query(plans[name], df) for name, df in platform_dfs.items()], how='vertical_relaxed')
+    schema = query.collect_schema()
+    sort_keys = [_sort_key(column, schema[column]) for column in sort_columns]
+    final = query.with_row_index(ROW_ORDER_COLUMN).sort(sort_keys, nulls_last=True, maintain_order=True).collect()
+    row_order = final.get_column(ROW_ORDER_COLUMN).to_numpy().astype('int64')
+    final = final.drop(ROW_ORDER_COLUMN)
+    return pd.DataFrame({column: _pandas_values(final.get_column(column), column) for column in final.columns},
+                        index=pd.Index(row_order))
@@ -0,0 +1,114 @@
+"""Fuzzy linking of donors that have no email or ID and fall back to generate_fallback_ids.
+
+Fallback IDs are exact concatenations of name and address fields, so the same
+person written as "1 Main St." and "1 main street" becomes two donors. Donors
+are normalized, blocked on ZIP5 + the first letters of the last name, and only
+compared with the other donors in their block; pairs whose first name, last
+name and address are all similar enough are unioned into one identity. Each
+part is scored on its own so that a shared surname and address (family
+members) cannot carry a different first name over the threshold.
+"""
+import logging
+from difflib import SequenceMatcher
+import pandas as pd
+from identity_resolution import IdentityResolver
+
+DEFAULT_MATCH_THRESHOLD = 0.92
+LAST_NAME_PREFIX_LENGTH = 3
+MAX_BLOCK_SIZE = 500  # Larger blocks only link donors that are identical after normalization
+
+ADDRESS_ABBREVIATIONS = {
+    'street': 'st', 'avenue': 'ave', 'road': 'rd', 'drive': 'dr', 'boulevard': 'blvd', 'lane': 'ln',
+    'court': 'ct', 'place': 'pl', 'terrace': 'ter', 'circle': 'cir', 'highway': 'hwy', 'parkway': 'pkwy',
+    'square': 'sq', 'apartment': 'apt', 'suite': 'ste', 'north': 'n', 'south': 's', 'east': 'e', 'west': 'w'
+}
+ADDRESS_WORDS_PATTERN = r'\b(' + '|'.join(ADDRESS_ABBREVIATIONS) + r')\b'
+
+
+def normalize_text(values):
+    """Lowercase, punctuation removed and whitespace collapsed; '' where missing."""
+    text = values.astype(object).where(values.notna(), '').astype(str).str.lower()
+    return text.str.replace(r'[^a-z0-9]+', ' ', regex=True).str.strip()
+
+
+def normalize_address(values):
+    """normalize_text with street words abbreviated the way exports usually write them."""
+    return normalize_text(values).str.replace(
+        ADDRESS_WORDS_PATTERN, lambda match: ADDRESS_ABBREVIATIONS[match.group(1)], regex=True)
+
+
+def normalize_zip5(values):
+    """First five digits of a ZIP code, restoring leading zeros Excel dropped; '' if there is none."""
+    text = values.astype(object).where(values.notna(), '').astype(str)
+    digits = text.str.extract(r'^\s*(\d{3,5})', expand=False)
+    return digits.str.zfill(5).fillna('')
+
+
+def is_similar(text_a, text_b, threshold):
+    """difflib ratio of the two texts is at least threshold; the cheap upper bounds are checked first."""
+    matcher = SequenceMatcher(None, text_a, text_b)
+    return (matcher.real_quick_ratio() >= threshold and matcher.quick_ratio() >= threshold
+            and matcher.ratio() >= threshold)
+
+
+def _link_block(resolver, rows, threshold):
+    """Union every pair of (fallback ID, first, last, address) rows in one block that looks like the same person."""
+    for i, (id_a, first_a, last_a, address_a) in enumerate(rows):
+        for id_b, first_b, last_b, address_b in rows[i + 1:]:
+            if (is_similar(address_a, address_b, threshold) and is_similar(last_a, last_b, threshold)
+                    and is_similar(first_a, first_b, threshold)):
+                resolver.union(id_a, id_b)
+
+
+def link_fallback_donors(donors, fallback_ids, threshold=DEFAULT_MATCH_THRESHOLD):
+    """Map fallback IDs of donors that look like the same person to one of them.
+
+    donors holds the Donor name and address columns, fallback_ids the
+    fallback ID of each row. Returns a dict of fallback ID -> linked fallback
+    ID (the smallest in its group) for the IDs that changed.
+    """
+    def column(name):
+        return donors[name] if name in donors.columns else pd.Series('', index=donors.index)
+
+    last_names = normalize_text(column('Donor Last Name'))
+    profiles = pd.DataFrame({
+        'fallback_id': fallback_ids,
+        'first': normalize_text(column('Donor First Name')),
+        'last': last_names,
+        'address': normalize_address(column('Donor Address Line 1')),
+        'block': normalize_zip5(column('Donor ZIP')) + '|' + last_names.str[:LAST_NAME_PREFIX_LENGTH]
+    }).drop_duplicates('fallback_id')
+    profiles = profiles[~profiles['block'].str.startswith('|') & ~profiles['block'].str.endswith('|')]
+
+    resolver = IdentityResolver()
+    # Donors identical after normalization, e.g. only casing or "St." vs "Street" differs
+    normalized_columns = ['block', 'first', 'last', 'address']
+    first_ids = profiles.groupby(normalized_columns, sort=False)['fallback_id'].transform('first')
+    same = profiles['fallback_id'] != first_ids
+    for fallback_id, first_id in zip(profiles.loc[same, 'fallback_id'], first_ids[same]):
+        resolver.union(first_id, fallback_id)
+
+    # Similar donors, compared pairwise within each block only
+    distinct = profiles[~same].sort_values('block')
+    block_sizes = distinct['block'].value_counts(sort=False).reindex(distinct['block'].unique())
+    rows = list(zip(distinct['fallback_id'], distinct['first'], distinct['last'], distinct['address']))
+    start = 0
+    skipped = 0
+    for size in block_sizes:
+        if size > MAX_BLOCK_SIZE:
+            skipped += 1
+        elif size > 1:
+            _link_block(resolver, rows[start:start + size], threshold)
+        start += size
+    if skipped:
+        logging.warning(f"Skipped similarity scoring in {skipped} blocks with more than {MAX_BLOCK_SIZE} donors")
+
+    components = {}
+    for fallback_id in resolver.parent:
+        components.setdefault(resolver.find(fallback_id), []).append(fallback_id)
+    links = {}
+    for members in components.values():
+        linked_id = min(members)
+        links.update({fallback_id: linked_id for fallback_id in members if fallback_id != linked_id})
+    logging.info(f"Linked {len(links)} of {len(profiles)} fallback donors to a similar donor")
+    return links
@@ -12,7 +12,10 @@ from datetime import datetime
 import time
 import threading
 from dictionary_lookup_manager import DictionaryLookupManager
+from lookup_cache import read_lookup_table
 from shared_ui_components import BaseToolFrame
+from input_cache import cached_read_input
+from final_schema import to_typed_frame
 from rfm_score import RFMScorer
 
 class RFMAnalyzer(BaseToolFrame):
@@ -60,7 +63,7 @@ class RFMAnalyzer(BaseToolFrame):
     def get_dictionary_df(self, path):
         """Get dictionary DataFrame from cache or load it."""
         if path not in self.dictionary_cache:
-            self.dictionary_cache[path] = pd.read_excel(path)
+            self.dictionary_cache[path] = read_lookup_table(path)
         return self.dictionary_cache[path]
 
     def threshold_scoring(self, series, ascending=True):
@@ -142,10 +145,7 @@ class RFMAnalyzer(BaseToolFrame):
 
     def read_input_file(self):
         try:
-            if self.input_file_path.endswith('.csv'):
-                return pd.read_csv(self.input_file_path)
-            else:
-                return pd.read_excel(self.input_file_path)
+            return to_typed_frame(cached_read_input(self.input_file_path))
         except Exception as e:
             self.log(f"Error reading input file: {str(e)}")
             return None
@@ -158,7 +158,7 @@ class RFMAnalyzer(BaseToolFrame):
         recurring_ids = set(df[df['Recurring ID'].notna()]['Relationship ID'].unique())
         
         # Group by Relationship ID
-        grouped = df.groupby('Relationship ID')
+        grouped = df.groupby('Relationship ID', observed=True)
         
         # Calculate RFM components for each customer
         rfm_data = []
@@ -7,6 +7,9 @@ from datetime import datetime, date
 import time
 import subprocess
 from utils import update_progress, configure_logging, check_queues
+from input_cache import cached_read_final_file
+from lookup_cache import read_value_map
+from final_schema import to_typed_frame
 import queue
 
 class LookupDictionaryConfigDialog(tk.Toplevel):
@@ -193,7 +196,7 @@ class RFMAnalyzerHelper:
         update_progress(self.progress_queue, 0)
 
         # Read the Excel file
-        self.final_data = pd.read_excel(self.final_file_path)
+        self.final_data = to_typed_frame(cached_read_final_file(self.final_file_path))
         update_progress(self.progress_queue, 25)
         self.log("File imported. Applying lookup dictionaries...")
 
@@ -208,8 +211,7 @@ class RFMAnalyzerHelper:
         for i, lookup in enumerate(self.lookups, 1):
             self.log(f"Applying lookup dictionary: {lookup['name']}")
             try:
-                lookup_df = pd.read_excel(lookup['path'], header=None, names=['key', 'value'])
-                lookup_dict = dict(zip(lookup_df['key'], lookup_df['value']))
+                lookup_dict = read_value_map(lookup['path'])
                 
                 # Merge the lookup values with the final_data
                 self.final_data[lookup['output_column']] = self.final_data[lookup['lookup_column']].map(lookup_dict)
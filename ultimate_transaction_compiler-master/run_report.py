@@ -0,0 +1,103 @@
+"""Per-stage timing, memory and row-count report for a compile run."""
+import json
+import logging
+import os
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+try:
+    import resource  # Not available on Windows
+except ImportError:
+    resource = None
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB, or None if it cannot be measured."""
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+        return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+    if psutil is not None:
+        memory = psutil.Process().memory_info()
+        return round(getattr(memory, 'peak_wset', memory.rss) / (1024 * 1024), 1)
+    return None
+
+
+def cpu_seconds():
+    """CPU time used by this process and its finished child processes (e.g. file reader workers)."""
+    times = os.times()
+    return times.user + times.system + times.children_user + times.children_system
+
+
+class RunReport:
+    """Collects one record per pipeline stage: wall time, CPU time, peak RSS and rows in/out.
+
+    Stages are timed either with the stage() context manager or with
+    start()/end() pairs for sequential phases inside one function.
+    """
+
+    def __init__(self):
+        self.started_at = datetime.now()
+        self.stages = []
+        self.details = {}
+        self._open = []
+        self._run_start = time.perf_counter()
+        self._run_cpu_start = cpu_seconds()
+
+    def start(self, name, rows_in=None):
+        record = {'stage': name, 'depth': len(self._open), 'rows_in': rows_in, 'rows_out': None,
+                  '_wall_start': time.perf_counter(), '_cpu_start': cpu_seconds()}
+        self._open.append(record)
+        self.stages.append(record)
+        return record
+
+    def end(self, rows_out=None):
+        record = self._open.pop()
+        record['wall_seconds'] = round(time.perf_counter() - record.pop('_wall_start'), 3)
+        record['cpu_seconds'] = round(cpu_seconds() - record.pop('_cpu_start'), 3)
+        record['peak_rss_mb'] = peak_rss_mb()
+        record['rows_out'] = rows_out
+        return record
+
+    @contextmanager
+    def stage(self, name, rows_in=None):
+        """Time the enclosed block. Set record['rows_out'] on the yielded record to report output rows."""
+        record = self.start(name, rows_in)
+        try:
+            yield record
+        finally:
+            self.end(record['rows_out'])
+
+    def to_dict(self):
+        return {
+            'started_at': self.started_at.isoformat(),
+            'wall_seconds': round(time.perf_counter() - self._run_start, 3),
+            'cpu_seconds': round(cpu_seconds() - self._run_cpu_start, 3),
+            'peak_rss_mb': peak_rss_mb(),
+            **self.details,
+            'stages': [{key: value for key, value in record.items() if not key.startswith('_')}
+                       for record in self.stages]
+        }
+
+    def log_summary(self):
+        """Write one line per stage to the log."""
+        report = self.to_dict()
+        logging.info(f"Run report: {report['wall_seconds']:.2f}s wall, {report['cpu_seconds']:.2f}s CPU, "
+                     f"peak RSS {report['peak_rss_mb']} MB")
+        for record in report['stages']:
+            rows = f"rows {record['rows_in'] if record['rows_in'] is not None else '-'} -> " \
+                   f"{record['rows_out'] if record['rows_out'] is not None else '-'}"
+            logging.info(f"  {'  ' * record['depth']}{record['stage']}: {record.get('wall_seconds', 0):.2f}s wall, "
+                         f"{record.get('cpu_seconds', 0):.2f}s CPU, peak RSS {record.get('peak_rss_mb')} MB, {rows}")
+
+    def save(self, file_path):
+        with open(file_path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2, default=str)
+        logging.info(f"Saved run report to: {file_path}")
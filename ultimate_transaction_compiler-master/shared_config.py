@@ -12,3 +12,16 @@ FINAL_FILE_COLUMNS = [
     "Last Gift Gift Range Chart", "Last Gift Income Segment", "Last Gift Gift Segment",
     "Last Gift Month", "Last Gift Year"
 ]
+
+# Compact types for the final file columns (see final_schema.py)
+CATEGORY_COLUMNS = [
+    "Giving Platform", "Recipient", "Contribution Form URL", "Donor City", "Donor State", "Donor Country",
+    "Donor Occupation", "Donor Employer", "Match?", "Gift Date Segment", "Gift Range Chart",
+    "Income Segment", "Gift Segment", "Platform", "Last Gift Date Segment", "Last Gift Platform",
+    "Last Gift Gift Range Chart", "Last Gift Income Segment", "Last Gift Gift Segment"
+]
+BOOLEAN_COLUMNS = ["Is Recurring"]
+# Held as integer codes plus a table of the distinct IDs, so the tools group donors on integers
+IDENTITY_COLUMNS = ["Relationship ID"]
+AMOUNT_COLUMNS = ["Amount", "Last Gift Amount"]
+DATE_COLUMNS = ["Date Clean", "Last Gift Date"]
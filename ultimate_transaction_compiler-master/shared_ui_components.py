@@ -132,6 +132,17 @@ class LookupDictionaryConfigDialog(tk.Toplevel):
         TooltipLabel(zip_frame, text="ℹ", 
                     tooltip_text="Validate zip codes when matching").pack(side=tk.LEFT)
 
+        # Zip code range dictionary checkbox with tooltip
+        self.use_zip_ranges = tk.BooleanVar()
+        zip_ranges_frame = ttk.Frame(self.options_frame)
+        zip_ranges_frame.pack(fill=tk.X)
+        self.zip_ranges_checkbox = ttk.Checkbutton(zip_ranges_frame, 
+            text="Use Zip Code Ranges", 
+            variable=self.use_zip_ranges)
+        self.zip_ranges_checkbox.pack(side=tk.LEFT)
+        TooltipLabel(zip_ranges_frame, text="ℹ", 
+                    tooltip_text="Dictionary rows are start zip, end zip and value; zip codes are matched to the range holding them").pack(side=tk.LEFT)
+
         # Include in Last Gift Values checkbox with tooltip
         self.include_in_last_gift = tk.BooleanVar()
         last_gift_frame = ttk.Frame(self.options_frame)
@@ -211,6 +222,7 @@ class LookupDictionaryConfigDialog(tk.Toplevel):
             # Reset and disable other checkboxes
             self.use_post_merger.set(False)
             self.use_zip_validation.set(False)
+            self.use_zip_ranges.set(False)
             self.include_in_last_gift.set(False)
             self.use_default_value.set(False)
         else:
@@ -336,6 +348,11 @@ class LookupDictionaryConfigDialog(tk.Toplevel):
                     for col in value_columns:
                         values[col] = row[col]
                     self.values_tree.insert('', 'end', values=(row[key_column], '', str(values), row[key_column], ''))
+            elif self.use_zip_ranges.get():
+                df = pd.read_excel(file_path, header=None, names=['start', 'end', 'value'])
+                for _, row in df.iterrows():
+                    key = f"{row['start']}-{row['end']}"
+                    self.values_tree.insert('', 'end', values=(key, '', row['value'], key, ''))
             else:
                 df = pd.read_excel(file_path, header=None, names=['key', 'value'])
                 for _, row in df.iterrows():
@@ -371,6 +388,7 @@ class LookupDictionaryConfigDialog(tk.Toplevel):
         
         self.use_post_merger.set(dictionary.get('use_post_merger', False))
         self.use_zip_validation.set(dictionary.get('use_zip_validation', False))
+        self.use_zip_ranges.set(dictionary.get('use_zip_ranges', False))
         self.include_in_last_gift.set(dictionary.get('include_in_last_gift', False))
         self.use_default_value.set(dictionary.get('use_default_value', False))
         self.use_empty_value.set(dictionary.get('use_empty_value', False))
@@ -411,6 +429,7 @@ class LookupDictionaryConfigDialog(tk.Toplevel):
         self.use_multiple_values.set(False)
         self.use_post_merger.set(False)
         self.use_zip_validation.set(False)
+        self.use_zip_ranges.set(False)
         self.include_in_last_gift.set(False)
         self.use_default_value.set(False)
         self.use_empty_value.set(False)
@@ -447,6 +466,7 @@ class LookupDictionaryConfigDialog(tk.Toplevel):
             'use_multiple_values': self.use_multiple_values.get(),
             'use_post_merger': self.use_post_merger.get(),
             'use_zip_validation': self.use_zip_validation.get(),
+            'use_zip_ranges': self.use_zip_ranges.get(),
             'include_in_last_gift': self.include_in_last_gift.get(),
             'use_default_value': self.use_default_value.get(),
         }
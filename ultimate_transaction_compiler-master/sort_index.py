@@ -0,0 +1,136 @@
+"""Final file row order without a global sort, and a sort index saved next to the final file.
+
+Platform exports usually arrive close to date order, so instead of sorting
+the concatenated rows, each platform's rows are put in (Date Clean, Amount)
+order on their own (nothing to do when they already are) and the sorted
+platforms are merged. The result is the order a stable
+sort_values(['Date Clean', 'Amount']) of the concatenated rows gives.
+
+The compiler also saves the donor order of the file it wrote (rows by
+Relationship ID, then date) so the Giving Dashboard can reuse it instead of
+sorting the file again.
+"""
+import logging
+import os
+import pickle
+import numpy as np
+import pandas as pd
+
+SORT_INDEX_SUFFIX = ' - Sort Index.pkl'
+DONOR_SORT_COLUMNS = ['Relationship ID', 'Date Clean']
+
+
+def _known(values, known):
+    return values if known.all() else values[known]
+
+
+def _sort_key(dates, amounts):
+    """One int64 per row that orders like (date, amount) with missing values last, or None.
+
+    Works for whole-day dates and amounts in whole cents, which is what the
+    final file holds; anything else is left to sort_values.
+    """
+    if not pd.api.types.is_datetime64_any_dtype(dates) or not pd.api.types.is_numeric_dtype(amounts):
+        return None
+    date_values = dates.values
+    unit = np.datetime_data(date_values.dtype)[0]
+    known_days = ~np.isnat(date_values)
+    units_per_day = np.timedelta64(1, 'D') // np.timedelta64(1, unit)
+    day_numbers = date_values.view('int64') // units_per_day
+    amount_values = amounts.to_numpy(dtype='float64', na_value=np.nan)
+    cents = np.rint(amount_values * 100)
+    known_cents = ~np.isnan(cents)
+    if ((_known(day_numbers, known_days) * units_per_day != _known(date_values.view('int64'), known_days)).any()
+            or (_known(cents, known_cents) / 100 != _known(amount_values, known_cents)).any()):
+        return None
+
+    known_day_numbers, known_cent_values = _known(day_numbers, known_days), _known(cents, known_cents)
+    first_day, last_day = (known_day_numbers.min(), known_day_numbers.max()) if len(known_day_numbers) else (0, 0)
+    lowest_cents, highest_cents = (known_cent_values.min(), known_cent_values.max()) if len(known_cent_values) else (0, 0)
+    cents_span = int(highest_cents - lowest_cents) + 2  # One more for missing amounts
+    if (last_day - first_day + 2) * cents_span >= 2 ** 62:
+        return None
+    # Missing dates and amounts take the slot after the largest one, as NaN/NaT sort last in pandas
+    day_slots = day_numbers - first_day
+    day_slots[~known_days] = last_day - first_day + 1
+    cents[~known_cents] = highest_cents + 1
+    cent_slots = (cents - lowest_cents).astype('int64')
+    return day_slots * cents_span + cent_slots
+
+
+def merged_sort_order(dates, amounts, run_lengths):
+    """Positions that put the rows in stable (date, amount) order, or None if the keys cannot be merged.
+
+    dates and amounts hold consecutive runs of run_lengths rows (one per
+    platform); each run is sorted on its own and the sorted runs are merged,
+    earlier runs first on ties.
+    """
+    keys = _sort_key(dates, amounts)
+    if keys is None:
+        return None
+
+    key_limit = int(keys.max()) + 1 if len(keys) else 0
+    run_orders = []
+    start = 0
+    presorted = 0
+    for length in run_lengths:
+        run_keys = keys[start:start + length]
+        if (run_keys[:-1] <= run_keys[1:]).all():
+            run_order = np.arange(length)
+            presorted += 1
+        elif key_limit * length < 2 ** 63:
+            # Keys made unique by the row position sort stably with the fast unstable sort
+            run_order = np.sort(run_keys * length + np.arange(length)) % length
+        else:
+            run_order = np.argsort(run_keys, kind='stable')
+        run_orders.append(run_order + start)
+        start += length
+    order = np.concatenate(run_orders) if run_orders else np.empty(0, dtype='int64')
+
+    # A stable sort of ascending runs is a timsort merge of the runs: each one is galloped in, never re-sorted
+    order = order[np.argsort(keys[order], kind='stable')]
+    logging.info(f"Merged {len(run_lengths)} sorted runs of rows ({presorted} already in order)")
+    return order
+
+
+def donor_order(df):
+    """Row positions of df in the Giving Dashboard's (Relationship ID, Date Clean) order."""
+    keys = pd.DataFrame({column: df[column].values for column in DONOR_SORT_COLUMNS})
+    return keys.sort_values(DONOR_SORT_COLUMNS).index.to_numpy()
+
+
+def sort_index_path(final_file):
+    return f"{os.path.splitext(final_file)[0]}{SORT_INDEX_SUFFIX}"
+
+
+def save_sort_index(df, final_file, sorted_by):
+    """Save the donor order of df, as written to final_file, next to the file."""
+    stat = os.stat(final_file)
+    sort_index = {
+        'file_size': stat.st_size,
+        'file_mtime': stat.st_mtime,
+        'rows': len(df),
+        'sorted_by': list(sorted_by),
+        'donor_order': donor_order(df)
+    }
+    with open(sort_index_path(final_file), 'wb') as f:
+        pickle.dump(sort_index, f, protocol=pickle.HIGHEST_PROTOCOL)
+    logging.info(f"Saved sort index to: {sort_index_path(final_file)}")
+
+
+def load_donor_order(final_file, rows):
+    """Saved donor order of final_file, or None if there is none or the file changed since it was saved."""
+    path = sort_index_path(final_file)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'rb') as f:
+            sort_index = pickle.load(f)
+        stat = os.stat(final_file)
+        if (sort_index['file_size'], sort_index['file_mtime'], sort_index['rows']) != (stat.st_size, stat.st_mtime, rows):
+            logging.info(f"Ignoring sort index {path}: the final file changed since it was saved")
+            return None
+        return sort_index['donor_order']
+    except Exception as e:
+        logging.warning(f"Could not read sort index {path}: {str(e)}")
+        return None
@@ -0,0 +1,66 @@
+"""Tests for TransformPlan against the legacy step-by-step process_data."""
+import numpy as np
+import pandas as pd
+import pytest
+from benchmarks.synthetic_data import generate_exports, ACTBLUE, EVERYACTION
+from compile_pipeline import TransactionCompilePipeline, default_platforms, FINAL_COLUMNS
+from data_platform import TransformPlan
+from legacy_pipeline import LegacyTransactionCompilePipeline, legacy_process_data
+from output_equivalence import compare_frames, FINAL_FILE_KEY_COLUMNS
+
+OUTPUT_COLUMNS = FINAL_COLUMNS + ['Channel', 'Campaign', 'Not In Any Export']
+
+
+def _platforms():
+    platforms = default_platforms()
+    for platform in platforms.values():
+        # A constant default, a source column no export has and a column the exports pass through
+        platform.column_mapping['Channel'] = {'target': 'N/A', 'default': 'Online'}
+        platform.column_mapping['Campaign'] = {'target': 'Source Code', 'default': 'General'}
+    platforms[ACTBLUE].column_mapping['Is Recurring'] = {'target': 'N/A', 'default': 'true'}
+    platforms[ACTBLUE].date_fallback_field = 'Initial Recurring Contribution Date'
+    return platforms
+
+
+@pytest.fixture
+def platform_dfs():
+    exports = generate_exports(300, seed=2, recurring_rate=0.3, missing_email_rate=0.1, missing_date_rate=0,
+                               dirty_date_rate=0, extra_columns=0)
+    actblue = exports[ACTBLUE]
+    # Rows without a payment date fall back to the recurring start date
+    actblue['Initial Recurring Contribution Date'] = actblue['Paid At']
+    actblue.loc[actblue.index[::25], 'Paid At'] = np.nan
+    # Missing names fall back to a contact name column
+    everyaction = exports[EVERYACTION]
+    everyaction.loc[everyaction.index[::20], ['First Name', 'Last Name']] = np.nan
+    everyaction['Contact Name'] = 'Contact ' + everyaction['VANID'].astype(str)
+    exports[EVERYACTION] = everyaction.drop(columns=['Home Country'])
+    return TransactionCompilePipeline(_platforms()).generate_transaction_values(exports)
+
+
+@pytest.mark.parametrize('platform_name', [EVERYACTION, ACTBLUE])
+def test_transform_plan_matches_the_legacy_process_data(platform_dfs, platform_name):
+    platform = _platforms()[platform_name]
+    df = platform_dfs[platform_name]
+    expected = legacy_process_data(platform, df.copy()).reindex(columns=OUTPUT_COLUMNS, fill_value='')
+    actual = TransformPlan(platform, OUTPUT_COLUMNS).apply(df)
+
+    assert actual.index.equals(expected.index)
+    assert list(actual.columns) == OUTPUT_COLUMNS
+    report = compare_frames(expected, actual)
+    assert report.is_equivalent, report.summary()
+
+    assert actual['Date Clean'].notna().all()
+    assert (actual['Channel'] == 'Online').all()
+    assert (actual['Campaign'] == 'General').all()
+    assert (actual['Not In Any Export'] == '').all()
+
+
+def test_final_file_matches_the_legacy_final_file(platform_dfs):
+    expected = LegacyTransactionCompilePipeline(_platforms()).create_final_file(
+        {name: df.copy() for name, df in platform_dfs.items()}, extra_columns=['Channel', 'Campaign'])
+    actual = TransactionCompilePipeline(_platforms()).create_final_file(
+        {name: df.copy() for name, df in platform_dfs.items()}, extra_columns=['Channel', 'Campaign'])
+
+    report = compare_frames(expected, actual, key_columns=FINAL_FILE_KEY_COLUMNS)
+    assert report.is_equivalent, report.summary()
@@ -0,0 +1,96 @@
+"""Tests for date column parsing against the pd.to_datetime call it replaces."""
+import numpy as np
+import pandas as pd
+import pytest
+from date_normalization import parse_date_column, as_dates
+
+
+def _texts(values):
+    return pd.Series(values, dtype=object)
+
+
+@pytest.mark.parametrize('values', [
+    ['2024-01-02', '2024-03-04', '2023-12-31'],
+    ['01/02/2024', '12/25/2024', '03/04/2024'],
+    ['2024-01-02 10:30:00', '2024-01-02 10:30:00', '2024-02-29 23:59:59'],
+    ['Jan 3, 2024', 'Feb 14, 2024'],
+])
+def test_one_format_matches_to_datetime(values):
+    parsed, report = parse_date_column(_texts(values))
+    pd.testing.assert_series_equal(parsed, pd.to_datetime(_texts(values)))
+    assert report['unparsable'] == report['missing'] == 0
+    assert report['other_formats'] == []
+
+
+def test_the_index_is_kept():
+    values = pd.Series(['2024-01-02', '2024-01-03'], index=[5, 5])
+    assert parse_date_column(values)[0].index.tolist() == [5, 5]
+
+
+def test_an_explicit_format_is_used_as_given():
+    parsed, report = parse_date_column(_texts(['01/02/2024', '03/04/2024']), '%d/%m/%Y')
+    assert parsed.tolist() == [pd.Timestamp('2024-02-01'), pd.Timestamp('2024-04-03')]
+    assert not report['format_inferred']
+    # The platform has chosen the order, so nothing is ambiguous
+    assert report['ambiguous'] == 0
+
+
+def test_parsed_dates_pass_through():
+    values = pd.Series(pd.to_datetime(['2024-01-02', None, '2024-01-03']))
+    parsed, report = parse_date_column(values)
+    pd.testing.assert_series_equal(parsed, values)
+    assert report['format'] is None
+    assert report['missing'] == 1 and report['unparsable'] == 0
+
+
+def test_blanks_are_missing_and_bad_text_is_unparsable():
+    parsed, report = parse_date_column(_texts(['2024-01-02', None, '', '  ', np.nan, 'garbage', 'garbage', '2024-13-45']))
+    assert parsed.isna().tolist() == [False, True, True, True, True, True, True, True]
+    assert report['missing'] == 4
+    assert report['unparsable'] == 3
+    assert report['unparsable_examples'] == ['garbage', '2024-13-45']
+
+
+def test_offsets_are_dropped_keeping_the_local_time():
+    parsed, _ = parse_date_column(_texts(['2024-01-02T10:00:00-05:00', '2024-01-03T10:00:00+01:00']))
+    assert parsed.tolist() == [pd.Timestamp('2024-01-02 10:00'), pd.Timestamp('2024-01-03 10:00')]
+
+
+def test_unconfirmed_day_month_order_is_reported_as_ambiguous():
+    parsed, report = parse_date_column(_texts(['01/02/2024', '03/04/2024', '05/05/2024']))
+    # Read as to_datetime reads it, month first
+    pd.testing.assert_series_equal(parsed, pd.to_datetime(_texts(['01/02/2024', '03/04/2024', '05/05/2024'])))
+    assert report['format'] == '%m/%d/%Y' and report['format_inferred']
+    # 05/05 reads the same either way
+    assert report['ambiguous'] == 2
+
+
+@pytest.mark.parametrize('values, date_format', [
+    (['01/02/2024', '12/25/2024'], '%m/%d/%Y'),
+    (['13/01/2024', '02/01/2024'], '%d/%m/%Y'),
+])
+def test_a_day_above_twelve_confirms_the_order(values, date_format):
+    _, report = parse_date_column(_texts(values))
+    assert report['format'] == date_format
+    assert report['ambiguous'] == 0
+
+
+def test_year_first_dates_are_never_ambiguous():
+    _, report = parse_date_column(_texts(['2024-01-02', '2024-03-04']))
+    assert report['ambiguous'] == 0
+
+
+def test_other_layouts_are_parsed_with_their_own_formats():
+    values = _texts(['2024-01-02', '2024-01-05', '01/15/2024', 'Jan 3, 2024'])
+    parsed, report = parse_date_column(values)
+    assert parsed.tolist() == [pd.Timestamp(day) for day in ['2024-01-02', '2024-01-05', '2024-01-15', '2024-01-03']]
+    assert report['format'] == '%Y-%m-%d'
+    assert report['other_formats'] == ['%m/%d/%Y', '%b %d, %Y']
+    assert report['unparsable'] == 0
+
+
+def test_as_dates_parses_text_and_keeps_dates():
+    dates = pd.Series(pd.to_datetime(['2024-01-02', '2024-01-03']))
+    assert as_dates(dates) is dates
+    assert as_dates(_texts(['2024-01-02', '01/03/2024', 'garbage'])).tolist() == \
+        [pd.Timestamp('2024-01-02'), pd.Timestamp('2024-01-03'), pd.NaT]
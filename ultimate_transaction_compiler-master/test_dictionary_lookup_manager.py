@@ -0,0 +1,149 @@
+"""Tests for batched dictionary lookups against applying them one after the other."""
+import numpy as np
+import pandas as pd
+import pytest
+from dictionary_lookup_manager import DictionaryLookupManager
+from legacy_pipeline import LegacyDictionaryLookupManager
+
+DESIGNATION_VALUES = [
+    {'key': 'Organize Florida', 'merger_key': 'Florida Rising', 'value': 'c4',
+     'clean_name': 'Organize Florida', 'clean_merger_name': 'Florida Rising'},
+    {'key': 'Florida Rising', 'merger_key': '', 'value': 'c4', 'clean_name': 'Florida Rising',
+     'clean_merger_name': ''},
+    {'key': 'Education Fund', 'merger_key': '', 'value': '', 'clean_name': 'Education Fund',
+     'clean_merger_name': ''},
+]
+
+
+def _write(path, rows, header=False):
+    pd.DataFrame(rows).to_excel(path, index=False, header=header)
+    return str(path)
+
+
+@pytest.fixture
+def lookups(tmp_path):
+    msa = _write(tmp_path / 'msa.xlsx', [[33613, 'Tampa'], [2134, 'Boston']])
+    districts = _write(tmp_path / 'districts.xlsx', [[33600, 33699, 'FL-14'], ['02100', '02199', 'MA-7']])
+    regions = _write(tmp_path / 'regions.xlsx', [['Tampa', 'South'], ['Boston', None]])
+    forms = _write(tmp_path / 'forms.xlsx', {'Form': ['a', 'b'], 'Split': ['50/50', np.nan], 'Channel': ['web', 'sms']},
+                   header=True)
+    org_types = _write(tmp_path / 'org_types.xlsx', [['Florida Rising', 'Union'], ['Education Fund', 'Fund']])
+    return [
+        {'name': 'MSA', 'path': msa, 'lookup_column': 'Donor ZIP', 'output_column': 'MSA',
+         'use_zip_validation': True, 'use_default_value': True, 'default_value': 'No MSA'},
+        {'name': 'District', 'path': districts, 'lookup_column': 'Donor ZIP', 'output_column': 'District',
+         'use_zip_ranges': True},
+        {'name': 'Forms', 'path': forms, 'lookup_column': 'Form', 'output_column': '',
+         'use_multiple_values': True, 'use_empty_value': True, 'empty_value': 'EMPTY'},
+        {'name': 'Designation', 'path': '', 'lookup_column': 'Recipient', 'output_column': 'Designation',
+         'use_post_merger': True, 'values': DESIGNATION_VALUES, 'use_empty_value': True, 'empty_value': 'EMPTY'},
+        # Both read columns the lookups above write, so they start new batches
+        {'name': 'Region', 'path': regions, 'lookup_column': 'MSA', 'output_column': 'Region',
+         'use_default_value': True, 'default_value': 'Unknown'},
+        {'name': 'Org Type', 'path': org_types, 'lookup_column': 'Recipient', 'output_column': 'Org Type'},
+    ]
+
+
+def _transactions(categorical):
+    df = pd.DataFrame({
+        'Donor ZIP': pd.Series(['33613-7716', 2134, None, 'abc', '02134', 33613.0], dtype=object),
+        'Form': ['a', 'b', 'c', np.nan, 'a', 'b'],
+        'Recipient': ['Organize Florida', 'Florida Rising', 'Education Fund', np.nan, 'Unknown Org', 'Organize Florida'],
+    })
+    if categorical:
+        df = df.astype('category')
+    return df
+
+
+def _manager(manager_class, lookups, tmp_path):
+    manager = manager_class(str(tmp_path / 'no_dictionaries.json'))
+    manager.lookups = lookups
+    return manager
+
+
+def test_lookups_are_batched_until_a_written_column_is_read(lookups, tmp_path):
+    batches = _manager(DictionaryLookupManager, lookups, tmp_path).plan_lookups(lookups)
+    assert [[lookup['name'] for lookup in batch] for batch in batches] == [['MSA', 'District', 'Forms', 'Designation'],
+                                                                          ['Region', 'Org Type']]
+
+
+@pytest.mark.parametrize('categorical', [False, True])
+def test_batched_lookups_match_sequential_lookups(lookups, tmp_path, categorical):
+    manager = _manager(DictionaryLookupManager, lookups, tmp_path)
+    batched = manager.apply_lookup_dictionaries(_transactions(categorical))
+    sequential = _transactions(categorical)
+    for lookup in lookups:
+        sequential = manager.apply_lookup_batch(sequential, [lookup])
+    pd.testing.assert_frame_equal(batched, sequential)
+
+    assert batched['MSA'].astype(object).tolist() == ['Tampa', 'Boston', 'No MSA', 'No MSA', 'Boston', 'Tampa']
+    assert batched['District'].astype(object).tolist()[:3] == ['FL-14', 'MA-7', np.nan]
+    assert batched['Split'].astype(object).tolist()[:2] == ['50/50', 'EMPTY']
+    assert batched['Region'].astype(object).tolist()[:3] == ['South', 'Unknown', 'Unknown']
+
+
+@pytest.mark.parametrize('categorical', [False, True])
+def test_batched_lookups_match_the_legacy_lookups(lookups, tmp_path, categorical):
+    # The legacy path has no ZIP range lookups
+    lookups = [lookup for lookup in lookups if not lookup.get('use_zip_ranges', False)]
+    expected = _manager(LegacyDictionaryLookupManager, lookups, tmp_path).apply_lookup_dictionaries(
+        _transactions(categorical))
+    actual = _manager(DictionaryLookupManager, lookups, tmp_path).apply_lookup_dictionaries(_transactions(categorical))
+    pd.testing.assert_frame_equal(actual, expected)
+
+
+MERGER_VALUES = [
+    # Renamed: the old name's clean name is the new one
+    {'key': 'Organize Florida', 'merger_key': '', 'value': 'c4', 'clean_name': 'Florida Rising'},
+    # Merged: the PAC's rows go to Florida Rising
+    {'key': 'Florida Rising', 'merger_key': 'Florida Rising PAC', 'value': 'c4', 'clean_name': 'Florida Rising',
+     'clean_merger_name': 'Florida Rising'},
+    # A key's own clean name wins over the clean name it has as another key's merger key
+    {'key': 'Education Fund', 'merger_key': 'Organize Florida', 'value': 'c3', 'clean_name': 'Education Fund',
+     'clean_merger_name': 'Education Fund'},
+    {'key': 'Old Name', 'merger_key': '', 'value': 'c3'},
+]
+RECIPIENTS = ['Organize Florida', 'Florida Rising PAC', 'Florida Rising', 'Education Fund', 'Old Name', 'Unknown Org',
+              np.nan, 'Organize Florida']
+CLEAN_RECIPIENTS = ['Florida Rising', 'Florida Rising', 'Florida Rising', 'Education Fund', 'Old Name', 'Unknown Org',
+                    np.nan, 'Florida Rising']
+
+
+@pytest.fixture
+def merger_lookups(tmp_path):
+    org_types = _write(tmp_path / 'org_types.xlsx', [['Florida Rising', 'Union'], ['Education Fund', 'Fund']])
+    return [
+        {'name': 'Designation', 'path': '', 'lookup_column': 'Recipient', 'output_column': 'Designation',
+         'use_post_merger': True, 'values': MERGER_VALUES},
+        {'name': 'Org Type', 'path': org_types, 'lookup_column': 'Recipient', 'output_column': 'Org Type'},
+    ]
+
+
+@pytest.mark.parametrize('dtype', [object, 'category'])
+def test_renamed_and_merged_recipients_get_their_clean_names(merger_lookups, tmp_path, dtype):
+    manager = _manager(DictionaryLookupManager, merger_lookups, tmp_path)
+    batched = manager.apply_lookup_dictionaries(pd.DataFrame({'Recipient': pd.Series(RECIPIENTS, dtype=dtype)}))
+    sequential = pd.DataFrame({'Recipient': pd.Series(RECIPIENTS, dtype=dtype)})
+    sequential = manager.apply_post_merger_logic(sequential, merger_lookups[0])
+    sequential = manager.apply_standard_lookup(sequential, merger_lookups[1])
+    expected = _manager(LegacyDictionaryLookupManager, merger_lookups, tmp_path).apply_lookup_dictionaries(
+        pd.DataFrame({'Recipient': pd.Series(RECIPIENTS, dtype=dtype)}))
+
+    pd.testing.assert_series_equal(batched['Recipient'], pd.Series(CLEAN_RECIPIENTS, dtype=object, name='Recipient'))
+    assert batched['Org Type'].tolist()[:4] == ['Union', 'Union', 'Union', 'Fund']
+    pd.testing.assert_frame_equal(batched, sequential)
+    pd.testing.assert_frame_equal(batched, expected)
+
+
+def test_clean_names_keep_a_categorical_column_categorical(tmp_path):
+    values = [{'key': 'Organize Florida', 'merger_key': 'FL Org', 'value': 'c4', 'clean_name': 'Florida Rising',
+               'clean_merger_name': 'Florida Rising Action'}]
+    lookup = {'name': 'Designation', 'path': '', 'lookup_column': 'Recipient', 'output_column': 'Designation',
+              'use_post_merger': True, 'values': values}
+    recipients = pd.Series(['FL Org', 'Organize Florida', 'Other', np.nan], dtype='category')
+    df = _manager(DictionaryLookupManager, [lookup], tmp_path).apply_post_merger_logic(
+        pd.DataFrame({'Recipient': recipients}), lookup)
+
+    assert isinstance(df['Recipient'].dtype, pd.CategoricalDtype)
+    pd.testing.assert_series_equal(df['Recipient'].astype(object), pd.Series(
+        ['Florida Rising Action', 'Florida Rising', 'Other', np.nan], dtype=object, name='Recipient'))
@@ -0,0 +1,86 @@
+"""Tests for the duckdb backend against the pandas path on synthetic exports."""
+import numpy as np
+import pandas as pd
+import pytest
+from benchmarks.synthetic_data import generate_exports, write_exports, ACTBLUE, EVERYACTION
+from compile_pipeline import TransactionCompilePipeline, default_platforms
+from input_cache import InputFileCache
+from output_equivalence import compare_frames, FINAL_FILE_KEY_COLUMNS
+
+pytest.importorskip('duckdb')
+import duckdb_backend  # noqa: E402 - needs duckdb
+
+
+def _compile(input_files, output_file, backend):
+    pipeline = TransactionCompilePipeline(default_platforms(), ingest_workers=1, backend=backend,
+                                          input_cache=InputFileCache(enabled=False))
+    pipeline.run(input_files, str(output_file))
+    return pd.read_csv(output_file, dtype=str, keep_default_na=False), pipeline.duplicate_matches
+
+
+@pytest.fixture
+def input_files(tmp_path):
+    exports = generate_exports(900, seed=5, recurring_rate=0.3, missing_date_rate=0.02, dirty_date_rate=0.05,
+                               extra_columns=2)
+    input_files = write_exports(exports, str(tmp_path / 'exports'), max_rows_per_file=160)
+    # A later ActBlue file leaves 'Is Recurring' blank and drops a column the others have
+    blank_file = exports[ACTBLUE].iloc[:80].assign(**{'Is Recurring': np.nan}).drop(columns=['Donor Occupation'])
+    blank_file['Lineitem ID'] = blank_file['Lineitem ID'].astype(str) + '-b'
+    blank_path = str(tmp_path / 'exports' / 'actblue_blank.xlsx')
+    blank_file.to_excel(blank_path, index=False)
+    input_files[ACTBLUE].append(blank_path)
+    return input_files
+
+
+@pytest.mark.parametrize('chunk_size', [97, 100000])
+def test_duckdb_backend_matches_the_pandas_path(input_files, tmp_path, monkeypatch, chunk_size):
+    monkeypatch.setattr(duckdb_backend, 'STAGE_CHUNK_SIZE', chunk_size)
+    expected, expected_matches = _compile(input_files, tmp_path / 'pandas.csv', 'pandas')
+    actual, actual_matches = _compile(input_files, tmp_path / 'duckdb.csv', 'duckdb')
+
+    assert len(expected_matches) > 0
+    assert (expected[expected['Giving Platform'] == ACTBLUE]['Recurring ID'] != '').any()
+    report = compare_frames(expected, actual, key_columns=FINAL_FILE_KEY_COLUMNS)
+    assert report.is_equivalent, report.summary()
+    assert not report.order_differs
+    pd.testing.assert_frame_equal(actual, expected)
+
+    match_report = compare_frames(expected_matches, actual_matches)
+    assert match_report.is_equivalent, match_report.summary()
+
+
+def test_staged_inputs_come_back_as_pandas_concatenates_them():
+    files = [
+        pd.DataFrame({'id': [1, 2], 'flag': [True, False], 'amount': [1, 2], 'text': ['a', 'b'],
+                      'blank': [np.nan, np.nan], 'date': pd.to_datetime(['2024-01-02', '2024-01-03'])}),
+        pd.DataFrame({'id': [3, 4], 'flag': [np.nan, np.nan], 'amount': [2.5, np.nan], 'text': [5, 6.5],
+                      'new': ['x', np.nan]}),
+        pd.DataFrame({'id': [5], 'flag': [True], 'blank': ['filled'], 'date': pd.to_datetime([None])}),
+    ]
+    database = duckdb_backend.DuckDBCompileDatabase()
+    try:
+        for df in files:
+            database.stage_input('platform', df)
+        expected = pd.concat(files, ignore_index=True)
+        chunks = list(database.iter_input_chunks('platform', chunk_size=2))
+    finally:
+        database.close()
+
+    assert [len(chunk) for chunk in chunks] == [2, 2, 1]
+    staged = pd.concat(chunks)
+    assert list(staged.columns) == list(expected.columns)
+    # Numbers in a column that is text in another file come back as str() spells them
+    expected['text'] = expected['text'].map(str).where(expected['text'].notna(), np.nan)
+    pd.testing.assert_frame_equal(staged, expected)
+
+
+def test_the_duckdb_backend_rejects_fuzzy_matching():
+    with pytest.raises(ValueError):
+        TransactionCompilePipeline(default_platforms(), backend='duckdb', fuzzy_match_threshold=0.9)
+
+
+def test_a_full_compile_needs_base_platform_files(input_files, tmp_path):
+    pipeline = TransactionCompilePipeline(default_platforms(), ingest_workers=1, backend='duckdb',
+                                          input_cache=InputFileCache(enabled=False))
+    with pytest.raises(ValueError, match=EVERYACTION):
+        pipeline.run({ACTBLUE: input_files[ACTBLUE]}, str(tmp_path / 'final.csv'))
@@ -0,0 +1,62 @@
+"""Tests for the hash-join duplicate detection against the legacy per-row matching."""
+import numpy as np
+import pandas as pd
+import pytest
+from benchmarks.synthetic_data import generate_exports, ACTBLUE, EVERYACTION
+from compile_pipeline import TransactionCompilePipeline, default_platforms
+from legacy_pipeline import LegacyTransactionCompilePipeline
+
+DUPLICATE_COLUMN = f'Duplicate Platform {EVERYACTION}'
+
+
+def _duplicate_flags(pipeline_class, platform_dfs):
+    pipeline = pipeline_class(default_platforms())
+    platform_dfs = pipeline.generate_transaction_values({name: df.copy() for name, df in platform_dfs.items()})
+    return platform_dfs[EVERYACTION][DUPLICATE_COLUMN], pipeline.duplicate_matches
+
+
+def _exports():
+    everyaction = pd.DataFrame({
+        'VANID': [1, 2, 3, 4, 5],
+        'ActBlue ID': ['AB1', np.nan, np.nan, np.nan, np.nan],
+        'Date Received': pd.to_datetime(['2024-01-02', '2024-01-02', '2024-01-03', '2024-01-03', '2024-01-04']),
+        'Amount': [25.0, 25.0, 10.0, 10.0, 50.0],
+        'Personal Email': ['a@example.com', np.nan, 'Shared@example.com', 'shared@example.com', 'b@example.com'],
+    })
+    actblue = pd.DataFrame({
+        'Order Number': ['AB1', 'AB2', 'AB3', 'AB4', 'AB5', 'AB6'],
+        'Lineitem ID': [11, 12, 13, 14, 15, 16],
+        'Paid At': pd.to_datetime(['2024-01-02 09:00', '2024-01-02 10:00', '2024-01-03 11:00', '2024-01-03 12:00',
+                                   '2024-01-03 13:00', '2024-01-04 14:00']),
+        'Amount': [25.0, 25.0, 10.0, 10.0, 10.0, 40.0],
+        'Donor Email': ['a@example.com', np.nan, 'shared@example.com', 'shared@example.com', 'shared@example.com',
+                        'b@example.com'],
+        'Is Recurring': [False] * 6,
+    })
+    return {EVERYACTION: everyaction, ACTBLUE: actblue}
+
+
+def test_duplicates_match_the_legacy_flags():
+    expected, _ = _duplicate_flags(LegacyTransactionCompilePipeline, _exports())
+    flags, matches = _duplicate_flags(TransactionCompilePipeline, _exports())
+
+    # Blank emails and IDs link nothing; one ActBlue gift can duplicate several EveryAction rows
+    assert flags.tolist() == ['Duplicate', 'Not Duplicate', 'Duplicate', 'Duplicate', 'Not Duplicate']
+    assert flags.tolist() == expected.tolist()
+
+    # A gift linked by both its email and its order number is one match; three gifts on one row are three
+    pairs = matches.groupby('Base Row')['Matched Transaction ID'].count()
+    assert pairs.to_dict() == {0: 1, 2: 3, 3: 3}
+    assert not matches.duplicated(subset=['Base Row', 'Matched Platform', 'Matched Row']).any()
+
+
+@pytest.mark.parametrize('seed', [0, 1])
+def test_duplicates_match_the_legacy_flags_on_synthetic_exports(seed):
+    exports = generate_exports(400, seed=seed, shared_email_rate=0.3, missing_email_rate=0.2, missing_date_rate=0,
+                               dirty_date_rate=0, extra_columns=0)
+    expected, _ = _duplicate_flags(LegacyTransactionCompilePipeline, exports)
+    flags, matches = _duplicate_flags(TransactionCompilePipeline, exports)
+
+    assert (flags == 'Duplicate').sum() > 0
+    assert flags.tolist() == expected.tolist()
+    assert set(matches['Base Row']) == set(flags.index[flags == 'Duplicate'])
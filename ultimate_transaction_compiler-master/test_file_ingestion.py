@@ -0,0 +1,73 @@
+"""Tests for reading platform exports in parallel through the input cache."""
+import os
+import pandas as pd
+import pytest
+from benchmarks.synthetic_data import generate_exports, write_exports
+from file_ingestion import read_platform_files, iter_platform_files, cached_reader, FileIngestionError
+from input_cache import InputFileCache
+
+
+@pytest.fixture
+def input_files(tmp_path):
+    exports = generate_exports(300, seed=2, extra_columns=2)
+    return exports, write_exports(exports, str(tmp_path / 'exports'), max_rows_per_file=70)
+
+
+def _cache_files(cache_dir):
+    return os.listdir(cache_dir) if os.path.isdir(cache_dir) else []
+
+
+@pytest.mark.parametrize('max_workers', [1, 3])
+def test_files_are_concatenated_in_order(input_files, tmp_path, max_workers):
+    exports, files = input_files
+    cache = InputFileCache(str(tmp_path / 'cache'), enabled=False)
+    platform_dfs = read_platform_files(files, max_workers=max_workers, reader=cached_reader(cache))
+    for name, df in exports.items():
+        expected = pd.concat([pd.read_excel(path) for path in files[name]], ignore_index=True)
+        pd.testing.assert_frame_equal(platform_dfs[name], expected)
+        assert len(platform_dfs[name]) == len(df)
+
+
+@pytest.mark.parametrize('max_workers', [1, 3])
+def test_worker_processes_use_the_cache_they_are_given(input_files, tmp_path, max_workers):
+    _, files = input_files
+    cache_dir = str(tmp_path / 'cache')
+    columns = {name: ['Amount'] for name in files}
+
+    read_platform_files(files, max_workers=max_workers, reader=cached_reader(InputFileCache(cache_dir, enabled=False)),
+                        columns=columns)
+    assert _cache_files(cache_dir) == []
+
+    first = read_platform_files(files, max_workers=max_workers, reader=cached_reader(InputFileCache(cache_dir)),
+                                columns=columns)
+    assert len(_cache_files(cache_dir)) == sum(len(paths) for paths in files.values())
+    second = read_platform_files(files, max_workers=max_workers, reader=cached_reader(InputFileCache(cache_dir)),
+                                 columns=columns)
+    for name in files:
+        pd.testing.assert_frame_equal(second[name], first[name])
+        assert first[name].columns.tolist() == ['Amount']
+
+
+def test_every_failure_is_reported(tmp_path):
+    missing = [str(tmp_path / 'missing 1.xlsx'), str(tmp_path / 'missing 2.xlsx')]
+    cache = InputFileCache(str(tmp_path / 'cache'), enabled=False)
+    with pytest.raises(FileIngestionError) as error:
+        read_platform_files({'ActBlue': missing}, max_workers=2, reader=cached_reader(cache))
+    assert set(error.value.failures) == set(missing)
+
+
+@pytest.mark.parametrize('max_workers', [1, 3])
+def test_iterated_files_arrive_in_order(input_files, tmp_path, max_workers):
+    _, files = input_files
+    cache = InputFileCache(str(tmp_path / 'cache'), enabled=False)
+    broken = str(tmp_path / 'missing.xlsx')
+    with_failure = {name: paths[:1] + [broken] + paths[1:] for name, paths in files.items()}
+
+    seen = []
+    with pytest.raises(FileIngestionError) as error:
+        for platform, file_path, df in iter_platform_files(with_failure, max_workers=max_workers,
+                                                           reader=cached_reader(cache)):
+            pd.testing.assert_frame_equal(df, pd.read_excel(file_path))
+            seen.append((platform, file_path))
+    assert seen == [(name, path) for name, paths in files.items() for path in paths]
+    assert list(error.value.failures) == [broken]
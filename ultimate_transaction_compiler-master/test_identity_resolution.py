@@ -0,0 +1,75 @@
+"""Tests for the union-find identity engine behind Relationship IDs."""
+import pytest
+from identity_resolution import IdentityResolver, RELATIONSHIP_ID_SEPARATOR
+from utils import add_unique_id
+
+
+def _ids(relationship_id):
+    return set(relationship_id.split(RELATIONSHIP_ID_SEPARATOR))
+
+
+def _resolver(rows):
+    """Resolver built the way generate_transaction_values builds it: (base ID or None, keys on the row)."""
+    resolver = IdentityResolver()
+    for base_id, keys in rows:
+        first_key = resolver.union_keys(keys)
+        if base_id is not None:
+            resolver.add_relationship_id(first_key, base_id)
+    return resolver
+
+
+def test_rows_sharing_a_key_resolve_to_one_id():
+    resolver = _resolver([('101', ['a@x.com', 'S1']), ('102', ['a@x.com'])])
+    assert resolver.resolve('S1') == resolver.resolve('a@x.com') == '101 + 102'
+
+
+def test_direct_merge_has_the_ids_add_unique_id_gave():
+    resolver = _resolver([('101', ['a@x.com']), ('102 + 103', ['a@x.com'])])
+    assert _ids(resolver.resolve('a@x.com')) == _ids(add_unique_id('101', '102 + 103'))
+
+
+def test_merges_are_transitive():
+    # a-b and c-d only meet through the last row, which links b and c
+    resolver = _resolver([('1', ['a', 'b']), ('2', ['c', 'd']), (None, ['b', 'c'])])
+    assert {resolver.resolve(key) for key in 'abcd'} == {'1 + 2'}
+
+
+@pytest.mark.parametrize('order', [[0, 1, 2], [2, 1, 0], [1, 2, 0]])
+def test_resolution_does_not_depend_on_row_order(order):
+    rows = [('30', ['a', 'b']), ('4', ['b', 'c']), ('x7', ['c'])]
+    resolver = _resolver([rows[i] for i in order])
+    # Numeric IDs sort numerically, text after them
+    assert resolver.resolve('a') == '4 + 30 + x7'
+
+
+def test_missing_keys_are_skipped():
+    resolver = _resolver([('1', [None, 'a', '']), ('2', ['', None, 'b'])])
+    assert '' not in resolver and None not in resolver
+    assert resolver.resolve('a') == '1'
+    assert resolver.resolve('b') == '2'
+
+
+def test_keys_without_an_id_resolve_to_the_default():
+    resolver = _resolver([(None, ['a', 'b'])])
+    assert resolver.resolve('a') is None
+    assert resolver.resolve('a', default='fallback') == 'fallback'
+    assert resolver.resolve('unknown', default='fallback') == 'fallback'
+    assert resolver.resolve('', default='fallback') == 'fallback'
+    assert resolver.resolve(None, default='fallback') == 'fallback'
+
+
+def test_resolved_ids_are_refreshed_after_a_later_merge():
+    resolver = _resolver([('1', ['a'])])
+    assert resolver.resolve('a') == '1'
+    resolver.add_relationship_id('b', '2')
+    resolver.union('a', 'b')
+    assert resolver.resolve('a') == resolver.resolve('b') == '1 + 2'
+
+
+def test_long_chains_resolve_to_one_component():
+    resolver = IdentityResolver()
+    for i in range(2000):
+        resolver.union(f'k{i}', f'k{i + 1}')
+    resolver.add_relationship_id('k0', '5')
+    assert resolver.resolve('k2000') == '5'
+    assert len({resolver.find(f'k{i}') for i in range(2001)}) == 1
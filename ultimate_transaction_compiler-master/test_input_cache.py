@@ -0,0 +1,67 @@
+"""Tests for the parsed input file cache: a cache hit must equal a fresh parse."""
+import os
+import numpy as np
+import pandas as pd
+import pytest
+from input_cache import InputFileCache, HAS_PYARROW, FEATHER_EXTENSION, PICKLE_EXTENSION
+
+FRAMES = {
+    'text with blanks': pd.DataFrame({'Is Recurring': ['TRUE', np.nan, 'false', np.nan], 'Amount': [5, 10, 15, 20]}),
+    'booleans with blanks': pd.DataFrame({'Is Recurring': [True, np.nan, False, np.nan]}),
+    'numbers in an object column': pd.DataFrame({'ZIP': pd.Series([2134, 33613.5, np.nan, 501], dtype=object)}),
+    'numbers and text': pd.DataFrame({'ZIP': [2134, '02134-0001', np.nan, 'ZIP']}),
+    'None and NaN': pd.DataFrame({'Email': ['a@x.com', None, np.nan, '']}),
+    'dates': pd.DataFrame({'Paid At': pd.to_datetime(['2024-01-02', None]), 'Note': [np.nan, 'x']}),
+    'other index': pd.DataFrame({'Amount': [1.5, np.nan]}, index=[3, 7]),
+    'empty': pd.DataFrame({'Amount': pd.Series([], dtype=float), 'Email': pd.Series([], dtype=object)}),
+}
+
+
+def _entry_files(cache):
+    return sorted(os.listdir(cache.cache_dir))
+
+
+@pytest.mark.parametrize('name', FRAMES)
+def test_get_returns_the_frame_put(tmp_path, name):
+    cache = InputFileCache(str(tmp_path))
+    df = FRAMES[name]
+    cache.put('key', df)
+    pd.testing.assert_frame_equal(cache.get('key'), df)
+    # Missing values keep their own kind: NaN stays NaN and None stays None
+    for column in df.columns[df.dtypes == object]:
+        assert [type(value) for value in cache.get('key')[column]] == [type(value) for value in df[column]]
+
+
+def test_frames_feather_holds_exactly_are_stored_as_feather(tmp_path):
+    pytest.importorskip('pyarrow')
+    cache = InputFileCache(str(tmp_path))
+    cache.put('text', FRAMES['text with blanks'])
+    cache.put('numbers', FRAMES['numbers in an object column'])
+    cache.put('none', FRAMES['None and NaN'])
+    assert _entry_files(cache) == ['none' + PICKLE_EXTENSION, 'numbers' + PICKLE_EXTENSION, 'text' + FEATHER_EXTENSION]
+
+
+def test_a_hit_equals_a_fresh_parse(tmp_path):
+    csv_file = str(tmp_path / 'export.csv')
+    pd.DataFrame({'Order Number': ['AB1', 'AB2', 'AB3'], 'Is Recurring': ['TRUE', '', 'FALSE']}).to_csv(csv_file, index=False)
+    cache = InputFileCache(str(tmp_path / 'cache'))
+    fresh = cache.read(csv_file, 'read_csv', pd.read_csv)
+    assert len(_entry_files(cache)) == 1
+    pd.testing.assert_frame_equal(cache.read(csv_file, 'read_csv', pd.read_csv), fresh)
+    assert np.isnan(cache.read(csv_file, 'read_csv', pd.read_csv)['Is Recurring'][1])
+
+
+def test_disabled_cache_writes_nothing(tmp_path):
+    csv_file = str(tmp_path / 'export.csv')
+    pd.DataFrame({'Amount': [1, 2]}).to_csv(csv_file, index=False)
+    cache = InputFileCache(str(tmp_path / 'cache'), enabled=False)
+    assert cache.read(csv_file, 'read_csv', pd.read_csv)['Amount'].tolist() == [1, 2]
+    assert not os.path.exists(cache.cache_dir)
+
+
+def test_unreadable_entries_are_misses(tmp_path):
+    cache = InputFileCache(str(tmp_path))
+    for extension in (FEATHER_EXTENSION, PICKLE_EXTENSION) if HAS_PYARROW else (PICKLE_EXTENSION,):
+        open(os.path.join(tmp_path, 'key' + extension), 'w').write('not a frame')
+    assert cache.get('key') is None
+    assert _entry_files(cache) == []
@@ -0,0 +1,80 @@
+"""Tests for the single-pass Last Gift values against groupby('Relationship ID').shift()."""
+import numpy as np
+import pandas as pd
+import pytest
+from last_gift import add_last_gift_columns, is_donor_ordered
+
+COLUMNS = ['Amount', 'Date Clean', 'Giving Platform', 'Is Recurring']
+
+
+def _gifts(seed, rows=60, categorical=False, donor_sorted=False):
+    rng = np.random.default_rng(seed)
+    relationship_ids = pd.Series(rng.integers(0, 8, rows).astype(float))
+    relationship_ids[rng.random(rows) < 0.2] = np.nan
+    dates = pd.Series(pd.Timestamp('2024-01-01') + pd.to_timedelta(rng.integers(0, 5, rows), 'D'))
+    dates[rng.random(rows) < 0.1] = pd.NaT
+    df = pd.DataFrame({
+        'Relationship ID': relationship_ids.astype('category') if categorical else relationship_ids,
+        'Date Clean': dates,
+        'Amount': rng.integers(1, 100, rows),
+        'Giving Platform': pd.Series(rng.choice(['Act Blue', 'Every Action'], rows)).astype('category'),
+        'Is Recurring': pd.array(rng.random(rows) < 0.5, dtype='boolean')
+    })
+    return df.sort_values(['Relationship ID', 'Date Clean']) if donor_sorted else df
+
+
+def _expected(df, columns):
+    expected = df.copy()
+    for column in columns:
+        if column in df.columns:
+            expected[f'Last Gift {column}'] = df.groupby('Relationship ID', observed=True)[column].shift()
+    return expected
+
+
+@pytest.mark.parametrize('seed', range(20))
+@pytest.mark.parametrize('categorical', [False, True])
+@pytest.mark.parametrize('donor_sorted', [False, True])
+def test_matches_groupby_shift(seed, categorical, donor_sorted):
+    df = _gifts(seed, categorical=categorical, donor_sorted=donor_sorted)
+    expected = _expected(df, COLUMNS)
+    pd.testing.assert_frame_equal(add_last_gift_columns(df.copy(), COLUMNS), expected)
+
+
+def test_first_gifts_and_rows_without_an_id_have_no_last_gift():
+    df = pd.DataFrame({'Relationship ID': [1.0, np.nan, 1.0, np.nan, 2.0], 'Amount': [10, 20, 30, 40, 50]})
+    last_amounts = add_last_gift_columns(df.copy(), ['Amount'])['Last Gift Amount']
+    assert last_amounts.isna().tolist() == [True, True, False, True, True]
+    assert last_amounts[2] == 10
+
+
+def test_unobserved_categories_and_missing_columns():
+    ids = pd.Categorical(['b', 'a', 'b'], categories=['a', 'b', 'unused'])
+    df = pd.DataFrame({'Relationship ID': ids, 'Amount': [1.5, 2.5, 3.5]})
+    result = add_last_gift_columns(df.copy(), ['Amount', 'Not A Column'])
+    pd.testing.assert_frame_equal(result, _expected(df, ['Amount']))
+    assert 'Last Gift Not A Column' not in result
+
+
+def test_writes_into_the_frame_it_is_given():
+    df = _gifts(0)
+    assert add_last_gift_columns(df, ['Amount']) is df
+    assert 'Last Gift Amount' in df
+
+
+def test_empty_frame():
+    df = _gifts(0).iloc[:0]
+    pd.testing.assert_frame_equal(add_last_gift_columns(df.copy(), COLUMNS), _expected(df, COLUMNS))
+
+
+@pytest.mark.parametrize('seed', range(20))
+@pytest.mark.parametrize('categorical', [False, True])
+def test_donor_order_is_detected_as_sort_values_sees_it(seed, categorical):
+    df = _gifts(seed, categorical=categorical)
+    sorted_df = df.sort_values(['Relationship ID', 'Date Clean'], kind='stable')
+    assert is_donor_ordered(sorted_df)
+    assert is_donor_ordered(df) == sorted_df.index.equals(df.index)
+
+
+def test_text_dates_are_never_reported_as_ordered():
+    df = pd.DataFrame({'Relationship ID': [1, 2], 'Date Clean': ['2024-01-01', '2024-01-02']})
+    assert not is_donor_ordered(df)
@@ -0,0 +1,61 @@
+"""Tests for the chunked final file writers and reading split xlsx outputs back."""
+import numpy as np
+import pandas as pd
+import pytest
+from output_writer import write_output, write_xlsx
+from input_cache import InputFileCache, cached_read_final_file
+
+
+def _final_rows(rows=10):
+    return pd.DataFrame({
+        'Relationship ID': [str(100 + i % 4) for i in range(rows)],
+        'Date Clean': pd.date_range('2024-01-01', periods=rows),
+        'Amount': np.arange(rows) * 2.5,
+        'Donor Email': [None if i % 3 else f"donor{i}@example.com" for i in range(rows)],
+    })
+
+
+@pytest.mark.parametrize('max_rows', [2, 4, 11, 12])
+def test_split_xlsx_reads_back_as_one_frame(tmp_path, max_rows):
+    df = _final_rows()
+    split_file = str(tmp_path / 'split.xlsx')
+    write_xlsx(df, split_file, chunk_size=3, max_rows=max_rows)
+    assert len(pd.ExcelFile(split_file).sheet_names) == -(-len(df) // (max_rows - 1))
+
+    one_sheet_file = str(tmp_path / 'one sheet.xlsx')
+    write_xlsx(df, one_sheet_file)
+    cache = InputFileCache(str(tmp_path / 'cache'))
+    expected = pd.read_excel(one_sheet_file)
+    pd.testing.assert_frame_equal(cached_read_final_file(split_file, cache), expected)
+    # A second read comes from the cache with the same rows
+    pd.testing.assert_frame_equal(cached_read_final_file(split_file, cache), expected)
+
+
+def test_empty_frame_writes_a_header(tmp_path):
+    df = _final_rows().iloc[:0]
+    file_path = str(tmp_path / 'empty.xlsx')
+    write_xlsx(df, file_path)
+    assert pd.read_excel(file_path).columns.tolist() == df.columns.tolist()
+
+
+def test_csv_chunks_match_to_csv(tmp_path):
+    df = _final_rows()
+    file_path = str(tmp_path / 'final.csv')
+    progress = []
+    write_output(df, file_path, chunk_size=3, progress_callback=lambda done, total: progress.append((done, total)))
+    assert open(file_path).read() == df.to_csv(index=False)
+    assert progress == [(3, 10), (6, 10), (9, 10), (10, 10)]
+
+
+def test_parquet_stores_mixed_relationship_ids_as_text(tmp_path):
+    pytest.importorskip('pyarrow')
+    df = _final_rows()
+    # Numeric IDs and merged 'A + B' IDs share one categorical, as normalize_relationship_ids builds it
+    df['Relationship ID'] = pd.Categorical([100, 101, '100 + 102', 101, 100, None, 102, '100 + 102', 100, 101])
+    file_path = str(tmp_path / 'final.parquet')
+    write_output(df, file_path, chunk_size=3)
+    written = pd.read_parquet(file_path)
+    expected_ids = ['100', '101', '100 + 102', '101', '100', np.nan, '102', '100 + 102', '100', '101']
+    pd.testing.assert_series_equal(written['Relationship ID'].astype(object),
+                                   pd.Series(expected_ids, dtype=object, name='Relationship ID'))
+    pd.testing.assert_frame_equal(written.drop(columns='Relationship ID'), df.drop(columns='Relationship ID'))
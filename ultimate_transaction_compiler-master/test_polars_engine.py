@@ -0,0 +1,35 @@
+"""Tests for the Polars final file against the pandas path on synthetic exports."""
+import numpy as np
+import pandas as pd
+import pytest
+from benchmarks.synthetic_data import generate_exports, ACTBLUE, EVERYACTION
+from compile_pipeline import TransactionCompilePipeline, default_platforms
+from output_equivalence import compare_frames, FINAL_FILE_KEY_COLUMNS
+
+pytest.importorskip('polars')
+
+
+@pytest.fixture
+def platform_dfs():
+    exports = generate_exports(600, seed=11, recurring_rate=0.3, missing_email_rate=0.1, missing_date_rate=0.02,
+                               dirty_date_rate=0.05, extra_columns=0)
+    # ZIP codes read from Excel mix numbers and text, and some are blank
+    zips = exports[EVERYACTION]['Home Zip/Postal'].astype(object)
+    zips.iloc[::3] = pd.to_numeric(zips.iloc[::3], errors='coerce')
+    zips.iloc[::7] = np.nan
+    exports[EVERYACTION]['Home Zip/Postal'] = zips
+    return TransactionCompilePipeline(default_platforms()).generate_transaction_values(exports)
+
+
+def test_polars_final_file_matches_the_pandas_path(platform_dfs):
+    expected = TransactionCompilePipeline(default_platforms()).create_final_file(
+        {name: df.copy() for name, df in platform_dfs.items()})
+    actual = TransactionCompilePipeline(default_platforms(), backend='polars').create_final_file(
+        {name: df.copy() for name, df in platform_dfs.items()})
+
+    assert set(expected['Giving Platform']) == {EVERYACTION, ACTBLUE}
+    report = compare_frames(expected, actual, key_columns=FINAL_FILE_KEY_COLUMNS)
+    assert report.is_equivalent, report.summary()
+    assert not report.order_differs
+    assert actual.index.equals(expected.index)
+    assert list(actual.columns) == list(expected.columns)
@@ -0,0 +1,97 @@
+"""Tests for the merged final file sort and the saved donor order against sort_values."""
+import os
+import numpy as np
+import pandas as pd
+import pytest
+from sort_index import merged_sort_order, donor_order, save_sort_index, load_donor_order
+
+SORT_COLUMNS = ['Date Clean', 'Amount']
+
+
+def _platform_rows(rng, rows, presorted=False):
+    df = pd.DataFrame({
+        'Date Clean': pd.Series(pd.Timestamp('2024-01-01') + pd.to_timedelta(rng.integers(0, 6, rows), 'D')),
+        'Amount': rng.choice([5.0, 10.0, 10.5, 25.0], rows),
+        'Row': np.arange(rows)
+    })
+    df.loc[rng.random(rows) < 0.1, 'Date Clean'] = pd.NaT
+    df.loc[rng.random(rows) < 0.1, 'Amount'] = np.nan
+    return df.sort_values(SORT_COLUMNS, kind='stable') if presorted else df
+
+
+def _combined(seed, run_lengths, presorted=False):
+    rng = np.random.default_rng(seed)
+    runs = [_platform_rows(rng, rows, presorted).assign(Platform=i) for i, rows in enumerate(run_lengths)]
+    return pd.concat(runs, ignore_index=True)
+
+
+@pytest.mark.parametrize('seed', range(10))
+@pytest.mark.parametrize('run_lengths', [[40], [30, 25], [10, 0, 50, 5]])
+@pytest.mark.parametrize('presorted', [False, True])
+def test_merged_order_is_the_stable_sort_of_the_concatenated_rows(seed, run_lengths, presorted):
+    final_df = _combined(seed, run_lengths, presorted)
+    order = merged_sort_order(final_df['Date Clean'], final_df['Amount'], run_lengths)
+    expected = final_df.sort_values(SORT_COLUMNS, kind='stable')
+    # Ties keep their platform and row order, and missing dates and amounts go last
+    pd.testing.assert_frame_equal(final_df.take(order), expected)
+
+
+def test_ties_keep_earlier_platforms_first():
+    final_df = pd.DataFrame({'Date Clean': pd.to_datetime(['2024-01-02', '2024-01-01', '2024-01-01', '2024-01-02']),
+                             'Amount': [5.0, 5.0, 5.0, 5.0]})
+    assert merged_sort_order(final_df['Date Clean'], final_df['Amount'], [2, 2]).tolist() == [1, 2, 0, 3]
+
+
+@pytest.mark.parametrize('dates, amounts', [
+    (pd.Series(['2024-01-01', '2024-01-02']), pd.Series([1.0, 2.0])),
+    (pd.to_datetime(pd.Series(['2024-01-01 10:30', '2024-01-02 00:00'])), pd.Series([1.0, 2.0])),
+    (pd.to_datetime(pd.Series(['2024-01-01', '2024-01-02'])), pd.Series([1.001, 2.0])),
+    (pd.to_datetime(pd.Series(['2024-01-01', '2024-01-02'])), pd.Series(['1', '2'], dtype=object)),
+])
+def test_keys_that_cannot_be_merged_are_left_to_sort_values(dates, amounts):
+    assert merged_sort_order(dates, amounts, [len(dates)]) is None
+
+
+def test_empty_runs():
+    empty = pd.Series([], dtype='datetime64[ns]')
+    assert len(merged_sort_order(empty, pd.Series([], dtype=float), [0, 0])) == 0
+
+
+def test_donor_order_matches_sort_values():
+    rng = np.random.default_rng(3)
+    df = pd.DataFrame({'Relationship ID': pd.Series(rng.integers(0, 10, 80)).astype('category'),
+                       'Date Clean': pd.Timestamp('2024-01-01') + pd.to_timedelta(rng.integers(0, 4, 80), 'D')},
+                      index=rng.permutation(80))
+    expected = df.sort_values(['Relationship ID', 'Date Clean'])
+    pd.testing.assert_frame_equal(df.take(donor_order(df)), expected)
+
+
+def _donors(rows=20):
+    return pd.DataFrame({'Relationship ID': [i % 4 for i in range(rows)],
+                         'Date Clean': pd.date_range('2024-01-01', periods=rows)[::-1]})
+
+
+def test_saved_donor_order_is_loaded_for_the_same_file(tmp_path):
+    final_file = str(tmp_path / 'final.xlsx')
+    open(final_file, 'w').write('rows')
+    df = _donors()
+    save_sort_index(df, final_file, SORT_COLUMNS)
+    assert load_donor_order(final_file, len(df)).tolist() == donor_order(df).tolist()
+
+
+def test_saved_donor_order_is_ignored_once_the_file_changes(tmp_path):
+    final_file = str(tmp_path / 'final.xlsx')
+    open(final_file, 'w').write('rows')
+    df = _donors()
+    save_sort_index(df, final_file, SORT_COLUMNS)
+    assert load_donor_order(final_file, len(df) + 1) is None
+    open(final_file, 'w').write('other rows')
+    assert load_donor_order(final_file, len(df)) is None
+
+
+def test_missing_or_unreadable_sort_index(tmp_path):
+    final_file = str(tmp_path / 'final.xlsx')
+    open(final_file, 'w').write('rows')
+    assert load_donor_order(final_file, 1) is None
+    open(os.path.join(tmp_path, 'final - Sort Index.pkl'), 'w').write('not a pickle')
+    assert load_donor_order(final_file, 1) is None
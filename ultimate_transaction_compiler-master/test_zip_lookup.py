@@ -0,0 +1,74 @@
+"""Tests for ZIP code keys and ZIP range dictionaries against the per-row code they replace."""
+import numpy as np
+import pandas as pd
+import pytest
+from legacy_pipeline import legacy_process_zip_code
+from zip_lookup import normalize_zip_codes, ZipRangeTable
+
+
+def _as_keys(zip_codes):
+    return [None if pd.isna(value) else int(value) for value in zip_codes]
+
+
+@pytest.mark.parametrize('values', [
+    pd.Series(['33613', '33613-7716', '02134', '00501', ' 12345 ', '0', '', 'abc', '12a45', '-', None, np.nan],
+              dtype=object),
+    pd.Series([2134, 33613.0, 501.7, 0, -5, None, '02134-0001', 'ZIP'], dtype=object),
+    pd.Series([2134, 501, 0, 99950]),
+    pd.Series([2134.0, np.nan, 33613.0]),
+    pd.Series(['02134', '02134', None, '02134'], dtype='category'),
+])
+def test_zip_codes_match_legacy_process_zip_code(values):
+    expected = [legacy_process_zip_code(value) for value in values]
+    assert _as_keys(normalize_zip_codes(values)) == expected
+
+
+def test_zip_codes_keep_the_index():
+    values = pd.Series(['02134', '33613-7716'], index=[7, 7])
+    zip_codes = normalize_zip_codes(values)
+    assert zip_codes.index.tolist() == [7, 7]
+    assert str(zip_codes.dtype) == 'Int64'
+
+
+def test_empty_column():
+    assert len(normalize_zip_codes(pd.Series([], dtype=object))) == 0
+
+
+def _range_table():
+    return ZipRangeTable(starts=pd.Series([1000, '02000', 5000]), ends=pd.Series([1999, 2499, '05000-1234']),
+                         values=['A', 'B', 'C'])
+
+
+def test_range_lookup_matches_a_dictionary_of_every_zip_code():
+    table = _range_table()
+    exploded = {}
+    for start, end, value in [(1000, 1999, 'A'), (2000, 2499, 'B'), (5000, 5000, 'C')]:
+        exploded.update(dict.fromkeys(range(start, end + 1), value))
+    zip_codes = pd.Series(range(900, 5100))
+    positions = table.find(zip_codes)
+    found = [table.values[position] if position >= 0 else None for position in positions]
+    assert found == [exploded.get(zip_code) for zip_code in zip_codes]
+
+
+def test_range_bounds_are_inclusive_and_gaps_miss():
+    table = _range_table()
+    assert table.find(pd.Series([1000, 1999, 2000, 2499, 2500, 4999, 5000, 5001, 999])).tolist() == \
+        [0, 0, 1, 1, -1, -1, 2, -1, -1]
+
+
+def test_missing_zip_codes_miss():
+    table = _range_table()
+    assert table.find(pd.Series([pd.NA, 1500], dtype='Int64')).tolist() == [-1, 0]
+
+
+def test_invalid_ranges_are_skipped():
+    table = ZipRangeTable(starts=pd.Series([1000, 'bad', None]), ends=pd.Series([1999, 2999, 3999]),
+                          values=['A', 'B', 'C'])
+    assert len(table) == 1
+    assert table.find(pd.Series([1500, 2500, 3500])).tolist() == [0, -1, -1]
+
+
+def test_overlapping_ranges_give_the_later_start():
+    table = ZipRangeTable(starts=pd.Series([2000, 1000]), ends=pd.Series([2999, 2499]), values=['Inner', 'Outer'])
+    found = [table.values[position] for position in table.find(pd.Series([1500, 2200, 2700]))]
+    assert found == ['Outer', 'Inner', 'Inner']
@@ -1,6 +1,7 @@
 import logging
 import tkinter as tk
 import queue
+import pandas as pd
 
 class QueueHandler(logging.Handler):
     def __init__(self, log_queue):
@@ -55,6 +56,19 @@ def generate_fallback_id(row):
         str(row.get('Donor Employer', ''))
     )
 
+FALLBACK_ID_COLUMNS = [
+    'Donor First Name', 'Donor Last Name', 'Donor Address Line 1', 'Donor City',
+    'Donor State', 'Donor ZIP', 'Donor Country', 'Donor Employer'
+]
+
+def generate_fallback_ids(df):
+    """Vectorized generate_fallback_id for a whole DataFrame."""
+    fallback_ids = pd.Series('', index=df.index, dtype=object)
+    for col in FALLBACK_ID_COLUMNS:
+        if col in df.columns:
+            fallback_ids = fallback_ids + df[col].astype(str)
+    return fallback_ids
+
 def add_unique_id(existing_ids, new_ids):
     unique_ids = set(existing_ids.split(' + ') + new_ids.split(' + '))
     return ' + '.join(unique_ids)
\ No newline at end of file
@@ -0,0 +1,94 @@
+"""ZIP code keys for lookup dictionaries, computed over whole columns.
+
+normalize_zip_codes turns a column of ZIP codes into the integer keys ZIP
+dictionaries are matched on: numbers are truncated, text is stripped, ZIP+4
+suffixes and leading zeros are dropped, and anything that is not a ZIP code
+is missing.
+
+ZipRangeTable holds a ZIP range dictionary (start ZIP, end ZIP, value). It
+finds the range of every ZIP code by binary search over the sorted range
+starts, so a few hundred ranges stand in for a table of every ZIP code.
+"""
+import logging
+import numpy as np
+import pandas as pd
+
+# Digits up to an optional ZIP+4 dash, without leading zeros (long enough for any ZIP, short enough for int64)
+ZIP_TEXT_PATTERN = r'\A0*([1-9][0-9]{0,17})(?:-[\s\S]*)?\Z'
+
+
+def _distinct_zip_codes(values):
+    zip_codes = pd.Series(pd.NA, index=values.index, dtype='Int64')
+    text = pd.Series(np.nan, index=values.index, dtype=object)
+    if pd.api.types.is_numeric_dtype(values):
+        numbers = values.astype('float64')
+    else:
+        values = values.astype(object)
+        try:
+            # .str gives NaN for anything that is not text, which is then read as a number
+            text = values.str.strip()
+        except AttributeError:
+            pass  # No text at all
+        numbers = pd.to_numeric(values.where(text.isna()), errors='coerce').astype('float64')
+
+    # Numbers lose their fraction; what is left must be a positive ZIP code
+    whole_numbers = np.trunc(numbers.to_numpy())
+    is_zip_number = np.isfinite(whole_numbers) & (whole_numbers >= 1)
+    zip_codes.iloc[np.flatnonzero(is_zip_number)] = whole_numbers[is_zip_number].astype('int64')
+
+    # Text keeps the part before a ZIP+4 dash, without leading zeros, if it is all digits
+    has_text = text.notna().to_numpy()
+    if has_text.any():
+        digits = text[has_text].str.extract(ZIP_TEXT_PATTERN, expand=False)
+        is_zip_text = digits.notna().to_numpy()
+        zip_codes.iloc[np.flatnonzero(has_text)[is_zip_text]] = digits[is_zip_text].astype('int64').to_numpy()
+    return zip_codes
+
+
+def normalize_zip_codes(values):
+    """Integer ZIP keys of values (nullable Int64), missing where a value is not a ZIP code.
+
+    Text operations on object columns run in Python, so each distinct value
+    is normalized once and the keys are gathered back to the rows.
+    """
+    values = pd.Series(values)
+    codes, uniques = pd.factorize(values)
+    distinct_zip_codes = _distinct_zip_codes(pd.Series(uniques))
+    # Missing values (code -1) take the appended missing key
+    zip_codes = pd.concat([distinct_zip_codes, pd.Series([pd.NA], dtype='Int64')], ignore_index=True).take(codes)
+    zip_codes.index = values.index
+    return zip_codes
+
+
+class ZipRangeTable:
+    """Start/end ZIP ranges, sorted by start, and the value of each range."""
+
+    def __init__(self, starts, ends, values):
+        starts = normalize_zip_codes(starts)
+        ends = normalize_zip_codes(ends)
+        valid = (starts.notna() & ends.notna()).to_numpy()
+        if not valid.all():
+            logging.warning(f"Skipping {int((~valid).sum())} ZIP ranges without a valid start and end ZIP")
+        order = np.argsort(starts[valid].to_numpy(dtype='int64'), kind='stable')
+        self.starts = starts[valid].to_numpy(dtype='int64')[order]
+        self.ends = ends[valid].to_numpy(dtype='int64')[order]
+        self.values = list(np.asarray(values, dtype=object)[valid][order])
+        overlaps = int((self.starts[1:] <= self.ends[:-1]).sum())
+        if overlaps:
+            logging.warning(f"{overlaps} ZIP ranges overlap the range before them; ZIP codes in both get the later one")
+
+    def __len__(self):
+        return len(self.starts)
+
+    def find(self, zip_codes):
+        """Position in self.values of the range holding each ZIP code, or -1 where no range does."""
+        zip_codes = pd.Series(zip_codes)
+        keys = zip_codes.to_numpy(dtype='float64', na_value=np.nan)
+        known = ~np.isnan(keys)
+        positions = np.full(len(keys), -1, dtype='int64')
+        # The last range starting at or before the ZIP code, if it also ends at or after it
+        candidates = np.searchsorted(self.starts, keys[known], side='right') - 1
+        found = candidates >= 0
+        found[found] = self.ends[candidates[found]] >= keys[known][found]
+        positions[np.flatnonzero(known)[found]] = candidates[found]
+        return pd.Series(positions, index=zip_codes.index)